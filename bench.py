@@ -0,0 +1,465 @@
+"""
+This module contains the benchmarks of loading, saving, recommending, and rendering.
+
+Examples:
+    python bench.py
+    python bench.py --sizes 1000,100000 --repeat 5 -o bench.json
+    python bench.py --backend sqlite --format binary --label v1.2
+
+The catalogs of restos and the gustos are made from a fixed seed, so every run times
+the same work. They are saved to a temporary directory, so the real data is never
+touched. The tables are rendered for a terminal of COLUMNS x LINES, and their output
+is thrown away.
+
+The results are written as JSON. For each catalog size and benchmark, they have the
+best, median, and mean time of the repeats in seconds, so runs of different releases
+can be compared.
+"""
+
+# Standard Library Imports
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Local Module Imports
+import geo
+import save_load as sl
+import reco as rc
+import resto as r
+import gusto as g
+import misc as m
+import ranking as rk
+import sampling as sp
+import terminal as t
+import user_inputs as ui
+from records import Gusto, Resto
+from render import Renderer
+from resto_index import RestoIndex
+
+# The catalog sizes benchmarked by default
+SIZES = [1_000, 100_000, 1_000_000]
+# The number of gustos in the workload, half with ranked recos and half with random recos
+GUSTO_COUNT = 20
+# The number of times each benchmark is run
+REPEAT = 3
+# The seed of the catalogs and gustos
+SEED = 12
+# The size of the terminal the tables are rendered for
+COLUMNS = 128
+LINES = 40
+# The half-width of the square around UPLB gate the restos are placed in (in degrees, about 5 km)
+SPREAD = 0.045
+# The version of the format of the results
+# Version 2 places the restos by coordinates, and adds the recos of gustos with an origin
+RESULTS_VERSION = 2
+
+
+class NullOutput:
+    """A stream that throws away what is written to it, but counts the characters."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def write(self, text: str) -> int:
+        """Counts the characters of the text and throws it away."""
+        self.count += len(text)
+        return len(text)
+
+    def flush(self) -> None:
+        """Does nothing, since nothing is kept."""
+
+
+def make_resto(rng: random.Random) -> Resto:
+    """Makes the details of a random resto.
+
+    Args:
+        rng (random.Random): the random number generator
+
+    Returns:
+        Resto: the details, with 1 to 3 cuisines, at least one meal type, and coordinates
+            near UPLB gate that the distance is derived from
+    """
+    meal_type = "".join(char for char in "BLD" if rng.random() < 0.5) or "L"
+    return Resto(
+        None,
+        rng.sample(ui.cuisines_list, rng.randint(1, 3)),
+        meal_type,
+        round(rng.uniform(20, 800), 2),
+        round(rng.uniform(1, 5), 1),
+        lat=round(geo.GATE_LAT + rng.uniform(-SPREAD, SPREAD), 6),
+        lon=round(geo.GATE_LON + rng.uniform(-SPREAD, SPREAD), 6),
+    )
+
+
+def make_catalog(size: int, seed: int = SEED) -> dict[str, Resto]:
+    """Makes a catalog of random restos.
+
+    Args:
+        size (int): the number of restos
+        seed (int, optional): the seed of the random number generator. Defaults to SEED.
+
+    Returns:
+        dict[str, Resto]: the dictionary of restos
+    """
+    rng = random.Random(seed)
+    return {f"Resto {number:07d}": make_resto(rng) for number in range(size)}
+
+
+def make_gustos(count: int = GUSTO_COUNT, seed: int = SEED) -> dict[str, Gusto]:
+    """Makes gustos that match from a few to most of the restos of a catalog.
+
+    Every other gusto has ranking weights, so both kinds of recos are timed.
+
+    Args:
+        count (int, optional): the number of gustos. Defaults to GUSTO_COUNT.
+        seed (int, optional): the seed of the random number generator. Defaults to SEED.
+
+    Returns:
+        dict[str, Gusto]: the dictionary of gustos
+    """
+    rng = random.Random(seed)
+    gustos_dict = {}
+    for number in range(count):
+        # Any filter can be left out, like in Add Gusto
+        gustos_dict[f"Gusto {number:02d}"] = Gusto(
+            f"Benchmark gusto {number}",
+            rng.randint(1, 6),
+            rng.choice(list(ui.meal_type_names.values())),
+            rng.choice([None, round(rng.uniform(100, 3000), 2)]),
+            rng.choice([None, round(rng.uniform(100, 5000), 2)]),
+            rng.choice([None, *ui.cuisines_list]),
+            rng.choice([None, round(rng.uniform(1, 4.5), 1)]),
+            list(rk.DEFAULT_WEIGHTS) if number % 2 == 0 else None,
+        )
+    return gustos_dict
+
+
+def make_origin_gustos(gustos_dict: dict[str, Gusto], seed: int = SEED) -> dict[str, Gusto]:
+    """Makes a copy of the gustos that finds the restos within a radius of a random origin.
+
+    Args:
+        gustos_dict (dict[str, Gusto]): the gustos of the workload
+        seed (int, optional): the seed of the random number generator. Defaults to SEED.
+
+    Returns:
+        dict[str, Gusto]: the gustos, each with an origin and a radius of 100 m to 1.5 km
+    """
+    rng = random.Random(seed)
+    origin_gustos = {}
+    for label, details in gustos_dict.items():
+        *predicates, _ = details.predicates()
+        origin = [
+            geo.GATE_LAT + rng.uniform(-SPREAD, SPREAD),
+            geo.GATE_LON + rng.uniform(-SPREAD, SPREAD),
+        ]
+        predicates[3] = round(rng.uniform(100, 1500), 2)
+        origin_gustos[label] = Gusto(details.description, *predicates, details.weights, origin)
+    return origin_gustos
+
+
+def use_data_dir(path: str) -> None:
+    """Points the data files of save_load to another directory.
+
+    Args:
+        path (str): the directory
+    """
+    sl.close_journal()
+    if sl._db is not None:
+        sl._db.close()
+        sl._db = None
+    sl.DATA_PATH = path
+    sl.RESTO_PATH = os.path.join(path, "resto.dat")
+    sl.GUSTO_PATH = os.path.join(path, "gusto.dat")
+    sl.JOURNAL_PATH = os.path.join(path, "journal.dat")
+    sl.OLD_JOURNAL_PATH = os.path.join(path, "journal.old.dat")
+    sl.DB_PATH = os.path.join(path, "resto_reco.db")
+
+
+def time_it(func, repeat: int = REPEAT) -> dict:
+    """Times a function.
+
+    Args:
+        func (Callable[[], object]): the function
+        repeat (int, optional): the number of times it is run. Defaults to REPEAT.
+
+    Returns:
+        dict: the best, median, and mean time (in seconds), and the number of runs
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {
+        "best": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "runs": repeat,
+    }
+
+
+def quiet(func):
+    """Wraps a function that displays a table, so its output is thrown away.
+
+    The table is still formatted and written, and the screen is still cleared,
+    but nothing waits for Enter.
+
+    Args:
+        func (Callable[[], None]): the function
+
+    Returns:
+        Callable[[], None]: the wrapped function
+    """
+
+    def run() -> None:
+        stdout, continue_prompt = sys.stdout, m.continue_prompt
+        sys.stdout, m.continue_prompt = NullOutput(), lambda: None
+        try:
+            func()
+        finally:
+            sys.stdout, m.continue_prompt = stdout, continue_prompt
+
+    return run
+
+
+def bench_storage(
+    restos_dict: dict[str, Resto], gustos_dict: dict[str, Gusto], repeat: int
+) -> dict[str, dict]:
+    """Times saving and loading the restos and gustos with the storage settings of save_load.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+        repeat (int): the number of times each benchmark is run
+
+    Returns:
+        dict[str, dict]: the times of save and load
+    """
+    data_dir = tempfile.mkdtemp(prefix="resto_reco_bench_")
+    try:
+        use_data_dir(data_dir)
+        # SQLite saves every change as it is made, so it is filled once from the .dat files
+        # and saving only commits
+        if sl.STORAGE_BACKEND == "sqlite":
+            sl.save_restos(restos_dict)
+            sl.save_gustos(gustos_dict)
+            sl.get_db()
+        results = {"save": time_it(lambda: sl.save(restos_dict, gustos_dict), repeat)}
+        results["load"] = time_it(lambda: sl.load({}, {}), repeat)
+        return results
+    finally:
+        use_data_dir(data_dir)
+        shutil.rmtree(data_dir)
+
+
+def bench_recos(
+    restos_dict: dict[str, Resto], gustos_dict: dict[str, Gusto], repeat: int
+) -> dict[str, dict]:
+    """Times recommending restos for every gusto of the workload.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+        repeat (int): the number of times each benchmark is run
+
+    Returns:
+        dict[str, dict]: the times of random recos with and without the index, of ranked recos,
+            and of random recos within a radius of an origin with and without the index
+    """
+    gustos = list(gustos_dict.items())
+    ranked = [gusto for gusto in gustos if gusto[1].weights is not None]
+    origin_gustos = list(make_origin_gustos(gustos_dict).items())
+    index = RestoIndex(restos_dict)
+
+    def recommend(index: RestoIndex | None, gustos: list[tuple[str, Gusto]]) -> None:
+        # Each run picks the same recos
+        rng = sp.make_rng(SEED)
+        for gusto in gustos:
+            rc.recommend_restos(restos_dict, gusto, index, rng=rng)
+
+    return {
+        "recommend": time_it(lambda: recommend(None, gustos), repeat),
+        "recommend_indexed": time_it(lambda: recommend(index, gustos), repeat),
+        "recommend_radius": time_it(lambda: recommend(None, origin_gustos), repeat),
+        "recommend_radius_indexed": time_it(lambda: recommend(index, origin_gustos), repeat),
+        "recommend_ranked": time_it(
+            lambda: [rc.recommend_restos_ranked(restos_dict, gusto, index) for gusto in ranked],
+            repeat,
+        ),
+    }
+
+
+def bench_render(
+    restos_dict: dict[str, Resto], gustos_dict: dict[str, Gusto], repeat: int
+) -> dict[str, dict]:
+    """Times rendering the tables of restos, gustos, and recos.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+        repeat (int): the number of times each benchmark is run
+
+    Returns:
+        dict[str, dict]: the times of each table
+    """
+    # The pages are measured again for every run, like when the table is first shown
+    def render_restos(page: int) -> None:
+        with Renderer(NullOutput()) as out:
+            r.restos_pager(restos_dict).render(page, out)
+
+    ranked = [
+        (gusto, rc.recommend_restos_ranked(restos_dict, gusto))
+        for gusto in gustos_dict.items()
+        if gusto[1].weights is not None
+    ]
+
+    def render_recos() -> None:
+        for gusto, recos in ranked:
+            rc.print_recos(
+                gusto, [name for name, _ in recos], restos_dict, [score for _, score in recos]
+            )
+
+    return {
+        "render_restos_first_page": time_it(quiet(lambda: render_restos(0)), repeat),
+        # A page past the end is the last page, so every page before it is measured
+        "render_restos_last_page": time_it(quiet(lambda: render_restos(len(restos_dict))), repeat),
+        "render_gustos": time_it(quiet(lambda: g.display_gustos(gustos_dict)), repeat),
+        "render_recos": time_it(quiet(render_recos), repeat),
+    }
+
+
+def run(sizes: list[int], gusto_count: int, repeat: int, log=None) -> dict:
+    """Runs every benchmark for each catalog size.
+
+    Args:
+        sizes (list[int]): the catalog sizes
+        gusto_count (int): the number of gustos in the workload
+        repeat (int): the number of times each benchmark is run
+        log (TextIO | None, optional): where to write the progress. Defaults to None.
+
+    Returns:
+        dict: the times of each benchmark, by catalog size
+    """
+    results = {}
+    gustos_dict = make_gustos(gusto_count)
+    for size in sizes:
+        if log is not None:
+            print(f"Benchmarking {size} restos...", file=log, flush=True)
+        restos_dict = make_catalog(size)
+        results[str(size)] = {
+            **bench_storage(restos_dict, gustos_dict, repeat),
+            **bench_recos(restos_dict, gustos_dict, repeat),
+            **bench_render(restos_dict, gustos_dict, repeat),
+        }
+    return results
+
+
+def positive_ints(text: str) -> list[int]:
+    """Parses a comma-separated list of positive integers, for argparse.
+
+    Args:
+        text (str): the list, like "1000,100000"
+
+    Raises:
+        argparse.ArgumentTypeError: if an item is not a positive integer
+
+    Returns:
+        list[int]: the integers
+    """
+    try:
+        values = [int(item.replace("_", "")) for item in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text} is not a list of integers")
+    if any(value <= 0 for value in values):
+        raise argparse.ArgumentTypeError("sizes must be greater than 0")
+    return values
+
+
+def main(argv: list[str] | None = None) -> int:
+    """The main function of the benchmarks.
+
+    Args:
+        argv (list[str] | None, optional): the arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: the exit code
+    """
+    parser = argparse.ArgumentParser(description="Benchmark loading, saving, recos, and tables.")
+    parser.add_argument(
+        "--sizes",
+        type=positive_ints,
+        default=SIZES,
+        help=f"the catalog sizes, separated by commas (default: {','.join(map(str, SIZES))})",
+    )
+    parser.add_argument(
+        "--gustos",
+        type=int,
+        default=GUSTO_COUNT,
+        help=f"the number of gustos in the workload (default: {GUSTO_COUNT})",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=REPEAT, help=f"the runs of each benchmark (default: {REPEAT})"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["journal", "text", "sqlite"],
+        default=sl.STORAGE_BACKEND,
+        help="the storage backend (default: RESTO_RECO_STORAGE or journal)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text", "binary"],
+        default=sl.SNAPSHOT_FORMAT,
+        help="the format of resto.dat and gusto.dat (default: RESTO_RECO_FORMAT or text)",
+    )
+    parser.add_argument("--lazy", action="store_true", help="load resto.dat lazily")
+    parser.add_argument("--label", help="a name for the run, like the release")
+    parser.add_argument("-o", "--output", metavar="PATH", help="the file to write (default: stdout)")
+    args = parser.parse_args(argv)
+    if args.gustos <= 0 or args.repeat <= 0:
+        parser.error("--gustos and --repeat must be greater than 0")
+
+    sl.STORAGE_BACKEND = args.backend
+    sl.SNAPSHOT_FORMAT = args.format
+    sl.LAZY_LOADING = args.lazy or sl.LAZY_LOADING
+    # The tables are rendered for the same terminal on every machine
+    # shutil.get_terminal_size reads COLUMNS and LINES before asking the terminal
+    os.environ["COLUMNS"], os.environ["LINES"] = str(COLUMNS), str(LINES)
+    t.refresh()
+
+    report = {
+        "version": RESULTS_VERSION,
+        "label": args.label,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "backend": sl.STORAGE_BACKEND,
+            "format": sl.SNAPSHOT_FORMAT,
+            "lazy": sl.LAZY_LOADING,
+            "gustos": args.gustos,
+            "repeat": args.repeat,
+            "seed": SEED,
+            "terminal": [COLUMNS, LINES],
+        },
+        "results": run(args.sizes, args.gustos, args.repeat, sys.stderr),
+    }
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,459 @@
+"""
+This module contains the command-line interface for getting recos without the menus.
+
+Examples:
+    python cli.py --group-size 2 --meal-type Lunch --budget 500 --cuisine Filipino
+    python cli.py --gusto "Date Night" --gusto "Barkada" --format csv
+    python cli.py --all-gustos --weights 1,1,1,1 -k 5
+    python cli.py --group-size 4 --meal-type Dinner --max-distance 800 --origin 14.1650,121.2400
+    python cli.py --gustos-file queries.dat --seed 7 > recos.json
+
+A gustos file has one gusto per line, in the same format as gusto.dat.
+Recos are written to stdout, and errors to stderr with a nonzero exit code.
+"""
+
+# Standard Library Imports
+import argparse
+import csv
+import json
+import random
+import sys
+
+# Local Module Imports
+import save_load as sl
+import reco as rc
+import sampling as sp
+import user_inputs as ui
+import misc as m
+from records import Gusto, Resto
+from resto_index import RestoIndex
+from sqlite_store import SqliteIndex
+from reco_cache import CachedIndex
+
+# The columns of the CSV output, and the keys of each reco in the JSON output
+FIELDS = [
+    "gusto",
+    "rank",
+    "name",
+    "distance",
+    "cuisines",
+    "meal_types",
+    "cost",
+    "rating",
+    "lat",
+    "lon",
+    "score",
+]
+
+
+def positive_int(value: str) -> int:
+    """Parses an integer that is greater than 0."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be an integer")
+    if number <= 0:
+        raise argparse.ArgumentTypeError("must be greater than 0")
+    return number
+
+
+def positive_float(value: str) -> float:
+    """Parses a decimal number that is greater than 0."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be a decimal number")
+    if number <= 0:
+        raise argparse.ArgumentTypeError("must be greater than 0")
+    return number
+
+
+def meal_type(value: str) -> str:
+    """Parses a meal type, which is "Breakfast", "Lunch", or "Dinner"."""
+    value = value.strip().capitalize()
+    if value not in ["Breakfast", "Lunch", "Dinner"]:
+        raise argparse.ArgumentTypeError("must be either Breakfast, Lunch, or Dinner")
+    return value
+
+
+def cuisine_type(value: str) -> str:
+    """Parses a cuisine from user_inputs.cuisines_list."""
+    value = m.capitalize_words(value.strip())
+    if value not in ui.cuisines_list:
+        raise argparse.ArgumentTypeError(
+            f"must be one of: {', '.join(ui.cuisines_list)}"
+        )
+    return value
+
+
+def rating(value: str) -> float:
+    """Parses a rating from 1 to 5."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be a decimal number")
+    if not 1 <= number <= 5:
+        raise argparse.ArgumentTypeError("must be between 1 and 5")
+    return number
+
+
+def weights(value: str) -> list:
+    """Parses the 4 comma-separated ranking weights."""
+    try:
+        return ui.validate_weights(value.strip())
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err).lower().rstrip("."))
+
+
+def coordinates(value: str) -> list:
+    """Parses a latitude and longitude separated by a comma."""
+    try:
+        return ui.validate_coordinates(value.strip())
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err).lower().rstrip("."))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the parser of the command-line arguments.
+
+    Returns:
+        argparse.ArgumentParser: the parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Get resto recos without the interactive menus.",
+    )
+
+    # The gustos to get recos for
+    # An ad hoc gusto can be given alongside saved gustos and a gustos file
+    source = parser.add_argument_group("gustos")
+    source.add_argument(
+        "--gusto",
+        action="append",
+        default=[],
+        metavar="LABEL",
+        help="the label of a saved gusto (can be repeated)",
+    )
+    source.add_argument(
+        "--all-gustos", action="store_true", help="get recos for every saved gusto"
+    )
+    source.add_argument(
+        "--gustos-file",
+        metavar="PATH",
+        help='a file of gustos in the gusto.dat format, or "-" for stdin',
+    )
+
+    ad_hoc = parser.add_argument_group("ad hoc gusto")
+    ad_hoc.add_argument("--group-size", type=positive_int, help="the number of people")
+    ad_hoc.add_argument("--meal-type", type=meal_type, help="Breakfast, Lunch, or Dinner")
+    ad_hoc.add_argument("--budget", type=positive_float, help="the budget of the group")
+    ad_hoc.add_argument(
+        "--max-distance",
+        type=positive_float,
+        help="the maximum distance from UPLB Gate, or from --origin if given (m)",
+    )
+    ad_hoc.add_argument(
+        "--origin",
+        type=coordinates,
+        metavar="LAT,LON",
+        help="measure the maximum distance from these coordinates instead of UPLB Gate",
+    )
+    ad_hoc.add_argument("--cuisine", type=cuisine_type, help="the cuisine")
+    ad_hoc.add_argument("--min-rating", type=rating, help="the minimum rating (1-5)")
+
+    output = parser.add_argument_group("output")
+    output.add_argument(
+        "--weights",
+        type=weights,
+        metavar="R,D,C,Q",
+        help="rank the recos with these rating, distance, cost, and cuisine weights, "
+        "overriding the weights of every gusto",
+    )
+    output.add_argument(
+        "-k",
+        type=positive_int,
+        default=sp.RECO_COUNT,
+        help=f"the number of recos per gusto (default: {sp.RECO_COUNT})",
+    )
+    output.add_argument(
+        "--seed", type=int, help="the seed for random recos, so they can be reproduced"
+    )
+    output.add_argument(
+        "--format",
+        choices=["json", "csv"],
+        default="json",
+        help="the output format (default: json)",
+    )
+    return parser
+
+
+def check_gusto(gusto: Gusto) -> Gusto:
+    """Checks a gusto from a gustos file with the same rules as the ad hoc gusto arguments.
+
+    Args:
+        gusto (Gusto): the details of the gusto
+
+    Raises:
+        argparse.ArgumentTypeError: if a requirement is invalid, with the name of the requirement
+
+    Returns:
+        Gusto: the details of the gusto, with the meal type and cuisine capitalized like the arguments
+    """
+
+    def check(requirement: str, parse, value):
+        # None means "Any", which is always valid
+        if value is None:
+            return None
+        # The parsers of the arguments take strings, and the lists are comma-separated
+        text = ",".join(map(str, value)) if isinstance(value, list) else str(value)
+        try:
+            return parse(text)
+        except argparse.ArgumentTypeError as err:
+            raise argparse.ArgumentTypeError(f"the {requirement} {err}")
+
+    return Gusto(
+        gusto.description,
+        check("group size", positive_int, gusto.group_size),
+        check("meal type", meal_type, gusto.meal_type),
+        check("budget", positive_float, gusto.budget),
+        check("max distance", positive_float, gusto.max_distance),
+        check("cuisine", cuisine_type, gusto.cuisine_type),
+        check("min rating", rating, gusto.min_rating),
+        check("weights", weights, gusto.weights),
+        check("origin", coordinates, gusto.origin),
+    )
+
+
+def read_gustos_file(path: str) -> list[tuple[str, Gusto]]:
+    """Reads gustos from a file in the gusto.dat format.
+
+    Args:
+        path (str): the path of the file, or "-" for stdin
+
+    Raises:
+        ValueError: if a line is not a valid gusto, with its line number
+
+    Returns:
+        list[tuple[str, Gusto]]: the gustos, as (label, details) tuples
+    """
+    fh = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    gustos = []
+    try:
+        for number, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            try:
+                label, gusto = sl.parse_gusto(line)
+            except ValueError:
+                raise ValueError(f"line {number} is not in the gusto.dat format")
+            try:
+                gustos.append((label, check_gusto(gusto)))
+            except argparse.ArgumentTypeError as err:
+                raise ValueError(f"line {number}: {err}")
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+    return gustos
+
+
+def collect_gustos(
+    args: argparse.Namespace,
+    parser: argparse.ArgumentParser,
+    gustos_dict: dict[str, Gusto],
+) -> list[tuple[str, Gusto]]:
+    """Collects the gustos from the command-line arguments.
+
+    Args:
+        args (argparse.Namespace): the parsed arguments
+        parser (argparse.ArgumentParser): the parser, for reporting errors
+        gustos_dict (dict[str, Gusto]): the dictionary of saved gustos
+
+    Returns:
+        list[tuple[str, Gusto]]: the gustos, as (label, details) tuples
+    """
+    gustos = []
+
+    # An ad hoc gusto needs at least the group size and meal type
+    ad_hoc = [
+        args.budget,
+        args.max_distance,
+        args.cuisine,
+        args.min_rating,
+    ]
+    if args.group_size is not None or args.meal_type is not None:
+        if args.group_size is None or args.meal_type is None:
+            parser.error("an ad hoc gusto needs both --group-size and --meal-type")
+        gustos.append(
+            (
+                None,
+                Gusto(None, args.group_size, args.meal_type, *ad_hoc, origin=args.origin),
+            )
+        )
+    elif any(value is not None for value in ad_hoc) or args.origin is not None:
+        parser.error("an ad hoc gusto needs both --group-size and --meal-type")
+
+    for label in args.gusto:
+        label = m.capitalize_words(label)
+        if label not in gustos_dict:
+            parser.error(f'gusto "{label}" does not exist')
+        gustos.append((label, gustos_dict[label]))
+    if args.all_gustos:
+        gustos += gustos_dict.items()
+    if args.gustos_file is not None:
+        try:
+            gustos += read_gustos_file(args.gustos_file)
+        except OSError as err:
+            parser.error(f"cannot read {args.gustos_file}: {err.strerror}")
+        except ValueError as err:
+            parser.error(f"{args.gustos_file}, {err}")
+
+    if not gustos:
+        parser.error(
+            "no gustos given, use --group-size and --meal-type, --gusto, "
+            "--all-gustos, or --gustos-file"
+        )
+    return gustos
+
+
+def resto_row(name: str, resto: Resto) -> dict:
+    """Converts a resto into a row of plain values, for JSON or CSV.
+
+    Args:
+        name (str): the name of the resto
+        resto (Resto): the details of the resto
+
+    Returns:
+        dict: the name, distance, cuisines, meal types, cost, rating, and coordinates of the resto
+    """
+    return {
+        "name": name,
+        "distance": resto.distance,
+        "cuisines": resto.cuisine_type,
+        "meal_types": resto.meal_type,
+        "cost": resto.cost,
+        "rating": resto.rating,
+        "lat": resto.lat,
+        "lon": resto.lon,
+    }
+
+
+def gusto_to_dict(label: str, gusto: Gusto) -> dict:
+    """Converts a gusto into plain values, for JSON or CSV.
+
+    Args:
+        label (str): the label of the gusto
+        gusto (Gusto): the details of the gusto
+
+    Returns:
+        dict: the label and details of the gusto
+    """
+    return {"label": label, **{slot: getattr(gusto, slot) for slot in Gusto.__slots__}}
+
+
+def get_rows(
+    restos_dict: dict[str, Resto],
+    gustos: list[tuple[str, Gusto]],
+    index: RestoIndex | SqliteIndex | None,
+    k: int = sp.RECO_COUNT,
+    weights: list | None = None,
+    rng: random.Random | None = None,
+):
+    """Yields the recos of every gusto as rows of FIELDS.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos (list[tuple[str, Gusto]]): the gustos, as (label, details) tuples
+        index (RestoIndex | SqliteIndex | None): the index of the restos
+        k (int, optional): the number of recos per gusto. Defaults to sp.RECO_COUNT.
+        weights (list | None, optional): the weights that replace the weights of every gusto. Defaults to None.
+        rng (random.Random | None, optional): the random number generator. Defaults to None.
+
+    Yields:
+        dict: a reco of a gusto
+    """
+    for label, details in gustos:
+        # The given weights replace the weights of the gusto, without changing the saved gusto
+        if weights is not None:
+            # The origin is the last of the predicates, so it is passed after the weights
+            *predicates, origin = details.predicates()
+            details = Gusto(details.description, *predicates, weights, origin)
+        gusto = (label, details)
+        # Same as the menus: ranked recos if the gusto has weights, otherwise random recos
+        if details.weights is not None:
+            recos = rc.recommend_restos_ranked(restos_dict, gusto, index, k)
+        else:
+            recos = [
+                (name, None) for name in rc.recommend_restos(restos_dict, gusto, index, k, rng)
+            ]
+        for rank, (name, score) in enumerate(recos, start=1):
+            yield {
+                "gusto": label,
+                "rank": rank,
+                **resto_row(name, restos_dict[name]),
+                "score": score,
+            }
+
+
+def write_json(rows, out) -> None:
+    """Writes the recos as a JSON array, one reco per line.
+
+    Args:
+        rows (Iterable[dict]): the recos
+        out (TextIO): the stream to write to
+    """
+    out.write("[")
+    for idx, row in enumerate(rows):
+        out.write(",\n" if idx else "\n")
+        out.write(json.dumps(row, ensure_ascii=False))
+    out.write("\n]\n")
+
+
+def write_csv(rows, out) -> None:
+    """Writes the recos as CSV with a header row. Cuisines are separated by ";".
+
+    Args:
+        rows (Iterable[dict]): the recos
+        out (TextIO): the stream to write to
+    """
+    writer = csv.DictWriter(out, fieldnames=FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for row in rows:
+        row["cuisines"] = ";".join(row["cuisines"])
+        row["gusto"] = "" if row["gusto"] is None else row["gusto"]
+        row["score"] = "" if row["score"] is None else row["score"]
+        writer.writerow(row)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """The main function of the command-line interface.
+
+    Args:
+        argv (list[str] | None, optional): the arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: the exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    restos, gustos_dict = sl.load({}, {})
+    gustos = collect_gustos(args, parser, gustos_dict)
+
+    # Building the index takes a pass over the restos, so it only pays off for many gustos
+    # A gustos file often repeats gustos, so their matches are cached
+    index = None
+    if sl.STORAGE_BACKEND == "sqlite":
+        index = CachedIndex(SqliteIndex(sl.get_db()))
+    elif len(gustos) > 1:
+        index = CachedIndex(RestoIndex(restos))
+
+    rows = get_rows(restos, gustos, index, args.k, args.weights, sp.make_rng(args.seed))
+    if args.format == "csv":
+        write_csv(rows, sys.stdout)
+    else:
+        write_json(rows, sys.stdout)
+    sl.close_journal()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
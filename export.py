@@ -0,0 +1,238 @@
+"""
+This module contains the streaming exporters of the restos, gustos, and recos.
+
+Examples:
+    python export.py restos -o restos.csv
+    python export.py restos --format binary -o resto.snapshot
+    python export.py gustos --format jsonl
+    python export.py recos -k 5 --seed 7 -o recos.jsonl
+
+Every row is formatted and written as it is read, so the full output is never
+built in memory. With lazy loading, each resto is parsed only while it is written.
+The format is guessed from the extension of the output, and is CSV for stdout.
+
+Exported restos have the same columns as resto_import.py, so they can be imported
+again. Exported recos have the same columns as cli.py, for every saved gusto, and
+are found in one pass over the restos.
+"""
+
+# Standard Library Imports
+import argparse
+import csv
+import json
+import os
+import sys
+
+# Local Module Imports
+import save_load as sl
+import reco as rc
+import sampling as sp
+import snapshot as snap
+import user_inputs as ui
+import cli
+from records import Gusto, Resto
+from resto_import import FIELDS as RESTO_FIELDS
+
+# The columns of exported gustos
+GUSTO_FIELDS = ["label", *Gusto.__slots__]
+# The size of the buffer of the output file (in bytes)
+BUFFER_SIZE = 1024 * 1024
+
+
+def resto_record(name: str, resto: Resto) -> dict:
+    """Converts a resto into a row that resto_import.py can read.
+
+    Args:
+        name (str): the name of the resto
+        resto (Resto): the details of the resto
+
+    Returns:
+        dict: the name, distance, cuisines, meal types, cost, rating, and coordinates of the resto
+    """
+    return {
+        "name": name,
+        "distance": resto.distance,
+        "cuisines": resto.cuisine_type,
+        "meal_types": [ui.meal_type_names[char] for char in resto.meal_type],
+        "cost": resto.cost,
+        "rating": resto.rating,
+        "lat": resto.lat,
+        "lon": resto.lon,
+    }
+
+
+def resto_rows(restos_dict: dict[str, Resto]):
+    """Yields the restos as rows, one at a time.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary or store of restos
+
+    Yields:
+        dict: a resto
+    """
+    for name, resto in sl.iter_restos(restos_dict):
+        yield resto_record(name, resto)
+
+
+def gusto_rows(gustos_dict: dict[str, Gusto]):
+    """Yields the gustos as rows, one at a time.
+
+    Args:
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+
+    Yields:
+        dict: a gusto
+    """
+    for label, gusto in gustos_dict.items():
+        yield cli.gusto_to_dict(label, gusto)
+
+
+def reco_rows(
+    restos_dict: dict[str, Resto],
+    gustos_dict: dict[str, Gusto],
+    k: int = sp.RECO_COUNT,
+    rng=None,
+):
+    """Yields the recos of every saved gusto, finding them in one pass over the restos.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary or store of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+        k (int, optional): the number of recos per gusto. Defaults to sp.RECO_COUNT.
+        rng (random.Random | None, optional): the random number generator. Defaults to None.
+
+    Yields:
+        dict: a reco of a gusto, with the same keys as cli.FIELDS
+    """
+    gustos = list(gustos_dict.items())
+    recos = rc.recommend_restos_one_pass(sl.iter_restos(restos_dict), gustos, k, rng)
+    for (label, _), gusto_recos in zip(gustos, recos):
+        for rank, (name, resto, score) in enumerate(gusto_recos, start=1):
+            yield {
+                "gusto": label,
+                "rank": rank,
+                **cli.resto_row(name, resto),
+                "score": score,
+            }
+
+
+def write_jsonl(rows, out) -> None:
+    """Writes rows as JSON Lines, one row per line.
+
+    Args:
+        rows (Iterable[dict]): the rows
+        out (TextIO): the stream to write to
+    """
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False))
+        out.write("\n")
+
+
+def write_csv(rows, out, fields: list[str]) -> None:
+    """Writes rows as CSV with a header row. Lists are separated by ";" and None is blank.
+
+    Args:
+        rows (Iterable[dict]): the rows
+        out (TextIO): the stream to write to
+        fields (list[str]): the columns
+    """
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow(
+            [
+                ";".join(map(str, value))
+                if isinstance(value, list)
+                else "" if value is None else value
+                for value in (row[key] for key in fields)
+            ]
+        )
+
+
+def detect_format(path: str | None) -> str:
+    """Guesses the format of the output from its extension.
+
+    Args:
+        path (str | None): the path of the output, or None for stdout
+
+    Returns:
+        str: "jsonl", "binary", or "csv"
+    """
+    extension = os.path.splitext(path)[1].lower() if path is not None else ""
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension in (".snapshot", ".bin"):
+        return "binary"
+    return "csv"
+
+
+def main(argv: list[str] | None = None) -> int:
+    """The main function of the exporter.
+
+    Args:
+        argv (list[str] | None, optional): the arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: the exit code
+    """
+    parser = argparse.ArgumentParser(description="Export the restos, gustos, or recos.")
+    parser.add_argument("what", choices=["restos", "gustos", "recos"], help="what to export")
+    parser.add_argument("-o", "--output", metavar="PATH", help="the file to write (default: stdout)")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl", "binary"],
+        help="the output format (default: guessed from the extension, csv for stdout)",
+    )
+    parser.add_argument(
+        "-k",
+        type=cli.positive_int,
+        default=sp.RECO_COUNT,
+        help=f"the number of recos per gusto (default: {sp.RECO_COUNT})",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="the seed for random recos, so they can be reproduced"
+    )
+    args = parser.parse_args(argv)
+
+    file_format = args.format or detect_format(args.output)
+    if file_format == "binary":
+        # The snapshot is written column by column, so it needs a file it can seek in
+        if args.what == "recos":
+            parser.error("recos cannot be exported as a binary snapshot")
+        if args.output is None:
+            parser.error("a binary snapshot must be written to a file with -o")
+
+    restos, gustos = sl.load({}, {})
+    if file_format == "binary":
+        fh = open(args.output + ".tmp", "wb")
+        if args.what == "restos":
+            snap.write_restos(sl.iter_restos(restos), len(restos), fh)
+        else:
+            fh.write(snap.dump_gustos(gustos))
+        fh.close()
+        os.replace(args.output + ".tmp", args.output)
+    else:
+        out = (
+            open(args.output, "w", encoding="utf-8", newline="", buffering=BUFFER_SIZE)
+            if args.output is not None
+            else sys.stdout
+        )
+        if args.what == "restos":
+            rows, fields = resto_rows(restos), RESTO_FIELDS
+        elif args.what == "gustos":
+            rows, fields = gusto_rows(gustos), GUSTO_FIELDS
+        else:
+            rows = reco_rows(restos, gustos, args.k, sp.make_rng(args.seed))
+            fields = cli.FIELDS
+        if file_format == "csv":
+            write_csv(rows, out, fields)
+        else:
+            write_jsonl(rows, out)
+        if out is not sys.stdout:
+            out.close()
+    sl.close_journal()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+This module contains the coordinates of restos and the spatial index for finding the restos near a place.
+
+A resto can have a latitude and longitude. Its distance from UPLB gate is derived from
+them, so gustos without an origin match it the same way as before. A gusto with an
+origin matches the restos within its maximum distance of the origin instead, and the
+restos without coordinates never match it.
+"""
+
+# Standard Library Imports
+import math
+
+# The approximate coordinates of UPLB gate (in degrees)
+GATE_LAT = 14.1675
+GATE_LON = 121.2433
+# The mean radius of the Earth (in meters)
+EARTH_RADIUS = 6_371_008.8
+# The length of a degree of latitude (in meters)
+METERS_PER_DEGREE = EARTH_RADIUS * math.pi / 180
+# The side of a cell of the spatial grid (in meters of latitude)
+# Most gustos ask for restos within a few hundred meters, so a query visits a handful of cells
+CELL_SIZE = 250.0
+
+
+def distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Gets the great-circle distance between two points with the haversine formula.
+
+    Args:
+        lat1 (float): the latitude of the first point (in degrees)
+        lon1 (float): the longitude of the first point (in degrees)
+        lat2 (float): the latitude of the second point (in degrees)
+        lon2 (float): the longitude of the second point (in degrees)
+
+    Returns:
+        float: the distance (in meters)
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    half_lat = math.sin((phi2 - phi1) / 2)
+    half_lon = math.sin(math.radians(lon2 - lon1) / 2)
+    a = half_lat * half_lat + math.cos(phi1) * math.cos(phi2) * half_lon * half_lon
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def gate_distance(lat: float, lon: float) -> float:
+    """Gets the distance of a point from UPLB gate, as stored in the details of a resto.
+
+    Args:
+        lat (float): the latitude (in degrees)
+        lon (float): the longitude (in degrees)
+
+    Returns:
+        float: the distance (in meters), rounded to 2 decimal places
+    """
+    return round(distance(GATE_LAT, GATE_LON, lat, lon), 2)
+
+
+def within_radius(value, origin: list, radius: float) -> bool:
+    """Checks if a resto is within a radius of an origin.
+
+    Args:
+        value (Resto): the details of the resto
+        origin (list): the latitude and longitude of the origin
+        radius (float): the radius (in meters)
+
+    Returns:
+        bool: whether the resto is within the radius. A resto without coordinates is not.
+    """
+    if value.lat is None:
+        return False
+    return distance(origin[0], origin[1], value.lat, value.lon) <= radius
+
+
+def bounding_box(lat: float, lon: float, radius: float) -> tuple[float, float, float, float]:
+    """Gets the smallest box of latitudes and longitudes that holds a circle.
+
+    The box is widened to every longitude if the circle reaches a pole or crosses
+    the 180th meridian, so no point in the circle is ever outside of it.
+
+    Args:
+        lat (float): the latitude of the center (in degrees)
+        lon (float): the longitude of the center (in degrees)
+        radius (float): the radius of the circle (in meters)
+
+    Returns:
+        tuple[float, float, float, float]: the minimum and maximum latitude, and the minimum and maximum longitude
+    """
+    angle = radius / EARTH_RADIUS
+    lat_span = math.degrees(angle)
+    min_lat, max_lat = lat - lat_span, lat + lat_span
+    if min_lat <= -90 or max_lat >= 90 or angle >= math.pi / 2:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    # The widest point of the circle in longitude is where a meridian touches it
+    sin_angle = math.sin(angle)
+    cos_lat = math.cos(math.radians(lat))
+    if sin_angle >= cos_lat:
+        return min_lat, max_lat, -180.0, 180.0
+    lon_span = math.degrees(math.asin(sin_angle / cos_lat))
+    min_lon, max_lon = lon - lon_span, lon + lon_span
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
+
+
+class GridIndex:
+    """A uniform grid over the coordinates of the restos, for finding the restos within a radius of a point.
+
+    Each point is kept in the square cell of latitudes and longitudes that contains it.
+    A radius query only visits the cells that overlap the bounding box of the circle, and
+    checks the exact distance of the points in them, so it takes time in proportion to the
+    points near the origin rather than to every resto. Unlike a k-d tree, a point is added
+    or removed in O(1), so the grid is kept up to date as restos are edited.
+    """
+
+    def __init__(self, cell_size: float = CELL_SIZE) -> None:
+        """Starts an empty grid.
+
+        Args:
+            cell_size (float, optional): the side of a cell (in meters of latitude). Defaults to CELL_SIZE.
+        """
+        self.cell_degrees = cell_size / METERS_PER_DEGREE
+        # The points of each cell that has any, and the cell of each point
+        self.cells: dict[tuple[int, int], dict[object, tuple[float, float]]] = {}
+        self.keys: dict[object, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def add(self, key, lat: float, lon: float) -> None:
+        """Adds a point, or moves it if it is already in the grid.
+
+        Args:
+            key (Hashable): the key of the point, like the slot of a resto
+            lat (float): the latitude (in degrees)
+            lon (float): the longitude (in degrees)
+        """
+        if key in self.keys:
+            self.remove(key)
+        cell = self._cell(lat, lon)
+        self.cells.setdefault(cell, {})[key] = (lat, lon)
+        self.keys[key] = cell
+
+    def remove(self, key) -> None:
+        """Removes a point. A key that is not in the grid is ignored.
+
+        Args:
+            key (Hashable): the key of the point
+        """
+        cell = self.keys.pop(key, None)
+        if cell is None:
+            return
+        points = self.cells[cell]
+        del points[key]
+        # Empty cells are dropped, so the grid only keeps the cells that have points
+        if not points:
+            del self.cells[cell]
+
+    def query(self, lat: float, lon: float, radius: float):
+        """Yields the keys of the points within a radius of a point.
+
+        Args:
+            lat (float): the latitude of the origin (in degrees)
+            lon (float): the longitude of the origin (in degrees)
+            radius (float): the radius (in meters)
+
+        Yields:
+            Hashable: the key of a point within the radius
+        """
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius)
+        min_row, min_col = self._cell(min_lat, min_lon)
+        max_row, max_col = self._cell(max_lat, max_lon)
+        rows = range(min_row, max_row + 1)
+        cols = range(min_col, max_col + 1)
+
+        # A large circle overlaps more cells than have points, so the cells with points are checked instead
+        if len(rows) * len(cols) > len(self.cells):
+            candidates = [
+                points
+                for (row, col), points in self.cells.items()
+                if row in rows and col in cols
+            ]
+        else:
+            candidates = [
+                self.cells[cell]
+                for cell in ((row, col) for row in rows for col in cols)
+                if cell in self.cells
+            ]
+        for points in candidates:
+            for key, (p_lat, p_lon) in points.items():
+                if distance(lat, lon, p_lat, p_lon) <= radius:
+                    yield key
+
+
+def format_coordinates(lat: float, lon: float) -> str:
+    """Formats a latitude and longitude for display, to about a meter.
+
+    Args:
+        lat (float): the latitude (in degrees)
+        lon (float): the longitude (in degrees)
+
+    Returns:
+        str: the coordinates, like "14.16750, 121.24330"
+    """
+    return f"{lat:.5f}, {lon:.5f}"
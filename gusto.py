@@ -3,36 +3,65 @@ This module contains the functions for adding, editing, deleting, and displaying
 """
 
 # Local Module Imports
+import geo
 import user_inputs as ui
+from input_source import read_line
 from misc import clear_screen, continue_prompt, info, raise_err
 import misc as m
 from colors import C1, C2, CE
 import colors as c
-
-
-def display_gusto_details(gusto: str, gustos_dict: dict[str, list]) -> None:
+import save_load as sl
+from render import Renderer, table_header, table_row
+import terminal as t
+from records import Gusto
+
+# The width of the table of gustos, with the label and description columns at their default widths
+TABLE_WIDTH = 128
+# The default and narrowest width of the label column, which only shrinks
+LABEL_WIDTH = 16
+MIN_LABEL_WIDTH = 10
+# The default, narrowest, and widest width of the description column
+DESCRIPTION_WIDTH = 31
+MIN_DESCRIPTION_WIDTH = 12
+MAX_DESCRIPTION_WIDTH = 60
+
+# The prompt for the ranking weights, which is shared by adding, editing, and ad hoc gustos
+# A gusto with ranking weights gets its recos ranked instead of randomly picked
+WEIGHTS_PROMPT = "  *Enter ranking weights (rating, distance, cost, cuisine): "
+# The prompt for the origin, which the maximum distance is measured from instead of UPLB Gate
+ORIGIN_PROMPT = "  *Enter origin instead of UPLB Gate (latitude, longitude): "
+
+
+def display_gusto_details(gusto: str, gustos_dict: dict[str, Gusto]) -> None:
     """Displays the details of a gusto.
 
     Args:
         gusto (str): the gusto to display
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
     """
     # Get the details of the gusto from the gustos dictionary
-    description = gustos_dict[gusto][0]
-    group_size = gustos_dict[gusto][1]
-    meal_type = gustos_dict[gusto][2].capitalize()
+    details = gustos_dict[gusto]
+    description = details.description
+    group_size = details.group_size
+    meal_type = details.meal_type.capitalize()
     # Using ternary if-else statements to check if the value is None
     # If it is None, display "Any" instead of the value
-    budget = f"₱{gustos_dict[gusto][3]:.2f}" if gustos_dict[gusto][3] != None else "Any"
+    budget = f"₱{details.budget:.2f}" if details.budget != None else "Any"
     max_distance = (
-        f"{gustos_dict[gusto][4]:.2f} meters"
-        if gustos_dict[gusto][4] != None
+        f"{details.max_distance:.2f} meters"
+        if details.max_distance != None
         else "Any"
     )
     cuisine_type = (
-        gustos_dict[gusto][5].capitalize() if gustos_dict[gusto][5] != None else "Any"
+        details.cuisine_type.capitalize() if details.cuisine_type != None else "Any"
+    )
+    min_rating = details.min_rating if details.min_rating != None else "Any"
+    # A gusto without ranking weights gets random recos
+    weights = (
+        ", ".join(f"{weight:g}" for weight in details.weights)
+        if details.weights != None
+        else "None (Random Recos)"
     )
-    min_rating = gustos_dict[gusto][6] if gustos_dict[gusto][6] != None else "Any"
 
     # Display the details of the gusto
     print(f"  {C2}Gusto Label:{CE} {gusto}")
@@ -40,16 +69,22 @@ def display_gusto_details(gusto: str, gustos_dict: dict[str, list]) -> None:
     print(f"  {C2}Number of People:{CE} {group_size}")
     print(f"  {C2}Meal Type:{CE} {meal_type}")
     print(f"  {C2}Budget:{CE} {budget}")
-    print(f"  {C2}Maximum Distance from UPLB Gate:{CE} {max_distance}")
+    # A gusto with an origin measures the maximum distance from it instead of UPLB Gate
+    if details.origin != None:
+        print(f"  {C2}Maximum Distance from Origin:{CE} {max_distance}")
+        print(f"  {C2}Origin:{CE} {geo.format_coordinates(*details.origin)}")
+    else:
+        print(f"  {C2}Maximum Distance from UPLB Gate:{CE} {max_distance}")
     print(f"  {C2}Cuisine Type:{CE} {cuisine_type}")
     print(f"  {C2}Minimum Rating:{CE} {min_rating}")
+    print(f"  {C2}Ranking Weights:{CE} {weights}")
 
 
-def view_gusto(gustos_dict: dict[str, list]) -> None:
+def view_gusto(gustos_dict: dict[str, Gusto]) -> None:
     """Displays the details of a gusto.
 
     Args:
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
     """
 
     # Raise an error if there are no gustos in the gustos dictionary
@@ -68,7 +103,7 @@ def view_gusto(gustos_dict: dict[str, list]) -> None:
 
     # Prompt the user to enter the gusto to view
     # Raise an error if the gusto does not exist
-    gusto = m.capitalize_words(input("  Enter gusto label: ").strip())
+    gusto = m.capitalize_words(read_line("  Enter gusto label: ").strip())
     if gusto not in gustos_dict:
         raise_err(f'Gusto "{gusto}" does not exist!')
         return
@@ -87,7 +122,7 @@ def view_gusto(gustos_dict: dict[str, list]) -> None:
     continue_prompt()
 
 
-def ad_hoc_gusto() -> tuple[str, list]:
+def ad_hoc_gusto() -> tuple[None, Gusto]:
     """Prompts the user to enter the attributes of a gusto.
 
     Returns:
@@ -108,15 +143,17 @@ def ad_hoc_gusto() -> tuple[str, list]:
     meal_type = ui.get_meal_type("  Enter meal type (Breakfast, Lunch, or Dinner): ")
     budget = ui.get_float("  *Enter budget: ", False)
     max_distance = ui.get_float("  *Enter maximum distance from UPLB: ", False)
+    origin = ui.get_coordinates(ORIGIN_PROMPT, False)
     ui.print_valid_cuisines()
     cuisine_type = ui.get_cuisine_type("  *Enter cuisine type: ", False)
     min_rating = ui.get_rating("  *Enter minimum rating (1-5): ", False)
+    weights = ui.get_weights(WEIGHTS_PROMPT, False)
 
     # Return a tuple containing the attributes of the gusto
     # None is used as a placeholder for the label and description
     return (
         None,
-        [
+        Gusto(
             None,
             group_size,
             meal_type,
@@ -124,18 +161,20 @@ def ad_hoc_gusto() -> tuple[str, list]:
             max_distance,
             cuisine_type,
             min_rating,
-        ],
+            weights,
+            origin,
+        ),
     )
 
 
-def add_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
+def add_gustos(gustos_dict: dict[str, Gusto]) -> dict[str, Gusto]:
     """Adds a gusto to the gustos dictionary.
 
     Args:
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
 
     Returns:
-        dict[str, list]: the updated dictionary of gustos that includes the new gusto
+        dict[str, Gusto]: the updated dictionary of gustos that includes the new gusto
     """
     clear_screen()
     print(
@@ -157,12 +196,14 @@ def add_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
     meal_type = ui.get_meal_type("  Enter meal type (Breakfast, Lunch, or Dinner): ")
     budget = ui.get_float("  *Enter group budget: ", False)
     max_distance = ui.get_float("  *Enter maximum distance from UPLB Gate (m): ", False)
+    origin = ui.get_coordinates(ORIGIN_PROMPT, False)
     ui.print_valid_cuisines()
     cuisine_type = ui.get_cuisine_type("  *Enter cuisine: ", False)
     min_rating = ui.get_rating("  *Enter minimum rating (1-5): ", False)
+    weights = ui.get_weights(WEIGHTS_PROMPT, False)
 
     # Add the gusto to the gustos dictionary
-    gustos_dict[label] = [
+    gustos_dict[label] = Gusto(
         description,
         group_size,
         meal_type,
@@ -170,20 +211,23 @@ def add_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
         max_distance,
         cuisine_type,
         min_rating,
-    ]
+        weights,
+        origin,
+    )
+    sl.put("gusto", label, gustos_dict[label])
     info(f'Added Gusto "{label}"')
     continue_prompt()
     return gustos_dict
 
 
-def edit_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
+def edit_gustos(gustos_dict: dict[str, Gusto]) -> dict[str, Gusto]:
     """Edits a gusto in the gustos dictionary.
 
     Args:
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
 
     Returns:
-        dict[str, list]: the updated dictionary of gustos which has the gusto edited
+        dict[str, Gusto]: the updated dictionary of gustos which has the gusto edited
     """
 
     # Raise an error if there are no gustos in the gustos dictionary
@@ -202,7 +246,7 @@ def edit_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
 
     # Prompt the user to enter the gusto to edit
     # Raise an error if the gusto does not exist
-    label = m.capitalize_words(input("  Enter gusto label: "))
+    label = m.capitalize_words(read_line("  Enter gusto label: "))
     if label not in gustos_dict:
         raise_err(f'Gusto "{label}" does not exist!')
         return gustos_dict
@@ -210,15 +254,16 @@ def edit_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
     # Setting previous_label to label to check if the label was changed
     # Get the details of the gusto from the gustos dictionary
     previous_label = label
-    (
-        description,
-        group_size,
-        meal_type,
-        budget,
-        max_distance,
-        cuisine_type,
-        min_rating,
-    ) = gustos_dict[label]
+    details = gustos_dict[label]
+    description = details.description
+    group_size = details.group_size
+    meal_type = details.meal_type
+    budget = details.budget
+    max_distance = details.max_distance
+    cuisine_type = details.cuisine_type
+    min_rating = details.min_rating
+    weights = details.weights
+    origin = details.origin
     clear_screen()
     print(
         "═══════════════════════════════════════════════════\n",
@@ -249,6 +294,7 @@ def edit_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
         max_distance,
         False,
     )
+    origin = ui.edit_coordinates(ORIGIN_PROMPT, origin, False)
     ui.print_valid_cuisines()
     cuisine_type = ui.edit_cuisine_type(
         "  *Enter cuisine: ",
@@ -260,9 +306,10 @@ def edit_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
         min_rating,
         False,
     )
+    weights = ui.edit_weights(WEIGHTS_PROMPT, weights, False)
 
     # Update the details of the gusto in the gustos dictionary
-    gustos_dict[label] = [
+    gustos_dict[label] = Gusto(
         description,
         group_size,
         meal_type,
@@ -270,7 +317,10 @@ def edit_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
         max_distance,
         cuisine_type,
         min_rating,
-    ]
+        weights,
+        origin,
+    )
+    sl.put("gusto", label, gustos_dict[label])
 
     # Display a message depending on whether the label was changed or not
     if previous_label != label:
@@ -281,18 +331,19 @@ def edit_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
     # Delete the old gusto if the label was changed
     if label != previous_label:
         del gustos_dict[previous_label]
+        sl.delete("gusto", previous_label)
     continue_prompt()
     return gustos_dict
 
 
-def delete_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
+def delete_gustos(gustos_dict: dict[str, Gusto]) -> dict[str, Gusto]:
     """Deletes a gusto from the gustos dictionary.
 
     Args:
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
 
     Returns:
-        dict[str, list]: the updated dictionary of gustos which has the gusto deleted
+        dict[str, Gusto]: the updated dictionary of gustos which has the gusto deleted
     """
     # Raise an error if there are no gustos in the gustos dictionary
     if not gustos_dict:
@@ -311,7 +362,7 @@ def delete_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
 
     # Prompt the user to enter the gusto to delete
     # Raise an error if the gusto does not exist
-    label = m.capitalize_words(input("  Enter gusto label: "))
+    label = m.capitalize_words(read_line("  Enter gusto label: "))
     print("═══════════════════════════════════════════════════")
     if label not in gustos_dict:
         raise_err(f'Gusto "{label}" does not exist!')
@@ -331,9 +382,10 @@ def delete_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
     print(f"{c.RED}  Are you sure you want to delete {label}?{c.END}")
     print(f"  [Y] Yes")
     print(f"  [Any Key] No")
-    choice = m.capitalize_words(input("  Enter choice: "))
+    choice = m.capitalize_words(read_line("  Enter choice: "))
     if choice == "Y":
         del gustos_dict[label]
+        sl.delete("gusto", label)
         info(f'Deleted Gusto "{label}"')
         continue_prompt()
     else:
@@ -343,89 +395,112 @@ def delete_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
     return gustos_dict
 
 
-def display_gustos_simple(gustos_dict: dict[str, list]) -> None:
+def display_gustos_simple(gustos_dict: dict[str, Gusto]) -> None:
     """Displays the gusto labels and their descriptions.
 
     Args:
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
     """
     # Raise an error if there are no gustos in the gustos dictionary
     if not gustos_dict:
         raise_err("No gustos to display! Add a gusto!")
         return
-    print(
-        "═══════════════════════════════════════════════════\n",
-        f"{C1}                       Gustos                     {CE}\n",
-        "═══════════════════════════════════════════════════\n",
-        f"{C2}{c.ITALIC}             Label              Description       {CE}\n",
-        "───────────────────────────────────────────────────\n",
-        sep="",
-        end="",
-    )
-    # Loop through the gustos dictionary and display the gusto labels and descriptions
-    for gusto in gustos_dict:
-        # Truncate the label and description if they are too long
-        label = gusto if len(gusto) <= 27 else gusto[:24] + "..."
-        description = (
-            gustos_dict[gusto][0]
-            if len(gustos_dict[gusto][0]) <= 18
-            else gustos_dict[gusto][0][:15] + "..."
+    with Renderer() as out:
+        out.write(
+            "═══════════════════════════════════════════════════\n",
+            f"{C1}                       Gustos                     {CE}\n",
+            "═══════════════════════════════════════════════════\n",
+            f"{C2}{c.ITALIC}             Label              Description       {CE}\n",
+            "───────────────────────────────────────────────────\n",
         )
-        print(f"  {label:<27}   {description:<41}  ")
-
-
-def display_gustos(gustos_dict: dict[str, list]) -> None:
+        # Loop through the gustos dictionary and display the gusto labels and descriptions
+        for gusto in gustos_dict:
+            # Truncate the label and description if they are too long
+            label = gusto if len(gusto) <= 27 else gusto[:24] + "..."
+            details = gustos_dict[gusto]
+            description = (
+                details.description
+                if len(details.description) <= 18
+                else details.description[:15] + "..."
+            )
+            out.line(f"  {label:<27}   {description:<41}  ")
+
+
+def display_gustos(gustos_dict: dict[str, Gusto]) -> None:
     """Displays the gustos in the gustos dictionary.
 
     Args:
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
     """
     # Raise an error if there are no gustos in the gustos dictionary
     if not gustos_dict:
         raise_err("No gustos to display! Add a gusto!")
         return
     clear_screen()
-    print(
-        "════════════════════════════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
-        f"{C1}                                                             Gustos                                                            {CE}\n",
-        "════════════════════════════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
-        f"{C2}{c.ITALIC}       Label                   Description              #     Meal Type      Budget      Distance         Cuisine       Rating  {CE}\n",
-        "────────────────────────────────────────────────────────────────────────────────────────────────────────────────────────────────\n",
-        sep="",
-        end="",
+    # The description column, then the label column, shrink or grow to fit the terminal
+    description_width = t.flex_width(
+        TABLE_WIDTH, DESCRIPTION_WIDTH, MIN_DESCRIPTION_WIDTH, MAX_DESCRIPTION_WIDTH
     )
-    # Loop through the gustos dictionary and display the details of the gustos
-    for gusto in gustos_dict:
-        # Truncate the label and description if they are too long
-        label = gusto if len(gusto) <= 16 else gusto[:13] + "..."
-        description = (
-            gustos_dict[gusto][0]
-            if len(gustos_dict[gusto][0]) <= 31
-            else gustos_dict[gusto][0][:28] + "..."
-        )
-        group_size = gustos_dict[gusto][1]
-        meal_type = gustos_dict[gusto][2].capitalize()
-        # Using ternary if-else statements to check if the value is None
-        # If it is None, display "Any" instead of the value
-        budget = (
-            f"₱{gustos_dict[gusto][3]:.2f}" if gustos_dict[gusto][3] != None else "Any"
-        )
-        max_distance = (
-            f"{gustos_dict[gusto][4]:.2f}m" if gustos_dict[gusto][4] != None else "Any"
-        )
-        cuisine_type = (
-            m.capitalize_words(gustos_dict[gusto][5])
-            if gustos_dict[gusto][5] != None
-            else "Any"
-        )
-        min_rating = (
-            f"{gustos_dict[gusto][6]:.1f}" if gustos_dict[gusto][6] != None else "Any"
-        )
-
-        # Display the details of the gusto
-        print(
-            f"  {label:<16}   {description:<31}   {group_size:^3}   {meal_type:^11}   {budget:>10}   {max_distance:>10}   {cuisine_type:^16}   {min_rating:^6}  "
-        )
-    print(
-        "════════════════════════════════════════════════════════════════════════════════════════════════════════════════════════════════"
+    label_width = t.flex_width(
+        TABLE_WIDTH + description_width - DESCRIPTION_WIDTH, LABEL_WIDTH, MIN_LABEL_WIDTH, LABEL_WIDTH
+    )
+    header, footer = table_header(
+        "Gustos",
+        [
+            ("Label", label_width),
+            ("Description", description_width),
+            ("#", 3),
+            ("Meal Type", 11),
+            ("Budget", 10),
+            ("Distance", 10),
+            ("Cuisine", 16),
+            ("Rating", 6),
+        ],
     )
+    with Renderer() as out:
+        out.write(header)
+        # Loop through the gustos dictionary and display the details of the gustos
+        for gusto in gustos_dict:
+            # Truncate the label and description if they are too long
+            label = gusto if len(gusto) <= label_width else gusto[: label_width - 3] + "..."
+            details = gustos_dict[gusto]
+            description = (
+                details.description
+                if len(details.description) <= description_width
+                else details.description[: description_width - 3] + "..."
+            )
+            group_size = details.group_size
+            meal_type = details.meal_type.capitalize()
+            # Using ternary if-else statements to check if the value is None
+            # If it is None, display "Any" instead of the value
+            budget = (
+                f"₱{details.budget:.2f}" if details.budget != None else "Any"
+            )
+            max_distance = (
+                f"{details.max_distance:.2f}m" if details.max_distance != None else "Any"
+            )
+            cuisine_type = (
+                m.capitalize_words(details.cuisine_type)
+                if details.cuisine_type != None
+                else "Any"
+            )
+            min_rating = (
+                f"{details.min_rating:.1f}" if details.min_rating != None else "Any"
+            )
+
+            # Display the details of the gusto
+            out.line(
+                table_row(
+                    [
+                        (label, label_width, "<"),
+                        (description, description_width, "<"),
+                        (group_size, 3, "^"),
+                        (meal_type, 11, "^"),
+                        (budget, 10, ">"),
+                        (max_distance, 10, ">"),
+                        (cuisine_type, 16, "^"),
+                        (min_rating, 6, "^"),
+                    ]
+                )
+            )
+        out.write(footer)
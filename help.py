@@ -4,6 +4,7 @@ This module contains the functions that display the help menu.
 
 # Local Module Imports
 from misc import clear_screen, continue_prompt, raise_err
+from input_source import read_line
 from colors import C1, C2, CE, CD
 
 
@@ -20,6 +21,7 @@ def help_screen() -> None:
         "  3   Get Recos                                    \n",
         "  A   About                                        \n",
         f"  {C1}H   Help{CD}                                         \n",
+        "  S   Stats                                        \n",
         "  X   Exit                                         \n",
         "═══════════════════════════════════════════════════\n",
         f"{CE}",
@@ -39,7 +41,7 @@ def help_screen() -> None:
         sep="",
         end="",
     )
-    choice = input("  Enter choice: ")
+    choice = read_line("  Enter choice: ")
     match choice:
         case "1":
             help_gustos()
@@ -66,6 +68,7 @@ def help_gustos() -> None:
         "  3   Get Recos                                    \n",
         "  A   About                                        \n",
         f"  {C1}H   Help{CD}                                         \n",
+        "  S   Stats                                        \n",
         "  X   Exit                                         \n",
         "═══════════════════════════════════════════════════\n",
         f"{CE}",
@@ -96,8 +99,10 @@ def help_gustos() -> None:
         "  Meal Type = the meal type the gusto is for (breakfast, lunch, dinner)    \n",
         "  Budget = the budget of the gusto (in pesos)                              \n",
         "  Max Distance = the maximum distance of the resto from UPLB gate          \n",
+        "  Origin = where the max distance is from instead (latitude, longitude)    \n",
         "  Cuisine Type = the type of cuisine the resto serves                      \n",
         "  Min Rating = the minimum rating of the resto                             \n",
+        "  Weights = the weights for ranking recos (rating, distance, cost, cuisine)\n",
         "═══════════════════════════════════════════════════════════════════════════\n",
         sep="",
         end="",
@@ -118,6 +123,7 @@ def help_restos() -> None:
         "  3   Get Recos                                    \n",
         "  A   About                                        \n",
         f"  {C1}H   Help{CD}                                         \n",
+        "  S   Stats                                        \n",
         "  X   Exit                                         \n",
         "═══════════════════════════════════════════════════\n",
         f"{CE}",
@@ -148,6 +154,7 @@ def help_restos() -> None:
         "  Meal Type = the meal types the resto serves (breakfast, lunch, dinner)   \n",
         "  Cost = the average cost of a meal in the resto                           \n",
         "  Rating = the average rating of the resto                                 \n",
+        "  Coordinates = the latitude and longitude, which set the distance         \n",
         "═══════════════════════════════════════════════════════════════════════════\n",
         sep="",
         end="",
@@ -168,6 +175,7 @@ def help_recos() -> None:
         "  3   Get Recos                                    \n",
         "  A   About                                        \n",
         f"  {C1}H   Help{CD}                                         \n",
+        "  S   Stats                                        \n",
         "  X   Exit                                         \n",
         "═══════════════════════════════════════════════════\n",
         f"{CE}",
@@ -193,6 +201,8 @@ def help_recos() -> None:
         f"  {C1}Recos{CE} are dining place/s recommended by the program based on the user's  \n",
         "  preferences. The program will recommend resto/s that are within the      \n",
         '  "gustos" or preference profile of the user.                              \n',
+        "  Gustos with ranking weights get their best resto/s ranked by score,      \n",
+        "  otherwise the resto/s are picked at random from the matches.             \n",
         "═══════════════════════════════════════════════════════════════════════════\n",
         sep="",
         end="",
@@ -0,0 +1,192 @@
+"""
+This module contains the sources of the user's answers to the prompts.
+
+Every prompt of the program reads its answer with read_line, and continue_prompt
+with read_hidden, so the answers can come from somewhere other than the keyboard:
+- TerminalInput reads them from the keyboard, with input() and getpass
+- ScriptedInput replays a script of answers at full speed, without clearing the screen
+- RecordingInput passes the answers of another source through, and writes them to a script
+
+A script is a text file with one answer per line, exactly as it would be typed,
+so a blank line is pressing Enter. Recording a session makes a script that
+replays it:
+
+    python tabamo_project.py --record session.txt
+    python tabamo_project.py --replay session.txt --quiet
+"""
+
+# Standard Library Imports
+import getpass
+import sys
+
+
+class TerminalInput:
+    """Reads the answers from the keyboard."""
+
+    # Whether the screen is cleared between menus
+    clears_screen = True
+
+    def read_line(self, prompt: str) -> str:
+        """Shows a prompt and reads the answer.
+
+        Args:
+            prompt (str): the prompt
+
+        Returns:
+            str: the answer, without the newline
+        """
+        return input(prompt)
+
+    def read_hidden(self, prompt: str) -> str:
+        """Shows a prompt and reads the answer without showing what is typed.
+
+        Args:
+            prompt (str): the prompt
+
+        Returns:
+            str: the answer, without the newline
+        """
+        return getpass.getpass(prompt)
+
+
+class ScriptedInput:
+    """Replays a script of answers, one per prompt, and counts them.
+
+    The prompt and the answer are written to the output like they would appear
+    in the terminal. When the script runs out, EOFError is raised, like input()
+    at the end of a file.
+    """
+
+    clears_screen = False
+
+    def __init__(self, answers, out=None) -> None:
+        """Prepares the script.
+
+        Args:
+            answers (Iterable[str]): the answers, with or without newlines
+            out (TextIO, optional): where the prompts and answers are written. Defaults to sys.stdout when read.
+        """
+        self.answers = iter(answers)
+        self.out = out
+        self.count = 0
+
+    def read_line(self, prompt: str) -> str:
+        """Shows a prompt and replays the next answer.
+
+        Args:
+            prompt (str): the prompt
+
+        Raises:
+            EOFError: if the script has no more answers
+
+        Returns:
+            str: the answer, without the newline
+        """
+        answer = next(self.answers, None)
+        if answer is None:
+            raise EOFError(f"the script ended after {self.count} answers")
+        answer = answer.rstrip("\r\n")
+        self.count += 1
+        out = self.out if self.out is not None else sys.stdout
+        out.write(f"{prompt}{answer}\n")
+        return answer
+
+    def read_hidden(self, prompt: str) -> str:
+        """Shows a prompt and replays the next answer, the same as read_line.
+
+        Args:
+            prompt (str): the prompt
+
+        Returns:
+            str: the answer, without the newline
+        """
+        return self.read_line(prompt)
+
+
+class RecordingInput:
+    """Reads the answers from another source, and writes each one to a script."""
+
+    def __init__(self, source, fh) -> None:
+        """Starts recording.
+
+        Args:
+            source (TerminalInput | ScriptedInput): where the answers come from
+            fh (TextIO): the script, which is flushed after every answer so a crash keeps it
+        """
+        self.source = source
+        self.fh = fh
+        self.clears_screen = source.clears_screen
+
+    def _record(self, answer: str) -> str:
+        self.fh.write(answer + "\n")
+        self.fh.flush()
+        return answer
+
+    def read_line(self, prompt: str) -> str:
+        """Shows a prompt, reads the answer from the source, and records it.
+
+        Args:
+            prompt (str): the prompt
+
+        Returns:
+            str: the answer, without the newline
+        """
+        return self._record(self.source.read_line(prompt))
+
+    def read_hidden(self, prompt: str) -> str:
+        """Shows a prompt, reads the hidden answer from the source, and records it.
+
+        Args:
+            prompt (str): the prompt
+
+        Returns:
+            str: the answer, without the newline
+        """
+        return self._record(self.source.read_hidden(prompt))
+
+
+# Where the answers come from
+source: TerminalInput | ScriptedInput | RecordingInput = TerminalInput()
+
+
+def use(new_source: TerminalInput | ScriptedInput | RecordingInput) -> None:
+    """Changes where the answers come from.
+
+    Args:
+        new_source (TerminalInput | ScriptedInput | RecordingInput): the source
+    """
+    global source
+    source = new_source
+
+
+def read_line(prompt: str = "") -> str:
+    """Shows a prompt and reads the answer from the current source, like input().
+
+    Args:
+        prompt (str, optional): the prompt. Defaults to "".
+
+    Returns:
+        str: the answer, without the newline
+    """
+    return source.read_line(prompt)
+
+
+def read_hidden(prompt: str = "") -> str:
+    """Shows a prompt and reads the answer from the current source without showing it, like getpass.
+
+    Args:
+        prompt (str, optional): the prompt. Defaults to "".
+
+    Returns:
+        str: the answer, without the newline
+    """
+    return source.read_hidden(prompt)
+
+
+def clears_screen() -> bool:
+    """Checks if the screen should be cleared between menus.
+
+    Returns:
+        bool: False while a script is replayed
+    """
+    return source.clears_screen
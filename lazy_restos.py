@@ -0,0 +1,120 @@
+"""
+This module contains a dictionary of restos that parses each resto only when it is used.
+"""
+
+# Standard Library Imports
+import mmap
+import os
+import re
+from collections.abc import MutableMapping
+
+# Local Module Imports
+from records import Resto
+
+# Matches the name at the start of each line of resto.dat
+NAME_PATTERN = re.compile(rb"^([^~\n]*)~", re.MULTILINE)
+
+
+class LazyRestos(MutableMapping):
+    """A dictionary of restos backed by a memory-mapped resto.dat.
+
+    At startup, only the name and line offset of each resto is read.
+    A resto is parsed into its details the first time it is used.
+    Added and edited restos are kept in memory like in a normal dictionary.
+
+    On Windows, a file that is memory-mapped cannot be replaced when resto.dat
+    is saved, so the file is read into memory instead. Restos are still
+    parsed only when they are used.
+    """
+
+    def __init__(self, path: str, parse_line) -> None:
+        """Maps resto.dat and finds the offset of each resto.
+
+        Args:
+            path (str): the path of resto.dat
+            parse_line (Callable[[str], tuple[str, Resto]]): parses a line into a name and details
+        """
+        self.parse_line = parse_line
+        self.data: bytes | mmap.mmap = b""
+        fh = open(path, "rb")
+        if os.path.getsize(path) > 0:
+            if os.name == "nt":
+                self.data = fh.read()
+            else:
+                self.data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        fh.close()
+
+        # Each entry is either the offset of an unparsed line, or the parsed details
+        self.entries: dict[str, int | Resto] = {}
+        for match in NAME_PATTERN.finditer(self.data):
+            self.entries[match.group(1).decode("utf-8")] = match.start()
+
+    def _line(self, offset: int) -> str:
+        """Reads the line of resto.dat at an offset, including the newline."""
+        end = self.data.find(b"\n", offset)
+        end = len(self.data) if end == -1 else end + 1
+        return self.data[offset:end].decode("utf-8")
+
+    def __getitem__(self, name: str) -> Resto:
+        entry = self.entries[name]
+        if isinstance(entry, int):
+            _, entry = self.parse_line(self._line(entry))
+            self.entries[name] = entry
+        return entry
+
+    def __setitem__(self, name: str, value: Resto) -> None:
+        self.entries[name] = value
+
+    def __delitem__(self, name: str) -> None:
+        del self.entries[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def copy(self) -> "LazyRestos":
+        """Makes a shallow copy that shares the mapped file, without parsing any resto.
+
+        Returns:
+            LazyRestos: the copy
+        """
+        duplicate = LazyRestos.__new__(LazyRestos)
+        duplicate.parse_line = self.parse_line
+        duplicate.data = self.data
+        duplicate.entries = self.entries.copy()
+        return duplicate
+
+    def iter_lines(self, format_line):
+        """Yields the lines of resto.dat. Unparsed restos are copied as they are.
+
+        Args:
+            format_line (Callable[[str, Resto], str]): formats a name and details into a line
+
+        Yields:
+            str: a line, including the newline
+        """
+        for name, entry in self.entries.items():
+            if isinstance(entry, int):
+                line = self._line(entry)
+                yield line if line.endswith("\n") else line + "\n"
+            else:
+                yield format_line(name, entry)
+
+    def iter_items(self):
+        """Yields the names and details of the restos without keeping the parsed details.
+
+        This is for reading every resto once, like exporting them, so the restos are
+        parsed one at a time and memory does not grow as they are read.
+
+        Yields:
+            tuple[str, Resto]: the name and details of a resto
+        """
+        for name, entry in self.entries.items():
+            if isinstance(entry, int):
+                _, entry = self.parse_line(self._line(entry))
+            yield name, entry
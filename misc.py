@@ -4,26 +4,43 @@ This module contains miscellaneous functions.
 
 # Standard Library Imports
 import os
-import getpass
+import sys
 
 # Local Module Imports
 import colors as c
+from input_source import clears_screen, read_hidden
+import terminal as t
+
+# The smallest terminal the widest table fits in at its narrowest, the recos with scores
+MIN_COLUMNS = 111
+# The smallest terminal the menus and help screens fit in
+MIN_LINES = 25
+# The number of times the screen was cleared, so a Screen knows when to redraw everything
+clear_count = 0
+# Moves the cursor to the top left, then clears the screen and the scrollback
+CLEAR_SEQUENCE = "\033[H\033[2J\033[3J"
 
 
 def clear_screen() -> None:
-    """Clears the screen, depending on the OS."""
+    """Clears the screen with ANSI escape sequences."""
 
-    # Uses the cls command if the OS is Windows, otherwise uses the clear command
-    # This is for compatibility with cmd, which doesn't support clear.
-    os.system("cls" if os.name == "nt" else "clear")
+    # Writing the escape sequences is much faster than running cls or clear in a new process
+    # load_colors turns on ANSI escape sequences on Windows, so this also works in cmd
+    global clear_count
+    clear_count += 1
+    # A replayed script keeps everything on the screen, so it can be read back
+    if not clears_screen():
+        return
+    sys.stdout.write(CLEAR_SEQUENCE)
+    sys.stdout.flush()
 
 
 def continue_prompt() -> None:
     """Prompts the user to press enter to continue."""
 
-    # Uses the getpass module to hide the input of the user.
+    # Hides the input of the user, like getpass.
     # This is to prevent the user from seeing the input and to simulate a pause.
-    getpass.getpass(f"{c.BOLD}{c.BLINK2}  Press Enter to continue...{c.END}")
+    read_hidden(f"{c.BOLD}{c.BLINK2}  Press Enter to continue...{c.END}")
     clear_screen()
 
 
@@ -63,22 +80,24 @@ def check_window_size() -> None:
     """Checks if the window size is the intended size."""
 
     # Since displayed tables can be quite large, we need to ensure that the window size is large enough to display the table.
-    # This function checks if the window size is large enough to display the table.
+    # The tables fit their widest columns to the terminal, so this only checks that they fit at their narrowest.
     while True:
         clear_screen()
-        current_size_cols = os.get_terminal_size().columns
-        current_size_rows = os.get_terminal_size().lines
-        if current_size_cols < 128 or current_size_rows < 25:
+        # The size is queried again here, since the user may have just resized the window
+        window_size = t.refresh()
+        current_size_cols = window_size.columns
+        current_size_rows = window_size.lines
+        if current_size_cols < MIN_COLUMNS or current_size_rows < MIN_LINES:
             message = (
                 f"{c.C1}═══════════════════════════════════════════════════\n"
                 "        Please resize your window to ensure        \n"
                 "          you get the intended experience          \n"
                 f"═══════════════════════════════════════════════════{c.CE}\n"
             )
-            if current_size_cols < 128:
-                message += f"{c.RED}  Columns: {current_size_cols} < 128 {c.CE}\n"
-            if current_size_rows < 25:
-                message += f"{c.RED}  Rows: {current_size_rows} < 25 {c.CE}\n"
+            if current_size_cols < MIN_COLUMNS:
+                message += f"{c.RED}  Columns: {current_size_cols} < {MIN_COLUMNS} {c.CE}\n"
+            if current_size_rows < MIN_LINES:
+                message += f"{c.RED}  Rows: {current_size_rows} < {MIN_LINES} {c.CE}\n"
             print("".join(message), end="")
             continue_prompt()
         else:
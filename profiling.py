@@ -0,0 +1,136 @@
+"""
+This module contains the profiling mode, which runs the program under cProfile and tracemalloc.
+
+Start it with:
+    python tabamo_project.py --profile
+
+When the program exits, the reports are written to the data directory, named by the
+time the profiling started:
+- profile-<time>.prof: the time of every function, for pstats or a viewer like snakeviz
+- profile-<time>.txt: the slowest functions, the memory allocated per call of the
+  loaders, savers, and recos (see stats.py), and the lines with the most memory
+  still allocated at exit
+- memory-<time>-load.snapshot and memory-<time>-exit.snapshot: the memory allocated
+  after loading and at exit, for tracemalloc.Snapshot.load and Snapshot.compare_to
+
+Both profilers slow the program down, so the times are only good for comparing functions.
+"""
+
+# Standard Library Imports
+import cProfile
+import datetime
+import io
+import os
+import pstats
+import tracemalloc
+
+# Local Module Imports
+import stats as st
+
+# The number of frames kept for each allocation, so allocations can be traced to their callers
+TRACE_FRAMES = 10
+# The number of functions and lines listed in the text report
+REPORT_LIMIT = 40
+
+# The profiler and the time it was started, while profiling
+_profiler: cProfile.Profile | None = None
+_started = ""
+# The snapshots taken while profiling
+_snapshot_paths: list[str] = []
+
+
+def start() -> None:
+    """Starts cProfile and tracemalloc, and measuring the allocations of each timed call."""
+    global _profiler, _started
+    _started = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    tracemalloc.start(TRACE_FRAMES)
+    st.TRACE_ALLOCATIONS = True
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+
+def take_snapshot(directory: str, label: str) -> str | None:
+    """Writes the memory allocated right now, if the program is being profiled.
+
+    Args:
+        directory (str): where to write the snapshot
+        label (str): the label in the name of the snapshot, like "load"
+
+    Returns:
+        str | None: the path of the snapshot, or None if not profiling
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    path = os.path.join(directory, f"memory-{_started}-{label}.snapshot")
+    tracemalloc.take_snapshot().dump(path)
+    _snapshot_paths.append(path)
+    return path
+
+
+def format_allocations(allocations: dict[str, dict]) -> str:
+    """Formats the allocations of the timed calls as a table.
+
+    Args:
+        allocations (dict[str, dict]): the allocations, as summarized by stats.snapshot
+
+    Returns:
+        str: the table, including the newlines
+    """
+    lines = [
+        f"{'Name':<30}  {'Calls':>7}  {'Net KiB/call':>12}  {'Peak KiB/call':>13}  {'Max peak KiB':>12}"
+    ]
+    for name, allocation in allocations.items():
+        lines.append(
+            f"{name:<30}  {allocation['calls']:>7}  {allocation['net_per_call'] / 1024:>12.1f}"
+            f"  {allocation['peak_mean'] / 1024:>13.1f}  {allocation['peak_max'] / 1024:>12.1f}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def stop(directory: str) -> list[str]:
+    """Stops profiling and writes the reports.
+
+    Args:
+        directory (str): where to write the reports
+
+    Returns:
+        list[str]: the paths of the reports
+    """
+    global _profiler
+    if _profiler is None:
+        return []
+    _profiler.disable()
+    snapshot = tracemalloc.take_snapshot()
+    st.TRACE_ALLOCATIONS = False
+    tracemalloc.stop()
+
+    prof_path = os.path.join(directory, f"profile-{_started}.prof")
+    text_path = os.path.join(directory, f"profile-{_started}.txt")
+    snapshot_path = os.path.join(directory, f"memory-{_started}-exit.snapshot")
+    _profiler.dump_stats(prof_path)
+    snapshot.dump(snapshot_path)
+
+    # The text report has the functions, then the allocations per call, then the lines
+    functions = io.StringIO()
+    pstats.Stats(_profiler, stream=functions).sort_stats("cumulative").print_stats(
+        REPORT_LIMIT
+    )
+    # The profiler and tracemalloc allocate too, so they are left out of the lines
+    lines = snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+        ]
+    ).statistics("lineno")
+    with open(text_path, "w", encoding="utf-8") as fh:
+        fh.write("Slowest functions (cumulative time)\n")
+        fh.write(functions.getvalue())
+        fh.write("\nMemory allocated per call\n\n")
+        fh.write(format_allocations(st.snapshot()["allocations"]))
+        fh.write("\nLines with the most memory still allocated at exit\n\n")
+        for stat in lines[:REPORT_LIMIT]:
+            fh.write(f"{stat}\n")
+    _profiler = None
+    paths = [prof_path, text_path, *_snapshot_paths, snapshot_path]
+    _snapshot_paths.clear()
+    return paths
@@ -0,0 +1,89 @@
+"""
+This module contains the functions for scoring and ranking the restos that match a gusto.
+"""
+
+# Standard Library Imports
+import heapq
+
+# Local Module Imports
+import geo
+from records import Gusto, Resto
+
+# The default weights of the rating, distance, cost, and cuisine scores
+DEFAULT_WEIGHTS = [1.0, 1.0, 1.0, 1.0]
+
+# The labels of the weights, in the order they are stored in a gusto
+WEIGHT_LABELS = ["Rating", "Distance", "Cost", "Cuisine"]
+
+
+def score_resto(value: Resto, gusto: Gusto, weights: list | None = None) -> float:
+    """Scores a resto against a gusto. A higher score is a better match.
+
+    Each part of the score is between 0 and 1 before it is weighted:
+    - rating: 0 for a rating of 1, and 1 for a rating of 5
+    - distance: 1 / (1 + distance in km), so closer restos score higher. The distance is from
+      the gusto's origin if it has one and the resto has coordinates, otherwise from UPLB gate
+    - cost: the slack of the cost against the budget per person, or 0 if there is no budget
+    - cuisine: the overlap of the gusto's cuisine with the resto's cuisines, or 0 if there is no cuisine
+
+    Args:
+        value (Resto): the details of the resto
+        gusto (Gusto): the details of the gusto
+        weights (list | None, optional): the weights of the scores. Defaults to the gusto's weights.
+
+    Returns:
+        float: the score of the resto
+    """
+    distance, r_cuisine_type, cost, rating = (
+        value.distance,
+        value.cuisine_type,
+        value.cost,
+        value.rating,
+    )
+    group_size, budget, g_cuisine_type = gusto.group_size, gusto.budget, gusto.cuisine_type
+    if weights is None:
+        weights = gusto.weights if gusto.weights is not None else DEFAULT_WEIGHTS
+    w_rating, w_distance, w_cost, w_cuisine = weights
+    origin = gusto.origin
+    if origin is not None and value.lat is not None:
+        distance = geo.distance(origin[0], origin[1], value.lat, value.lon)
+
+    rating_score = (rating - 1) / 4
+    distance_score = 1 / (1 + distance / 1000)
+    cost_score = 0.0
+    if budget is not None:
+        budget_per_person = budget / group_size
+        cost_score = (budget_per_person - cost) / budget_per_person
+    # The overlap is the Jaccard index of the gusto's cuisine and the resto's cuisines
+    cuisine_score = 0.0
+    if g_cuisine_type is not None and g_cuisine_type in r_cuisine_type:
+        cuisine_score = 1 / len(r_cuisine_type)
+
+    return (
+        w_rating * rating_score
+        + w_distance * distance_score
+        + w_cost * cost_score
+        + w_cuisine * cuisine_score
+    )
+
+
+def rank_restos(
+    matches, restos_dict: dict[str, Resto], gusto: Gusto, k: int
+) -> list[tuple[str, float]]:
+    """Ranks the matching restos and keeps only the best k.
+
+    heapq.nlargest keeps a heap of k restos while it goes through the matches,
+    so the memory used stays at O(k) no matter how many restos match.
+
+    Args:
+        matches (Iterable): the names of the restos that match the gusto
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gusto (Gusto): the details of the gusto
+        k (int): the number of restos to keep
+
+    Returns:
+        list[tuple[str, float]]: the names and scores of the best restos, best first
+    """
+    weights = gusto.weights if gusto.weights is not None else DEFAULT_WEIGHTS
+    scored = ((name, score_resto(restos_dict[name], gusto, weights)) for name in matches)
+    return heapq.nlargest(k, scored, key=lambda pair: pair[1])
@@ -3,84 +3,329 @@ This module contains the functions for recommending restos.
 """
 
 # Standard Library Imports
+import heapq
 import random
 
 # Local Module Imports
+import geo
 import gusto as g
 import user_inputs as ui
+from input_source import read_line
 import misc as m
 from colors import C1, C2, CE, CD
 import colors as c
+from resto_index import RestoIndex
+import resto_columns as rcol
+import sampling as sp
+import ranking as rk
+import stats as st
+from records import Gusto, Resto
+from render import Renderer, table_header
+import resto as r
 
 
-def recommend_restos(restos_dict: dict[str, list], gusto: tuple) -> list:
+def resto_matches(
+    resto: Resto,
+    meal_mask: int,
+    group_size: int,
+    budget: float | None,
+    max_distance: float | None,
+    cuisine_mask: int,
+    min_rating: float | None,
+    origin: list | None = None,
+) -> bool:
+    """Checks if a resto fulfills the requirements of a gusto.
+
+    This is the one check shared by scan_restos and recommend_restos_one_pass,
+    so the interactive recos and the exports always agree.
+
+    Args:
+        resto (Resto): the details of the resto
+        meal_mask (int): the meal type bitmask of the gusto
+        group_size (int): the number of people
+        budget (float | None): the budget of the gusto, or None for any
+        max_distance (float | None): the maximum distance of the gusto, or None for any
+        cuisine_mask (int): the cuisine bitmask of the gusto, or 0 for any
+        min_rating (float | None): the minimum rating of the gusto, or None for any
+        origin (list | None, optional): the latitude and longitude the max distance is from,
+            or None for UPLB gate. Defaults to None.
+
+    Returns:
+        bool: whether the resto fulfills the requirements
+    """
+    # If a resto fails to fulfill a requirement, it does not match
+    if not resto.meal_mask & meal_mask:
+        return False
+    if budget is not None and budget < resto.cost * group_size:
+        return False
+    if max_distance is not None:
+        if origin is None:
+            if max_distance < resto.distance:
+                return False
+        elif not geo.within_radius(resto, origin, max_distance):
+            return False
+    if cuisine_mask and not resto.cuisine_mask & cuisine_mask:
+        return False
+    if min_rating is not None and resto.rating < min_rating:
+        return False
+    return True
+
+
+def scan_restos(
+    restos_dict: dict[str, Resto],
+    group_size: int,
+    g_meal_type: str,
+    budget: float | None,
+    max_distance: float | None,
+    g_cuisine_type: str | None,
+    min_rating: float | None,
+    origin: list | None = None,
+):
+    """Yields the restos that fulfill the requirements of a gusto by checking every resto.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        group_size (int): the number of people
+        g_meal_type (str): the meal type of the gusto
+        budget (float | None): the budget of the gusto, or None for any
+        max_distance (float | None): the maximum distance of the gusto, or None for any
+        g_cuisine_type (str | None): the cuisine of the gusto, or None for any
+        min_rating (float | None): the minimum rating of the gusto, or None for any
+        origin (list | None, optional): the latitude and longitude the max distance is from,
+            or None for UPLB gate. Defaults to None.
+
+    Yields:
+        str: the name of a matching resto
+    """
+    # Convert the meal type and cuisine of the gusto into bitmasks once
+    # The meal type of a gusto is a full name, so its first letter is the Literal
+    g_meal_mask = ui.meal_type_to_mask(g_meal_type[0])
+    g_cuisine_mask = ui.cuisine_bits[g_cuisine_type] if g_cuisine_type is not None else 0
+
+    # Iterate through the restos, yielding the ones that fulfill the requirements of the gusto
+    for name, resto in restos_dict.items():
+        if resto_matches(
+            resto,
+            g_meal_mask,
+            group_size,
+            budget,
+            max_distance,
+            g_cuisine_mask,
+            min_rating,
+            origin,
+        ):
+            yield name
+
+
+@st.timed("reco.recommend_restos")
+def recommend_restos(
+    restos_dict: dict[str, Resto],
+    gusto: tuple,
+    index: RestoIndex | None = None,
+    k: int = sp.RECO_COUNT,
+    rng: random.Random | None = None,
+) -> list:
     """Recommends restos based on the given gusto.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos
+        restos_dict (dict[str, Resto]): the dictionary of restos
         gusto (tuple): the gusto to be used for recommending restos
+        index (RestoIndex | None, optional): the index of the restos. Defaults to None.
+        k (int, optional): the number of restos to recommend. Defaults to sp.RECO_COUNT.
+        rng (random.Random | None, optional): the random number generator. Defaults to None.
 
     Returns:
         list: the list of recommended restos
     """
 
-    # Initalize the list of recommended restos
-    recos = []
+    # Randomly pick k restos while the matches are being found
+    # The full list of matches is never built
+    return sp.reservoir_sample(find_matches(restos_dict, gusto, index), k, rng)
+
+
+@st.timed("reco.recommend_restos_ranked")
+def recommend_restos_ranked(
+    restos_dict: dict[str, Resto],
+    gusto: tuple,
+    index: RestoIndex | None = None,
+    k: int = sp.RECO_COUNT,
+) -> list[tuple[str, float]]:
+    """Recommends the best restos for the given gusto, ranked by their scores.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gusto (tuple): the gusto to be used for recommending restos
+        index (RestoIndex | None, optional): the index of the restos. Defaults to None.
+        k (int, optional): the number of restos to recommend. Defaults to sp.RECO_COUNT.
+
+    Returns:
+        list[tuple[str, float]]: the names and scores of the recommended restos, best first
+    """
+    return rk.rank_restos(
+        find_matches(restos_dict, gusto, index), restos_dict, gusto[1], k
+    )
+
+
+def find_matches(
+    restos_dict: dict[str, Resto], gusto: tuple, index: RestoIndex | None = None
+):
+    """Finds the restos that fulfill the requirements of the given gusto.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gusto (tuple): the gusto to be used for recommending restos
+        index (RestoIndex | None, optional): the index of the restos. Defaults to None.
+
+    Returns:
+        Iterator[str]: the names of the matching restos
+    """
+    # Get the requirements from the gusto details
+    # These are the group size, meal type, budget, max distance, cuisine, min rating, and origin
+    predicates = gusto[1].predicates()
+
+    # If there is an index, let it find the matching restos instead of checking every resto
+    if index is not None:
+        return index.query(*predicates)
+    return scan_restos(restos_dict, *predicates)
+
+
+def recommend_restos_batch(
+    restos_dict: dict[str, Resto],
+    gustos_dict: dict[str, Gusto],
+    columns: rcol.RestoColumns | None = None,
+    index: RestoIndex | None = None,
+    k: int = sp.RECO_COUNT,
+    rng: random.Random | None = None,
+) -> dict[str, list]:
+    """Recommends restos for every gusto in one pass.
+
+    If NumPy is available and a columnar copy of the restos is given, all gustos are checked
+    against it at once. Otherwise, each gusto is passed to recommend_restos with the index.
+    A columnar copy is only built here if there is neither a copy nor an index, so a caller
+    with a ready index never pays for an O(N) copy of the restos on every call.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos to recommend restos for
+        columns (RestoColumns | None, optional): the columnar copy of the restos. Defaults to None.
+        index (RestoIndex | None, optional): the index used when there is no columnar copy. Defaults to None.
+        k (int, optional): the number of restos to recommend per gusto. Defaults to sp.RECO_COUNT.
+        rng (random.Random | None, optional): the random number generator. Defaults to None.
+
+    Returns:
+        dict[str, list]: the list of recommended restos of each gusto label
+    """
+    if rcol.np is None or (columns is None and index is not None):
+        return {
+            label: recommend_restos(restos_dict, (label, details), index, k, rng)
+            for label, details in gustos_dict.items()
+        }
 
-    # Unpack the gusto details
-    _, [
-        _,
-        group_size,
-        g_meal_type,
-        budget,
-        max_distance,
-        g_cuisine_type,
-        min_rating,
-    ] = gusto
-
-    # Iterate through the restos
-    for name, [
-        distance,
-        r_cuisine_type,
-        r_meal_type,
-        cost,
-        rating,
-    ] in restos_dict.items():
-        # Check if a resto fulfills the requirements of the gusto
-        # If a resto fails to fulfill a requirement, continue to the next resto
-        # Otherwise, append the resto to the list of recommended restos
-        meal_types = []
-        for char in r_meal_type:
-            if char == "B":
-                meal_types.append("Breakfast")
-            elif char == "L":
-                meal_types.append("Lunch")
-            elif char == "D":
-                meal_types.append("Dinner")
-        if g_meal_type not in meal_types:
-            continue
-        if budget is not None and budget < cost * group_size:
-            continue
-        if max_distance is not None and max_distance < distance:
-            continue
-        if g_cuisine_type is not None and g_cuisine_type not in r_cuisine_type:
-            continue
-        if min_rating is not None and rating < min_rating:
-            continue
-        recos.append(name)
-
-    # Randomly removes a resto from the list until there are only 3 left
-    while len(recos) > 3:
-        recos.remove(random.choice(recos))
+    if rng is None:
+        rng = random
+    if columns is None:
+        columns = rcol.RestoColumns(restos_dict)
+    batch_recos = {}
+    for (label, _), matches in columns.match(list(gustos_dict.items())):
+        # Randomly pick k of the matches
+        # The matches are already an array, so they can be sampled by position
+        if len(matches) > k:
+            matches = [matches[idx] for idx in rng.sample(range(len(matches)), k)]
+        batch_recos[label] = [columns.names[idx] for idx in matches]
+    return batch_recos
+
+
+def recommend_restos_one_pass(
+    items,
+    gustos: list[tuple[str, Gusto]],
+    k: int = sp.RECO_COUNT,
+    rng: random.Random | None = None,
+) -> list[list[tuple[str, Resto, float | None]]]:
+    """Recommends restos for many gustos while reading the restos only once.
+
+    Each resto is checked against every gusto as it is read. A gusto with weights
+    keeps a heap of its best k restos, like rank_restos, and a gusto without weights
+    keeps a reservoir of k random restos. Only k restos per gusto are kept, so this
+    works on a stream of restos that is never held in memory, and needs no index.
+
+    Args:
+        items (Iterable[tuple[str, Resto]]): the names and details of the restos
+        gustos (list[tuple[str, Gusto]]): the gustos, as (label, details) tuples
+        k (int, optional): the number of restos to recommend per gusto. Defaults to sp.RECO_COUNT.
+        rng (random.Random | None, optional): the random number generator. Defaults to None.
+
+    Returns:
+        list[list[tuple[str, Resto, float | None]]]: the name, details, and score of the
+        recos of each gusto, in the order of the gustos. Ranked recos are best first,
+        and random recos have no score.
+    """
+    if rng is None:
+        rng = random
+
+    # Convert the meal type and cuisine of each gusto into bitmasks once
+    checks = []
+    for _, details in gustos:
+        group_size, g_meal_type, budget, max_distance, g_cuisine_type, min_rating, origin = (
+            details.predicates()
+        )
+        # The requirements are in the order of the arguments of resto_matches
+        requirements = (
+            ui.meal_type_to_mask(g_meal_type[0]),
+            group_size,
+            budget,
+            max_distance,
+            ui.cuisine_bits[g_cuisine_type] if g_cuisine_type is not None else 0,
+            min_rating,
+            origin,
+        )
+        checks.append((requirements, details if details.weights is not None else None))
+    # Each gusto keeps a heap of (score, -position, name, details) or a reservoir of (name, details)
+    # The negative position breaks ties in favor of the resto read first, like heapq.nlargest
+    kept = [[] for _ in gustos]
+    seen = [0] * len(gustos)
+
+    for position, (name, resto) in enumerate(items):
+        for idx, (requirements, ranked) in enumerate(checks):
+            if not resto_matches(resto, *requirements):
+                continue
+
+            if ranked is not None:
+                entry = (rk.score_resto(resto, ranked), -position, name, resto)
+                if len(kept[idx]) < k:
+                    heapq.heappush(kept[idx], entry)
+                elif k > 0 and entry > kept[idx][0]:
+                    heapq.heapreplace(kept[idx], entry)
+            else:
+                # Algorithm R: the n-th match replaces a random reco with probability k/n
+                seen[idx] += 1
+                if len(kept[idx]) < k:
+                    kept[idx].append((name, resto))
+                else:
+                    pick = rng.randrange(seen[idx])
+                    if pick < k:
+                        kept[idx][pick] = (name, resto)
+
+    recos = []
+    for (_, details), reservoir in zip(gustos, kept):
+        if details.weights is not None:
+            reservoir.sort(reverse=True)
+            recos.append([(name, resto, score) for score, _, name, resto in reservoir])
+        else:
+            recos.append([(name, resto, None) for name, resto in reservoir])
     return recos
 
 
-def get_recos(restos_dict: dict[str, list], gustos_dict: dict[str, list]) -> None:
+def get_recos(
+    restos_dict: dict[str, Resto],
+    gustos_dict: dict[str, Gusto],
+    index: RestoIndex | None = None,
+) -> None:
     """Gets the recos from the user.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+        index (RestoIndex | None, optional): the index of the restos. Defaults to None.
     """
 
     # Raise an error if there are no restos to recommend
@@ -98,6 +343,7 @@ def get_recos(restos_dict: dict[str, list], gustos_dict: dict[str, list]) -> Non
         f"  {C1}3   Get Recos{CD}                                    \n",
         "  A   About                                        \n",
         "  H   Help                                         \n",
+        "  S   Stats                                        \n",
         "  X   Exit                                         \n",
         "═══════════════════════════════════════════════════\n",
         f"{CE}",
@@ -116,7 +362,7 @@ def get_recos(restos_dict: dict[str, list], gustos_dict: dict[str, list]) -> Non
         end="",
     )
 
-    choice = input("  Enter choice: ")
+    choice = read_line("  Enter choice: ")
     match choice:
         case "1":
             # Raise an error if there are no gustos to get recommendations from
@@ -135,7 +381,7 @@ def get_recos(restos_dict: dict[str, list], gustos_dict: dict[str, list]) -> Non
             # Prompt the user to choose a gusto
             g.display_gustos_simple(gustos_dict)
             print("═══════════════════════════════════════════════════")
-            label = m.capitalize_words(input("  Enter gusto label: ").strip())
+            label = m.capitalize_words(read_line("  Enter gusto label: ").strip())
             if label not in gustos_dict:
                 m.raise_err(f'Gusto "{label}" does not exist!')
                 return
@@ -143,22 +389,16 @@ def get_recos(restos_dict: dict[str, list], gustos_dict: dict[str, list]) -> Non
             # Assign the gusto to a variable "gusto" which is a tuple of the gusto label and the gusto details
             gusto = (label, gustos_dict[label])
 
-            # Get the recommended restos
-            recos = recommend_restos(restos_dict, gusto)
-
-            # Print the recommended restos
-            print_recos(gusto, recos, restos_dict)
+            # Get and print the recommended restos
+            show_recos(restos_dict, gusto, index)
         case "2":
             # Ask the user for the gusto details
             # The function ad_hoc_gusto() returns a tuple of the gusto label and the gusto details
             # The label and description are None
             gusto = g.ad_hoc_gusto()
 
-            # Get the recommended restos
-            recos = recommend_restos(restos_dict, gusto)
-
-            # Print the recommended restos
-            print_recos(gusto, recos, restos_dict)
+            # Get and print the recommended restos
+            show_recos(restos_dict, gusto, index)
         case "B" | "b":
             m.clear_screen()
             return
@@ -167,106 +407,120 @@ def get_recos(restos_dict: dict[str, list], gustos_dict: dict[str, list]) -> Non
             return
 
 
-def print_recos(gusto: tuple, recos: list, restos_dict: dict[str, list]) -> None:
+def show_recos(
+    restos_dict: dict[str, Resto], gusto: tuple, index: RestoIndex | None = None
+) -> None:
+    """Gets the recos of a gusto and prints them.
+
+    A gusto with ranking weights gets its recos ranked, otherwise they are randomly picked.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gusto (tuple): the gusto to be used for recommending restos
+        index (RestoIndex | None, optional): the index of the restos. Defaults to None.
+    """
+    if gusto[1].weights is not None:
+        ranked = recommend_restos_ranked(restos_dict, gusto, index)
+        recos = [name for name, _ in ranked]
+        scores = [score for _, score in ranked]
+        print_recos(gusto, recos, restos_dict, scores)
+    else:
+        recos = recommend_restos(restos_dict, gusto, index)
+        print_recos(gusto, recos, restos_dict)
+
+
+def print_recos(
+    gusto: tuple,
+    recos: list,
+    restos_dict: dict[str, Resto],
+    scores: list | None = None,
+) -> None:
     """Prints the recos.
 
     Args:
         gusto (tuple): the gusto to be used for recommending restos
         recos (list): the list of recommended restos
-        restos_dict (dict[str, list]): the dictionary of restos
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        scores (list | None, optional): the scores of the ranked recos. Defaults to None.
     """
     m.clear_screen()
-    # Print the gusto details
-    print(
-        "═════════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
-        f"{C1}                                                    Gusto                                                    {CE}\n",
-        "═════════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
-        sep="",
-        end="",
-    )
-    label = gusto[0]
-    description = gusto[1][0]
-    group_size = gusto[1][1]
-    meal_type = gusto[1][2].capitalize()
-    # If the gusto details are None, print "Any" instead
-    budget = f"₱{gusto[1][3]:.2f}" if gusto[1][3] != None else "Any"
-    max_distance = f"{gusto[1][4]:.2f} meters" if gusto[1][4] != None else "Any"
-    cuisine_type = gusto[1][5] if gusto[1][5] != None else "Any"
-    min_rating = gusto[1][6] if gusto[1][6] != None else "Any"
-
-    # Do not print the gusto label and description if they are None
-    # A None label and description means that the gusto is an ad hoc gusto
-    # An ad hoc gusto is a gusto that is not saved in the gustos dictionary
-    if gusto[0] != None:
-        print(f"  {C2}Gusto Label:{CE} {label}")
-        print(f"  {C2}Description:{CE} {description}")
-    print(f"  {C2}Number of People:{CE} {group_size}")
-    print(f"  {C2}Meal Type:{CE} {meal_type}")
-    print(f"  {C2}Budget:{CE} {budget}")
-    print(f"  {C2}Maximum Distance:{CE} {max_distance}")
-    print(f"  {C2}Cuisine Type:{CE} {cuisine_type}")
-    print(f"  {C2}Minimum Rating:{CE} {min_rating}")
-
-    # If the recos list is empty, print a message saying that there are no recos
-    if not recos:
-        print(
-            "═════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
-            "  We cannot find a resto match for your gusto!                                                           \n",
-            "  Want to find a match? Try:                                                                             \n",
-            "  - Adding more Restos                                                                                   \n",
-            "  - A different Gusto                                                                                    \n",
-            "  - Increasing your Gusto's budget                                                                       \n",
-            "  - Increasing your Gusto's max distance                                                                 \n",
-            "  - Changing your Gusto's cuisine type                                                                   \n",
-            "  - Decreasing your Gusto's group size                                                                   \n",
-            "  - Decreasing your Gusto's minimum rating                                                               \n",
-            "═════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
-            sep="",
-            end="",
+    with Renderer() as out:
+        # Print the gusto details
+        out.write(
+            "═════════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
+            f"{C1}                                                    Gusto                                                    {CE}\n",
+            "═════════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
         )
-        m.continue_prompt()
-        return
-
-    # Otherwise, print the recommended restos using the same display format as the restos
-    print(
-        "═════════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
-        f"{C1}                                                    Recos                                                   {CE}\n",
-        "═════════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
-        f"{C2}{c.ITALIC}          Name             Distance         Cuisines               Meal Types              Cost      Rating  {CE}\n"
-        "─────────────────────────────────────────────────────────────────────────────────────────────────────────────\n",
-        sep="",
-        end="",
-    )
-    for resto in recos:
-        name = resto if len(resto) <= 20 else resto[:17] + "..."
-        distance = f"{restos_dict[resto][0]:.2f}m"
-        list_of_cuisines = restos_dict[resto][1]
-        meal_type = restos_dict[resto][2]
-        meal_types = ""
-        for char in meal_type:
-            if char == "B":
-                meal_types += "Breakfast, "
-            elif char == "L":
-                meal_types += "Lunch, "
-            elif char == "D":
-                meal_types += "Dinner, "
-        meal_types = meal_types.rstrip(", ")
-        cost = f"₱{restos_dict[resto][3]:.2f}"
-        rating = f"{restos_dict[resto][4]:.1f}"
-        print(
-            f"  {c.YELLOW2}{name:<20}{CE}   {distance:<12}   {list_of_cuisines[0] if len(list_of_cuisines) == 1 else f'┬ {list_of_cuisines[0]}':<16}   {meal_types:<26}   {cost:>10}   {rating:^6}  "
+        label, details = gusto
+        description = details.description
+        group_size = details.group_size
+        meal_type = details.meal_type.capitalize()
+        # If the gusto details are None, print "Any" instead
+        budget = f"₱{details.budget:.2f}" if details.budget != None else "Any"
+        max_distance = (
+            f"{details.max_distance:.2f} meters" if details.max_distance != None else "Any"
         )
-        for idx, cuisine in enumerate(list_of_cuisines[1:]):
-            cuisine = (
-                f"├ {cuisine}"
-                if idx != len(list_of_cuisines[1:]) - 1
-                else f"└ {cuisine}"
+        cuisine_type = details.cuisine_type if details.cuisine_type != None else "Any"
+        min_rating = details.min_rating if details.min_rating != None else "Any"
+        weights = (
+            ", ".join(
+                f"{weight_label} {weight:g}"
+                for weight_label, weight in zip(rk.WEIGHT_LABELS, details.weights)
             )
-            filler = f""
-            print(
-                f"  {filler:<20}   {filler:<12}   {cuisine:<16}   {filler:<26}   {filler:>10}   {filler:^6}  "
+            if details.weights != None
+            else "None (Random Recos)"
+        )
+
+        # Do not print the gusto label and description if they are None
+        # A None label and description means that the gusto is an ad hoc gusto
+        # An ad hoc gusto is a gusto that is not saved in the gustos dictionary
+        if label != None:
+            out.line(f"  {C2}Gusto Label:{CE} {label}")
+            out.line(f"  {C2}Description:{CE} {description}")
+        out.line(f"  {C2}Number of People:{CE} {group_size}")
+        out.line(f"  {C2}Meal Type:{CE} {meal_type}")
+        out.line(f"  {C2}Budget:{CE} {budget}")
+        out.line(f"  {C2}Maximum Distance:{CE} {max_distance}")
+        # A gusto with an origin measures the maximum distance from it instead of UPLB Gate
+        if details.origin != None:
+            out.line(f"  {C2}Origin:{CE} {geo.format_coordinates(*details.origin)}")
+        out.line(f"  {C2}Cuisine Type:{CE} {cuisine_type}")
+        out.line(f"  {C2}Minimum Rating:{CE} {min_rating}")
+        out.line(f"  {C2}Ranking Weights:{CE} {weights}")
+
+        # If the recos list is empty, print a message saying that there are no recos
+        if not recos:
+            out.write(
+                "═════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
+                "  We cannot find a resto match for your gusto!                                                           \n",
+                "  Want to find a match? Try:                                                                             \n",
+                "  - Adding more Restos                                                                                   \n",
+                "  - A different Gusto                                                                                    \n",
+                "  - Increasing your Gusto's budget                                                                       \n",
+                "  - Increasing your Gusto's max distance                                                                 \n",
+                "  - Changing your Gusto's cuisine type                                                                   \n",
+                "  - Decreasing your Gusto's group size                                                                   \n",
+                "  - Decreasing your Gusto's minimum rating                                                               \n",
+                "═════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
             )
-    print(
-        "═════════════════════════════════════════════════════════════════════════════════════════════════════════════"
-    )
+            out.flush()
+            m.continue_prompt()
+            return
+
+        # Otherwise, print the recommended restos using the same display format as the restos
+        # Only ranked recos have a score, which is an extra column
+        extra = [("Score", 6)] if scores is not None else []
+        name_width = r.resto_name_width(sum(width + 3 for _, width in extra))
+        header, footer = table_header("Recos", r.resto_columns(name_width) + extra)
+        out.write(header)
+        for idx, resto in enumerate(recos):
+            for line in r.format_resto(
+                restos_dict,
+                resto,
+                name_width,
+                c.YELLOW2,
+                f"{scores[idx]:.2f}" if scores is not None else None,
+            ):
+                out.line(line)
+        out.write(footer)
     m.continue_prompt()
@@ -0,0 +1,209 @@
+"""
+This module contains the cache of the matching restos of recently asked gustos.
+"""
+
+# Standard Library Imports
+import time
+from collections import OrderedDict
+
+# Local Module Imports
+import reco as rc
+import stats as st
+from records import Resto
+from resto_index import RestoIndex
+from sqlite_store import SqliteIndex
+
+# The number of gustos whose matches are kept
+CACHE_SIZE = 256
+# How long the matches of a gusto are kept (in seconds)
+# Changes made through the index invalidate the matches right away, so this only
+# bounds how stale the matches can get from changes made elsewhere, like another
+# process writing to the SQLite database
+CACHE_TTL = 300.0
+
+
+def normalize_key(
+    group_size: int,
+    meal_type: str,
+    budget: float | None,
+    max_distance: float | None,
+    cuisine_type: str | None,
+    min_rating: float | None,
+    origin: list | None = None,
+) -> tuple:
+    """Normalizes the requirements of a gusto, so equal gustos share a cache entry.
+
+    Args:
+        group_size (int): the number of people
+        meal_type (str): the meal type ("Breakfast", "Lunch", or "Dinner")
+        budget (float | None): the budget of the group, or None for any
+        max_distance (float | None): the maximum distance, or None for any
+        cuisine_type (str | None): the cuisine, or None for any
+        min_rating (float | None): the minimum rating, or None for any
+        origin (list | None, optional): the latitude and longitude the max distance is from,
+            or None for UPLB gate. Defaults to None.
+
+    Returns:
+        tuple: the normalized requirements
+    """
+    return (
+        int(group_size),
+        meal_type.capitalize(),
+        None if budget is None else float(budget),
+        None if max_distance is None else float(max_distance),
+        cuisine_type,
+        None if min_rating is None else float(min_rating),
+        # A list cannot be hashed, so the origin is a tuple
+        None if origin is None else (float(origin[0]), float(origin[1])),
+    )
+
+
+def fulfills(value: Resto, key: tuple) -> bool:
+    """Checks if a resto fulfills the requirements of a gusto, with the same checks as a scan.
+
+    Args:
+        value (Resto): the details of the resto
+        key (tuple): the normalized requirements of the gusto
+
+    Returns:
+        bool: whether the resto fulfills the requirements
+    """
+    for _ in rc.scan_restos({"resto": value}, *key):
+        return True
+    return False
+
+
+class CachedIndex:
+    """An index that remembers the matching restos of recently asked gustos.
+
+    This wraps a RestoIndex or SqliteIndex and has the same methods, so it can be
+    passed anywhere an index is. The matches of a gusto are cached before the recos
+    are sampled or ranked, so random recos are still random on every request.
+
+    The entries are kept in least recently used order, and each one expires after
+    CACHE_TTL seconds. When a resto is added, edited, or deleted, only the entries
+    that the change could affect are dropped:
+    - entries whose matches include the old resto
+    - entries whose requirements are fulfilled by the new resto
+    """
+
+    def __init__(
+        self,
+        index: RestoIndex | SqliteIndex,
+        size: int = CACHE_SIZE,
+        ttl: float = CACHE_TTL,
+    ) -> None:
+        """Wraps an index with an empty cache.
+
+        Args:
+            index (RestoIndex | SqliteIndex): the index that answers the cache misses
+            size (int, optional): the number of gustos whose matches are kept. Defaults to CACHE_SIZE.
+            ttl (float, optional): how long the matches are kept (in seconds). Defaults to CACHE_TTL.
+        """
+        self.index = index
+        self.size = size
+        self.ttl = ttl
+        # Each entry is the time it was cached and its matches
+        # The matches are a tuple, so recos can be sampled from them by position
+        self.entries: OrderedDict[tuple, tuple[float, tuple]] = OrderedDict()
+        # The keys of the entries whose matches include each resto, so the entries
+        # a resto is in are found without searching the matches of every entry
+        self.keys_by_name: dict[str, set[tuple]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self) -> None:
+        """Drops every entry."""
+        self.entries.clear()
+        self.keys_by_name.clear()
+
+    def _drop(self, key: tuple) -> None:
+        """Drops an entry and its keys in keys_by_name."""
+        _, matches = self.entries.pop(key)
+        for name in matches:
+            keys = self.keys_by_name[name]
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_name[name]
+
+    def invalidate(self, name: str | None = None, value: Resto | None = None) -> None:
+        """Drops the entries that a change to a resto could affect.
+
+        Args:
+            name (str | None, optional): the name of the resto before the change. Defaults to None.
+            value (Resto | None, optional): the details of the resto after the change. Defaults to None.
+        """
+        # The entries that match the old resto are looked up by its name
+        stale = set(self.keys_by_name.get(name, ())) if name is not None else set()
+        # Only the requirements of each entry are checked against the new resto, not its matches
+        if value is not None:
+            stale.update(
+                key for key in self.entries if key not in stale and fulfills(value, key)
+            )
+        for key in stale:
+            self._drop(key)
+
+    def add(self, name: str, value: Resto) -> None:
+        self.invalidate(value=value)
+        self.index.add(name, value)
+
+    def remove(self, name: str) -> None:
+        self.invalidate(name=name)
+        self.index.remove(name)
+
+    def update(self, old_name: str, name: str, value: Resto) -> None:
+        self.invalidate(name=old_name, value=value)
+        self.index.update(old_name, name, value)
+
+    def query(
+        self,
+        group_size: int,
+        meal_type: str,
+        budget: float | None,
+        max_distance: float | None,
+        cuisine_type: str | None,
+        min_rating: float | None,
+        origin: list | None = None,
+    ):
+        """Finds the names of the restos that fulfill the requirements of a gusto.
+
+        Args:
+            group_size (int): the number of people
+            meal_type (str): the meal type ("Breakfast", "Lunch", or "Dinner")
+            budget (float | None): the budget of the group, or None for any
+            max_distance (float | None): the maximum distance, or None for any
+            cuisine_type (str | None): the cuisine, or None for any
+            min_rating (float | None): the minimum rating, or None for any
+            origin (list | None, optional): the latitude and longitude the max distance is from,
+                or None for UPLB gate. Defaults to None.
+
+        Returns:
+            tuple[str, ...]: the names of the matching restos
+        """
+        key = normalize_key(
+            group_size, meal_type, budget, max_distance, cuisine_type, min_rating, origin
+        )
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        if entry is not None and now - entry[0] < self.ttl:
+            self.hits += 1
+            st.count("reco_cache.hits")
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        # Find the matches and cache them, dropping the least recently used entry if full
+        # An expired entry is dropped first, so its matches leave keys_by_name
+        self.misses += 1
+        st.count("reco_cache.misses")
+        if entry is not None:
+            self._drop(key)
+        matches = tuple(self.index.query(*key))
+        self.entries[key] = (now, matches)
+        for name in matches:
+            self.keys_by_name.setdefault(name, set()).add(key)
+        while len(self.entries) > self.size:
+            self._drop(next(iter(self.entries)))
+        return matches
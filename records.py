@@ -0,0 +1,161 @@
+"""
+This module contains the record types for the details of restos and gustos.
+"""
+
+# Local Module Imports
+import geo
+import user_inputs as ui
+
+
+class Resto:
+    """The details of a resto. The name of the resto is its key in the restos dictionary.
+
+    __slots__ drops the __dict__ of each resto, so a resto takes about as much memory as
+    the list it replaced, not less, while its fields are named instead of indexed.
+
+    The meal types and cuisines are also kept as bitmasks (see user_inputs.meal_type_to_mask
+    and user_inputs.cuisines_to_mask), so matching a gusto is a bitwise AND.
+    A resto is replaced rather than changed when it is edited, so the bitmasks stay in sync.
+
+    The coordinates are optional. When a resto has them, its distance from UPLB gate can be
+    derived from them, and gustos with an origin can find it (see geo.py).
+    """
+
+    __slots__ = (
+        "distance",
+        "cuisine_type",
+        "meal_type",
+        "cost",
+        "rating",
+        "meal_mask",
+        "cuisine_mask",
+        "lat",
+        "lon",
+    )
+
+    def __init__(
+        self,
+        distance: float | None,
+        cuisine_type: list,
+        meal_type: str,
+        cost: float,
+        rating: float,
+        meal_mask: int | None = None,
+        cuisine_mask: int | None = None,
+        lat: float | None = None,
+        lon: float | None = None,
+    ) -> None:
+        """Creates the details of a resto.
+
+        Args:
+            distance (float | None): the distance from UPLB gate (in meters), or None to derive it from the coordinates
+            cuisine_type (list): the list of cuisines
+            meal_type (str): the Literal of "B", "L", and/or "D"
+            cost (float): the typical cost of a meal per person (in pesos)
+            rating (float): the rating from 1 to 5
+            meal_mask (int | None, optional): the meal type bitmask, if already known. Defaults to None.
+            cuisine_mask (int | None, optional): the cuisine bitmask, if already known. Defaults to None.
+            lat (float | None, optional): the latitude (in degrees). Defaults to None.
+            lon (float | None, optional): the longitude (in degrees). Defaults to None.
+        """
+        self.distance = geo.gate_distance(lat, lon) if distance is None else distance
+        self.cuisine_type = cuisine_type
+        self.meal_type = meal_type
+        self.cost = cost
+        self.rating = rating
+        self.meal_mask = ui.meal_type_to_mask(meal_type) if meal_mask is None else meal_mask
+        self.cuisine_mask = (
+            ui.cuisines_to_mask(cuisine_type) if cuisine_mask is None else cuisine_mask
+        )
+        self.lat = lat
+        self.lon = lon
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Resto):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"Resto({fields})"
+
+
+class Gusto:
+    """The details of a gusto. The label of the gusto is its key in the gustos dictionary.
+
+    None means "Any" for the optional requirements, and "random recos" for the weights.
+    The maximum distance is from UPLB gate, or from the origin if the gusto has one.
+    """
+
+    __slots__ = (
+        "description",
+        "group_size",
+        "meal_type",
+        "budget",
+        "max_distance",
+        "cuisine_type",
+        "min_rating",
+        "weights",
+        "origin",
+    )
+
+    def __init__(
+        self,
+        description: str | None,
+        group_size: int,
+        meal_type: str,
+        budget: float | None = None,
+        max_distance: float | None = None,
+        cuisine_type: str | None = None,
+        min_rating: float | None = None,
+        weights: list | None = None,
+        origin: list | None = None,
+    ) -> None:
+        """Creates the details of a gusto.
+
+        Args:
+            description (str | None): the description, or None for an ad hoc gusto
+            group_size (int): the number of people
+            meal_type (str): "Breakfast", "Lunch", or "Dinner"
+            budget (float | None, optional): the budget of the group. Defaults to None.
+            max_distance (float | None, optional): the maximum distance from UPLB gate or the origin. Defaults to None.
+            cuisine_type (str | None, optional): the cuisine. Defaults to None.
+            min_rating (float | None, optional): the minimum rating. Defaults to None.
+            weights (list | None, optional): the ranking weights. Defaults to None.
+            origin (list | None, optional): the latitude and longitude the distance is measured from,
+                or None for UPLB gate. Defaults to None.
+        """
+        self.description = description
+        self.group_size = group_size
+        self.meal_type = meal_type
+        self.budget = budget
+        self.max_distance = max_distance
+        self.cuisine_type = cuisine_type
+        self.min_rating = min_rating
+        self.weights = weights
+        self.origin = origin
+
+    def predicates(self) -> tuple:
+        """Gets the requirements used for finding matching restos.
+
+        Returns:
+            tuple: the group size, meal type, budget, max distance, cuisine, min rating, and origin
+        """
+        return (
+            self.group_size,
+            self.meal_type,
+            self.budget,
+            self.max_distance,
+            self.cuisine_type,
+            self.min_rating,
+            self.origin,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Gusto):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"Gusto({fields})"
@@ -0,0 +1,346 @@
+"""
+This module contains the buffered renderer for displaying tables.
+
+Printing a table with one print() per row makes one write to the terminal per row,
+so a table of thousands of restos is bound by the number of writes, not by formatting.
+A Renderer collects the rows in a buffer instead, and writes them to the terminal
+once when it is flushed, or in chunks of CHUNK_SIZE characters for long tables.
+"""
+
+# Standard Library Imports
+import sys
+
+# Local Module Imports
+from colors import C1, C2, CE, ITALIC
+import misc as m
+from input_source import clears_screen, read_line
+import stats as st
+import terminal as t
+
+# The number of characters buffered before they are written to the terminal
+CHUNK_SIZE = 64 * 1024
+# The lines below the rows of a page, for the page number and the prompt
+PAGER_LINES = 3
+
+
+def table_header(title: str, columns: list[tuple[str, int]]) -> tuple[str, str]:
+    """Builds the header and closing line of a table from its columns.
+
+    Each column is centered under its heading, with 3 spaces between columns and
+    2 at each end, the same as the rows of the tables.
+
+    Args:
+        title (str): the title above the table
+        columns (list[tuple[str, int]]): the heading and width of each column
+
+    Returns:
+        tuple[str, str]: the header, and the line below the rows, including the newlines
+    """
+    headings = "  " + "   ".join(f"{heading:^{width}}" for heading, width in columns) + "  "
+    width = len(headings)
+    return (
+        f"{'═' * width}\n"
+        f"{C1}{title:^{width}}{CE}\n"
+        f"{'═' * width}\n"
+        f"{C2}{ITALIC}{headings}{CE}\n"
+        f"{'─' * width}\n"
+    ), f"{'═' * width}\n"
+
+
+def table_row(cells: list[tuple[str, int, str]]) -> str:
+    """Formats a row of a table, with the same spacing as table_header.
+
+    Args:
+        cells (list[tuple[str, int, str]]): the text, width, and alignment ("<", ">", or "^") of each cell
+
+    Returns:
+        str: the row, without the newline
+    """
+    return "  " + "   ".join(f"{text:{align}{width}}" for text, width, align in cells) + "  "
+
+
+class Renderer:
+    """Buffers the output of a table and writes it to the terminal in one go.
+
+    Use it as a context manager, so the buffer is flushed when the table is done:
+
+        with Renderer() as out:
+            out.write(header)
+            for row in rows:
+                out.line(row)
+    """
+
+    def __init__(self, out=None, chunk_size: int = CHUNK_SIZE) -> None:
+        """Starts an empty buffer.
+
+        Args:
+            out (TextIO, optional): the stream to write to. Defaults to sys.stdout when flushed.
+            chunk_size (int, optional): the number of characters buffered before a write. Defaults to CHUNK_SIZE.
+        """
+        self.out = out
+        self.chunk_size = chunk_size
+        self.parts: list[str] = []
+        self.size = 0
+
+    def __enter__(self) -> "Renderer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+    def write(self, *parts: str) -> None:
+        """Adds text to the buffer, like print(*parts, sep="", end="").
+
+        Args:
+            *parts (str): the text to add
+        """
+        self.parts.extend(parts)
+        self.size += sum(map(len, parts))
+        if self.size >= self.chunk_size:
+            self.flush()
+
+    def line(self, *parts: str) -> None:
+        """Adds a line to the buffer, like print(*parts, sep="").
+
+        Args:
+            *parts (str): the text of the line, without the newline
+        """
+        self.write(*parts, "\n")
+
+    def flush(self) -> None:
+        """Writes the buffer to the terminal with one write, and empties it."""
+        if not self.parts:
+            return
+        # sys.stdout is looked up here, so output that is redirected later still works
+        out = self.out if self.out is not None else sys.stdout
+        st.count("render.chars", self.size)
+        with st.timer("render.flush"):
+            out.write("".join(self.parts))
+            out.flush()
+        self.parts.clear()
+        self.size = 0
+
+
+class Screen:
+    """Draws full-screen frames, rewriting only the lines that changed since the last frame.
+
+    The first frame, and the first frame after anything else clears the screen, is drawn
+    in full. After that, each changed line is rewritten in place by moving the cursor to
+    it, so moving between pages of a table does not redraw the header. Whatever is below
+    the frame, like the answer to the last prompt, is cleared.
+
+    Every line must fit in the width of the terminal, since a wrapped line would move
+    the lines below it.
+    """
+
+    def __init__(self, out=None) -> None:
+        """Starts with nothing drawn.
+
+        Args:
+            out (TextIO, optional): the stream to write to. Defaults to sys.stdout when drawn.
+        """
+        self.out = out
+        self.lines: list[str] = []
+        # The clear_count of misc and the generation of the terminal size when the last frame was drawn
+        self.clears = -1
+        self.generation = -1
+
+    def draw(self, lines: list[str]) -> None:
+        """Draws a frame with one write.
+
+        Args:
+            lines (list[str]): the lines of the frame, without newlines
+        """
+        # A replayed script does not clear the screen, so each frame is written in full below the last
+        if not clears_screen():
+            with Renderer(self.out) as out:
+                for line in lines:
+                    out.line(line)
+            return
+        previous = self.lines
+        # Everything is redrawn if the screen was cleared or the terminal was resized
+        # Getting the size bumps the generation if it changed since it was last queried
+        t.get_size()
+        if self.clears != m.clear_count or self.generation != t.generation:
+            m.clear_screen()
+            previous = []
+        with Renderer(self.out) as out:
+            for row, line in enumerate(lines):
+                if row < len(previous) and previous[row] == line:
+                    continue
+                # Move to the start of the row, write the line, and clear the rest of the row
+                out.write(f"\033[{row + 1};1H", line, "\033[K")
+            # Move below the frame and clear everything after it
+            out.write(f"\033[{len(lines) + 1};1H\033[J")
+        self.lines = list(lines)
+        self.clears = m.clear_count
+        self.generation = t.generation
+
+
+class Pager:
+    """Shows a long table one page at a time, sized to the terminal.
+
+    Only the rows on the visible page are formatted. A page ends when the next row
+    would not fit, so a row that spans several lines (like a resto with many
+    cuisines) is never split between pages. Where each page starts is found as
+    the pages are reached, by asking the height of each row, so jumping ahead
+    only measures the rows in between.
+    """
+
+    def __init__(self, keys: list, height, format_row, header, footer) -> None:
+        """Prepares the pages of a table.
+
+        The header and footer can be functions, so a table can fit its columns to
+        the terminal every time a page is shown.
+
+        Args:
+            keys (list): the keys of the rows, in order
+            height (Callable[[object], int]): gets the number of lines of a row
+            format_row (Callable[[object], list[str]]): formats a row into its lines
+            header (str | Callable[[], str]): the lines above the rows, including the newlines
+            footer (str | Callable[[], str]): the lines below the rows, including the newlines
+        """
+        self.keys = keys
+        self.height = height
+        self.format_row = format_row
+        self.header = header
+        self.footer = footer
+        # The index of the first row of each page that has been reached,
+        # for the number of lines the pages had when they were measured
+        self.starts = [0]
+        self.starts_lines = 0
+
+    def page_lines(self) -> int:
+        """Gets the number of lines a page has for its rows.
+
+        Returns:
+            int: the lines left in the terminal after the header, footer, and prompt
+        """
+        chrome = self.get_header().count("\n") + self.get_footer().count("\n") + PAGER_LINES
+        return max(1, t.get_size().lines - chrome)
+
+    def get_header(self) -> str:
+        """Gets the lines above the rows."""
+        return self.header() if callable(self.header) else self.header
+
+    def get_footer(self) -> str:
+        """Gets the lines below the rows."""
+        return self.footer() if callable(self.footer) else self.footer
+
+    def _page_end(self, start: int, page_lines: int) -> int:
+        """Finds where the page that starts at a row ends.
+
+        Args:
+            start (int): the index of the first row of the page
+            page_lines (int): the number of lines for the rows
+
+        Returns:
+            int: the index after the last row of the page
+        """
+        used = 0
+        end = start
+        while end < len(self.keys):
+            used += self.height(self.keys[end])
+            # A page always has at least one row, even if it is too tall
+            if used > page_lines and end > start:
+                break
+            end += 1
+        return end
+
+    def page_range(self, page: int) -> tuple[int, int, int]:
+        """Finds the rows of a page, measuring the pages before it if needed.
+
+        Args:
+            page (int): the page, starting from 0. A page past the end is the last page.
+
+        Returns:
+            tuple[int, int, int]: the page, its first row, and the index after its last row
+        """
+        page_lines = self.page_lines()
+        # The pages are measured again if the terminal was resized
+        if page_lines != self.starts_lines:
+            self.starts = [0]
+            self.starts_lines = page_lines
+        while len(self.starts) <= page:
+            end = self._page_end(self.starts[-1], page_lines)
+            if end >= len(self.keys):
+                break
+            self.starts.append(end)
+        page = min(page, len(self.starts) - 1)
+        start = self.starts[page]
+        return page, start, self._page_end(start, page_lines)
+
+    def is_single_page(self) -> bool:
+        """Checks if every row fits on the first page.
+
+        Returns:
+            bool: whether there is only one page
+        """
+        return self.page_range(0)[2] >= len(self.keys)
+
+    @st.timed("render.format_page")
+    def format_page(self, page: int) -> tuple[int, int, list[str]]:
+        """Formats a page of the table.
+
+        Args:
+            page (int): the page, starting from 0
+
+        Returns:
+            tuple[int, int, list[str]]: the page, the index after its last row, and its lines
+        """
+        page, start, end = self.page_range(page)
+        lines = self.get_header().splitlines()
+        for key in self.keys[start:end]:
+            lines += self.format_row(key)
+        lines += self.get_footer().splitlines()
+        return page, end, lines
+
+    def render(self, page: int, out: Renderer) -> tuple[int, int]:
+        """Writes a page of the table.
+
+        Args:
+            page (int): the page, starting from 0
+            out (Renderer): where to write the page
+
+        Returns:
+            tuple[int, int]: the page that was written and the index after its last row
+        """
+        page, end, lines = self.format_page(page)
+        for line in lines:
+            out.line(line)
+        return page, end
+
+    def show(self) -> None:
+        """Shows the pages until the user goes back.
+
+        Enter or N goes to the next page, P to the previous page, a number to that
+        page, and B back. Enter on the last page also goes back.
+        Only the lines that changed are redrawn when the page changes.
+        """
+        screen = Screen()
+        page = 0
+        while True:
+            page, end, lines = self.format_page(page)
+            last = end >= len(self.keys)
+            lines.append(
+                f"  {C2}Page {page + 1}{CE}   "
+                f"Rows {self.starts[page] + 1}-{end} of {len(self.keys)}"
+            )
+            screen.draw(lines)
+            choice = read_line(
+                f"  [N]ext  [P]rev  [#] Jump to page  [B]ack{' (Enter)' if last else ''}: "
+            ).strip()
+            match choice.upper():
+                case "" if last:
+                    break
+                case "B":
+                    break
+                case "" | "N":
+                    page = page if last else page + 1
+                case "P":
+                    page = max(0, page - 1)
+                case number if number.isdigit() and int(number) > 0:
+                    page = int(number) - 1
+                case _:
+                    m.print_err("Enter N, P, B, or a page number.")
+                    m.continue_prompt()
@@ -2,51 +2,62 @@
 This module contains the functions for adding, editing, deleting, and displaying restos.
 """
 # Local Module Imports
+import geo
 import user_inputs as ui
+from input_source import read_line
 from misc import clear_screen, continue_prompt, info, raise_err
 from colors import C1, C2, CE
 import colors as c
 import misc as m
+from render import Pager, Renderer, table_header, table_row
+from records import Resto
+from resto_store import RestoStore
+import terminal as t
 
+# The width of the table of restos, with the name column at its default width
+TABLE_WIDTH = 109
+# The default, narrowest, and widest width of the name column of the table of restos
+NAME_WIDTH = 20
+MIN_NAME_WIDTH = 12
+MAX_NAME_WIDTH = 40
 
-def display_resto_details(resto: str, restos_dict: dict[str, list]) -> None:
+# The prompt for the coordinates of a resto, which is shared by adding and editing restos
+COORDINATES_PROMPT = "  *Enter coordinates (latitude, longitude): "
+
+
+def display_resto_details(resto: str, restos_dict: dict[str, Resto]) -> None:
     """Displays the details of a resto
 
     Args:
         resto (str): the resto
-        restos_dict (dict[str, list]): the dictionary of restos
+        restos_dict (dict[str, Resto]): the dictionary of restos
     """
     # Get the details of the resto from the restos dictionary
-    distance = restos_dict[resto][0]
-    cuisine_type = ", ".join(restos_dict[resto][1])  # Stringify the list of cuisines
-    # Stringify the list of meal types, since it is a Literal string of "B", "L", and/or "D"
-    meal_type = restos_dict[resto][2]
-    meal_types = ""
-    for char in meal_type:
-        if char == "B":
-            meal_types += "Breakfast, "
-        elif char == "L":
-            meal_types += "Lunch, "
-        elif char == "D":
-            meal_types += "Dinner, "
-    meal_types = meal_types.rstrip(", ")
-    cost = restos_dict[resto][3]
-    rating = restos_dict[resto][4]
+    details = restos_dict[resto]
+    distance = details.distance
+    cuisine_type = ", ".join(details.cuisine_type)  # Stringify the list of cuisines
+    # Stringify the meal types from their bitmask, which is cached for each bitmask
+    meal_types = ui.meal_mask_to_names(details.meal_mask)
+    cost = details.cost
+    rating = details.rating
 
     # Display the details of the resto
     print(f"  {C2}Name:{CE} {resto}")
     print(f"  {C2}Distance from UPLB gate:{CE} {distance:.2f} meters")
+    # Only restos with coordinates have them displayed
+    if details.lat is not None:
+        print(f"  {C2}Coordinates:{CE} {geo.format_coordinates(details.lat, details.lon)}")
     print(f"  {C2}Cuisine Type:{CE} {cuisine_type}")
     print(f"  {C2}Meal Types:{CE} {meal_types}")
     print(f"  {C2}Cost per Person:{CE} ₱{cost:.2f}")
     print(f"  {C2}Rating:{CE} {rating}")
 
 
-def view_resto(restos_dict: dict[str, list]) -> None:
+def view_resto(restos_dict: dict[str, Resto]) -> None:
     """Displays the details of a resto.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos
+        restos_dict (dict[str, Resto]): the dictionary of restos
     """
     # Raise an error if there are no restos in the restos dictionary
     if not restos_dict:
@@ -63,7 +74,7 @@ def view_resto(restos_dict: dict[str, list]) -> None:
     )
     # Prompt the user to enter the resto to view
     # Raise an error if the resto does not exist
-    name = m.capitalize_words(input("  Enter resto name: ").strip())
+    name = m.capitalize_words(read_line("  Enter resto name: ").strip())
     print("═══════════════════════════════════════════════════")
     if name not in restos_dict:
         raise_err(f'Resto "{name}" does not exist!')
@@ -83,14 +94,14 @@ def view_resto(restos_dict: dict[str, list]) -> None:
     continue_prompt()
 
 
-def add_restos(restos_dict: dict[str, list]) -> dict[str, list]:
+def add_restos(restos_dict: RestoStore) -> RestoStore:
     """Adds a resto to the restos dictionary.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos
+        restos_dict (RestoStore): the store of restos, which tells its subscribers about the change
 
     Returns:
-        dict[str, list]: the updated dictionary of restos that includes the new resto
+        RestoStore: the updated store of restos that includes the new resto
     """
     clear_screen()
     print(
@@ -101,11 +112,20 @@ def add_restos(restos_dict: dict[str, list]) -> dict[str, list]:
         end="",
     )
     # Prompt the user to enter the details of the resto
-    name = m.capitalize_words(ui.get_string("  Enter name: "))
+    info("* indicates optional fields, press [ENTER] to skip")
+    name = ui.get_name("  Enter name: ")
     if name in restos_dict:
         raise_err(f"Resto {name} already exists.")
         return restos_dict
-    distance = ui.get_float("  Enter distance from UPLB gate (in meters): ")
+    # The distance from UPLB gate is derived from the coordinates, if they are given
+    coordinates = ui.get_coordinates(COORDINATES_PROMPT, False)
+    if coordinates is not None:
+        lat, lon = coordinates
+        distance = geo.gate_distance(lat, lon)
+        info(f"Distance from UPLB gate: {distance:.2f} meters")
+    else:
+        lat = lon = None
+        distance = ui.get_float("  Enter distance from UPLB gate (in meters): ")
     info("For cuisine/s and meal types, enter a comma-separated list of values.")
     ui.print_valid_cuisines()
     cuisine_type = ui.get_list_of_cuisine_types("  Enter cuisine/s: ")
@@ -116,20 +136,22 @@ def add_restos(restos_dict: dict[str, list]) -> dict[str, list]:
     rating = ui.get_rating("  Enter rating (1-5): ")
 
     # Add the resto to the restos dictionary
-    restos_dict[name] = [distance, cuisine_type, meal_type, cost, rating]
+    restos_dict[name] = Resto(
+        distance, cuisine_type, meal_type, cost, rating, lat=lat, lon=lon
+    )
     info(f'Added Resto "{name}"')
     continue_prompt()
     return restos_dict
 
 
-def edit_restos(restos_dict: dict[str, list]) -> dict[str, list]:
+def edit_restos(restos_dict: RestoStore) -> RestoStore:
     """Edits a resto in the restos dictionary.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos
+        restos_dict (RestoStore): the store of restos, which tells its subscribers about the change
 
     Returns:
-        dict[str, list]: the updated dictionary of restos which has the resto edited
+        RestoStore: the updated store of restos which has the resto edited
     """
     # Raise an error if there are no restos in the restos dictionary
     if not restos_dict:
@@ -147,7 +169,7 @@ def edit_restos(restos_dict: dict[str, list]) -> dict[str, list]:
     )
 
     # Prompt the user to enter the resto to edit
-    name = m.capitalize_words(input("  Enter resto name: ").strip())
+    name = m.capitalize_words(read_line("  Enter resto name: ").strip())
     if name not in restos_dict:
         raise_err(f'Resto "{name}" does not exist!')
         return restos_dict
@@ -155,7 +177,13 @@ def edit_restos(restos_dict: dict[str, list]) -> dict[str, list]:
     # Setting previous_name to check if the name was changed
     # Get the details of the resto from the restos dictionary
     previous_name = name
-    distance, cuisine_type, meal_type, cost, rating = restos_dict[name]
+    details = restos_dict[name]
+    distance = details.distance
+    cuisine_type = details.cuisine_type
+    meal_type = details.meal_type
+    cost = details.cost
+    rating = details.rating
+    coordinates = [details.lat, details.lon] if details.lat is not None else None
 
     clear_screen()
     print(
@@ -168,14 +196,23 @@ def edit_restos(restos_dict: dict[str, list]) -> dict[str, list]:
     display_resto_details(name, restos_dict)
     print("═══════════════════════════════════════════════════")
     info(f"Press [ENTER] to keep current value.")
+    info('* indicates optional fields, type "Any" to skip')
     print("═══════════════════════════════════════════════════")
 
     # Prompt the user to enter the new details of the resto
-    name = m.capitalize_words(ui.edit_string("  Enter name: ", name))
+    name = ui.edit_name("  Enter name: ", name)
     if name in restos_dict and previous_name != name:
         raise_err(f"Resto {name} already exists.")
         return restos_dict
-    distance = ui.edit_float("  Enter distance from UPLB gate (m): ", distance)
+    # The distance from UPLB gate is derived from the coordinates, if the resto has them
+    coordinates = ui.edit_coordinates(COORDINATES_PROMPT, coordinates, False)
+    if coordinates is not None:
+        lat, lon = coordinates
+        distance = geo.gate_distance(lat, lon)
+        info(f"Distance from UPLB gate: {distance:.2f} meters")
+    else:
+        lat = lon = None
+        distance = ui.edit_float("  Enter distance from UPLB gate (m): ", distance)
     info("For cuisine types and meal types, enter a comma-separated list of values.")
     ui.print_valid_cuisines()
     cuisine_type = ui.edit_list_of_cuisine_types(
@@ -188,7 +225,9 @@ def edit_restos(restos_dict: dict[str, list]) -> dict[str, list]:
     rating = ui.edit_rating("  Enter rating (1-5): ", rating)
 
     # Update the details of the resto in the restos dictionary
-    restos_dict[name] = [distance, cuisine_type, meal_type, cost, rating]
+    restos_dict[name] = Resto(
+        distance, cuisine_type, meal_type, cost, rating, lat=lat, lon=lon
+    )
 
     # Display a message depending on whether the name was changed or not
     if previous_name != name:
@@ -203,14 +242,14 @@ def edit_restos(restos_dict: dict[str, list]) -> dict[str, list]:
     return restos_dict
 
 
-def delete_restos(restos_dict: dict[str, list]) -> dict[str, list]:
+def delete_restos(restos_dict: RestoStore) -> RestoStore:
     """Deletes a resto from the restos dictionary.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos
+        restos_dict (RestoStore): the store of restos, which tells its subscribers about the change
 
     Returns:
-        dict[str, list]: the updated dictionary of restos which has the resto deleted
+        RestoStore: the updated store of restos which has the resto deleted
     """
     # Raise an error if there are no restos in the restos dictionary
     if not restos_dict:
@@ -228,7 +267,7 @@ def delete_restos(restos_dict: dict[str, list]) -> dict[str, list]:
 
     # Prompt the user to enter the resto to delete
     # Raise an error if the resto does not exist
-    name = m.capitalize_words(input("  Enter resto name: ").strip())
+    name = m.capitalize_words(read_line("  Enter resto name: ").strip())
     print("═══════════════════════════════════════════════════")
     if name not in restos_dict:
         raise_err(f'Resto "{name}" does not exist!')
@@ -247,7 +286,7 @@ def delete_restos(restos_dict: dict[str, list]) -> dict[str, list]:
     print(f"{c.RED}  Are you sure you want to delete {name}?{c.END}")
     print("  [Y] Yes")
     print("  [Any Key] No")
-    choice = input("  Enter choice: ").upper()
+    choice = read_line("  Enter choice: ").upper()
     if choice == "Y":
         del restos_dict[name]
         info(f'Deleted Resto "{name}"')
@@ -258,99 +297,201 @@ def delete_restos(restos_dict: dict[str, list]) -> dict[str, list]:
     return restos_dict
 
 
-def display_restos_simple(restos_dict: dict[str, list]) -> None:
-    """Displays the gusto labels and their descriptions.
+def cuisine_lines(list_of_cuisines: list) -> list[str]:
+    """Stringifies the cuisines of a resto, one per line, for the tables of restos.
+
+    Args:
+        list_of_cuisines (list): the cuisines of the resto
+
+    Returns:
+        list[str]: the first cuisine, then the rest of the cuisines joined by tree lines
+    """
+    # Using ternary if-else, if the length of the list of cuisines is 1, display the cuisine
+    # If the length of the list of cuisines is greater than 1, display the first cuisine
+    # Then loop for the rest of the cuisines and display them per line
+    if len(list_of_cuisines) == 1:
+        return [list_of_cuisines[0]]
+    rest = list_of_cuisines[1:]
+    return [f"┬ {list_of_cuisines[0]}"] + [
+        f"├ {cuisine}" if idx != len(rest) - 1 else f"└ {cuisine}"
+        for idx, cuisine in enumerate(rest)
+    ]
+
+
+def resto_height(restos_dict: dict[str, Resto], resto: str) -> int:
+    """Gets the number of lines a resto takes in the tables of restos, one per cuisine.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        resto (str): the resto
+
+    Returns:
+        int: the number of lines
+    """
+    return len(restos_dict[resto].cuisine_type)
+
+
+def format_resto_simple(restos_dict: dict[str, Resto], resto: str) -> list[str]:
+    """Formats a resto into the lines of the simple table of restos.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        resto (str): the resto
+
+    Returns:
+        list[str]: the lines of the resto
+    """
+    # Truncate the resto name if it is longer than 32 characters
+    name = resto if len(resto) <= 32 else resto[:29] + "..."
+    cuisines = cuisine_lines(restos_dict[resto].cuisine_type)
+    return [f"  {name:<32}   {cuisines[0]}"] + [
+        f"  {'':<32}   {cuisine}" for cuisine in cuisines[1:]
+    ]
+
+
+def resto_name_width(extra: int = 0) -> int:
+    """Gets the width of the name column of the table of restos, so the table fits the terminal.
+
+    Args:
+        extra (int, optional): the width of columns added to the table, like scores. Defaults to 0.
+
+    Returns:
+        int: the width of the name column
+    """
+    return t.flex_width(TABLE_WIDTH + extra, NAME_WIDTH, MIN_NAME_WIDTH, MAX_NAME_WIDTH)
+
+
+def resto_columns(name_width: int) -> list[tuple[str, int]]:
+    """Gets the headings and widths of the columns of the table of restos.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of gustos
+        name_width (int): the width of the name column
+
+    Returns:
+        list[tuple[str, int]]: the heading and width of each column
+    """
+    return [
+        ("Name", name_width),
+        ("Distance", 12),
+        ("Cuisines", 16),
+        ("Meal Types", 26),
+        ("Cost", 10),
+        ("Rating", 6),
+    ]
+
+
+def format_resto(
+    restos_dict: dict[str, Resto],
+    resto: str,
+    name_width: int = NAME_WIDTH,
+    name_color: str = "",
+    score: str | None = None,
+) -> list[str]:
+    """Formats a resto into the lines of the table of restos.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        resto (str): the resto
+        name_width (int, optional): the width of the name column. Defaults to NAME_WIDTH.
+        name_color (str, optional): the color of the name. Defaults to no color.
+        score (str | None, optional): the score, for a table of ranked recos. Defaults to None.
+
+    Returns:
+        list[str]: the lines of the resto
+    """
+    # Truncate the resto name if it is too long
+    name = resto if len(resto) <= name_width else resto[: name_width - 3] + "..."
+    # The color is added around the padded name, so it does not count towards the width
+    if name_color:
+        name = f"{name_color}{name:<{name_width}}{CE}"
+    details = restos_dict[resto]
+    distance = f"{details.distance:.2f}m"
+    cuisines = cuisine_lines(details.cuisine_type)
+    # Stringify the meal types from their bitmask, which is cached for each bitmask
+    meal_types = ui.meal_mask_to_names(details.meal_mask)
+    cost = f"₱{details.cost:.2f}"
+    rating = f"{details.rating:.1f}"
+    cells = [
+        (name, 0 if name_color else name_width, "<"),
+        (distance, 12, "<"),
+        (cuisines[0], 16, "<"),
+        (meal_types, 26, "<"),
+        (cost, 10, ">"),
+        (rating, 6, "^"),
+    ]
+    if score is not None:
+        cells.append((score, 6, "^"))
+    lines = [table_row(cells)]
+    # The rest of the cuisines are on their own lines, under the first one
+    blank = [("", width, align) for _, width, align in cells]
+    blank[0] = ("", name_width, "<")
+    for cuisine in cuisines[1:]:
+        blank[2] = (cuisine, 16, "<")
+        lines.append(table_row(blank))
+    return lines
+
+
+def display_restos_simple(restos_dict: dict[str, Resto]) -> None:
+    """Displays the resto names and their cuisines.
+
+    If the restos do not fit in the terminal, they are shown one page at a time,
+    and the last page stays on the screen for the prompt that follows.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
     """
     # Raise an error if there are no restos in the restos dictionary
     if not restos_dict:
         raise_err("No restos to display! Add a resto!")
         return
-    print(
-        "═══════════════════════════════════════════════════\n",
-        f"{C1}                       Restos                     {CE}\n",
-        "═══════════════════════════════════════════════════\n",
-        f"{C2}{c.ITALIC}                Name                 Cuisines{CE}\n",
+    pager = Pager(
+        list(restos_dict),
+        lambda resto: resto_height(restos_dict, resto),
+        lambda resto: format_resto_simple(restos_dict, resto),
+        "═══════════════════════════════════════════════════\n"
+        f"{C1}                       Restos                     {CE}\n"
+        "═══════════════════════════════════════════════════\n"
+        f"{C2}{c.ITALIC}                Name                 Cuisines{CE}\n"
         "───────────────────────────────────────────────────\n",
-        sep="",
-        end="",
+        "",
     )
-    # Loop through the restos dictionary and display the resto name and its list of cuisines
-    for resto in restos_dict:
-        # Truncate the resto name if it is longer than 32 characters
-        name = resto if len(resto) <= 32 else resto[:29] + "..."
-        list_of_cuisines = restos_dict[resto][1]
-        # Using ternary if-else, if the length of the list of cuisines is 1, display the cuisine
-        # If the length of the list of cuisines is greater than 1, display the first cuisine
-        # Then loop for the rest of the cuisines and display them per line
-        print(
-            f"  {name:<32}   {list_of_cuisines[0] if len(list_of_cuisines) == 1 else f'┬ {list_of_cuisines[0]}'}"
-        )
-        for idx, cuisine in enumerate(list_of_cuisines[1:]):
-            cuisine = (
-                f"├ {cuisine}"
-                if idx != len(list_of_cuisines[1:]) - 1
-                else f"└ {cuisine}"
-            )
-            print(f"  {'':<32}   {cuisine}")
-
-
-def display_restos(restos_dict: dict[str, list]) -> None:
-    """Displays the gustos in the gustos dictionary.
+    if pager.is_single_page():
+        with Renderer() as out:
+            pager.render(0, out)
+    else:
+        pager.show()
+
+
+def display_restos(restos_dict: dict[str, Resto]) -> None:
+    """Displays the restos in the restos dictionary, one page at a time.
+
+    Only the restos on the visible page are formatted, so a large catalog is shown right away.
+    The name column grows or shrinks with the width of the terminal.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of gustos
+        restos_dict (dict[str, Resto]): the dictionary of restos
     """
     # Raise an error if there are no restos in the restos dictionary
     if not restos_dict:
         raise_err("No restos to display! Add a resto!")
         return
+    restos_pager(restos_dict).show()
     clear_screen()
-    print(
-        "═════════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
-        f"{C1}                                                    Restos                                                  {CE}\n",
-        "═════════════════════════════════════════════════════════════════════════════════════════════════════════════\n",
-        f"{C2}{c.ITALIC}          Name             Distance         Cuisines               Meal Types              Cost      Rating  {CE}\n"
-        "─────────────────────────────────────────────────────────────────────────────────────────────────────────────\n",
-        sep="",
-        end="",
-    )
-    for resto in restos_dict:
-        # Truncate the resto name if it is too long
-        name = resto if len(resto) <= 20 else resto[:17] + "..."
-        distance = f"{restos_dict[resto][0]:.2f}m"
-        list_of_cuisines = restos_dict[resto][1]
-        # Stringify the list of meal types, since it is a Literal string of "B", "L", and/or "D"
-        meal_type = restos_dict[resto][2]
-        meal_types = ""
-        for char in meal_type:
-            if char == "B":
-                meal_types += "Breakfast, "
-            elif char == "L":
-                meal_types += "Lunch, "
-            elif char == "D":
-                meal_types += "Dinner, "
-        meal_types = meal_types.rstrip(", ")
-        cost = f"₱{restos_dict[resto][3]:.2f}"
-        rating = f"{restos_dict[resto][4]:.1f}"
-        # Using ternary if-else, if the length of the list of cuisines is 1, display the cuisine
-        # If the length of the list of cuisines is greater than 1, display the first cuisine
-        # Then loop for the rest of the cuisines and display them per line
-        print(
-            f"  {name:<20}   {distance:<12}   {list_of_cuisines[0] if len(list_of_cuisines) == 1 else f'┬ {list_of_cuisines[0]}':<16}   {meal_types:<26}   {cost:>10}   {rating:^6}  "
-        )
-        for idx, cuisine in enumerate(list_of_cuisines[1:]):
-            cuisine = (
-                f"├ {cuisine}"
-                if idx != len(list_of_cuisines[1:]) - 1
-                else f"└ {cuisine}"
-            )
-            filler = ""
-            print(
-                f"  {filler:<20}   {filler:<12}   {cuisine:<16}   {filler:<26}   {filler:>10}   {filler:^6}  "
-            )
-    print(
-        "═════════════════════════════════════════════════════════════════════════════════════════════════════════════"
+
+
+def restos_pager(restos_dict: dict[str, Resto]) -> Pager:
+    """Prepares the pages of the table of restos.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+
+    Returns:
+        Pager: the pages, with the name column fitted to the terminal each time a page is shown
+    """
+    return Pager(
+        list(restos_dict),
+        lambda resto: resto_height(restos_dict, resto),
+        lambda resto: format_resto(restos_dict, resto, resto_name_width()),
+        lambda: table_header("Restos", resto_columns(resto_name_width()))[0],
+        lambda: table_header("Restos", resto_columns(resto_name_width()))[1],
     )
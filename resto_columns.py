@@ -0,0 +1,155 @@
+"""
+This module contains a columnar, NumPy-backed copy of the restos for checking many gustos at once.
+"""
+
+# Third Party Imports
+# NumPy is optional. Without it, batch recos fall back to checking one gusto at a time.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Local Module Imports
+import geo
+from records import Resto
+import user_inputs as ui
+
+# The maximum number of gusto x resto cells checked at once
+# This keeps the boolean masks at a few megabytes no matter how many gustos are checked
+CHUNK_CELLS = 4_000_000
+
+
+class RestoColumns:
+    """A columnar copy of the restos dictionary.
+
+    The restos are stored as parallel arrays, where index i of every array is the resto names[i]:
+    - distance, cost, and rating as float64 arrays
+    - latitude and longitude as float64 arrays, with NaN for a resto without coordinates
+    - meal types as a uint8 bitmask array (see user_inputs.meal_type_to_mask)
+    - cuisines as a uint32 bitmask array (see user_inputs.cuisines_to_mask)
+    """
+
+    def __init__(self, restos_dict: dict[str, Resto]) -> None:
+        """Builds the columns from the restos dictionary.
+
+        Args:
+            restos_dict (dict[str, Resto]): the dictionary of restos
+        """
+        if np is None:
+            raise ImportError("NumPy is required for the columnar copy of the restos.")
+        size = len(restos_dict)
+        self.names: list[str] = list(restos_dict)
+        self.distance = np.empty(size, dtype=np.float64)
+        self.cost = np.empty(size, dtype=np.float64)
+        self.rating = np.empty(size, dtype=np.float64)
+        self.lat = np.full(size, np.nan, dtype=np.float64)
+        self.lon = np.full(size, np.nan, dtype=np.float64)
+        self.meal_mask = np.empty(size, dtype=np.uint8)
+        self.cuisine_mask = np.empty(size, dtype=np.uint32)
+        for idx, value in enumerate(restos_dict.values()):
+            self.distance[idx] = value.distance
+            self.cuisine_mask[idx] = value.cuisine_mask
+            self.meal_mask[idx] = value.meal_mask
+            self.cost[idx] = value.cost
+            self.rating[idx] = value.rating
+            if value.lat is not None:
+                self.lat[idx] = value.lat
+                self.lon[idx] = value.lon
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def origin_distance(self, lat, lon):
+        """Gets the distance of every resto from each origin, with the haversine formula of geo.distance.
+
+        Args:
+            lat (np.ndarray): the latitudes of the origins (in degrees)
+            lon (np.ndarray): the longitudes of the origins (in degrees)
+
+        Returns:
+            np.ndarray: an (origins, N) array of distances (in meters), NaN for a resto without coordinates
+        """
+        phi1 = np.radians(lat)[:, None]
+        phi2 = np.radians(self.lat)[None, :]
+        half_lat = np.sin((phi2 - phi1) / 2)
+        half_lon = np.sin(np.radians(self.lon[None, :] - lon[:, None]) / 2)
+        a = half_lat * half_lat + np.cos(phi1) * np.cos(phi2) * half_lon * half_lon
+        return 2 * geo.EARTH_RADIUS * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+    def match(self, gustos: list[tuple]):
+        """Checks every gusto against every resto using broadcast boolean masks.
+
+        Args:
+            gustos (list[tuple]): the gustos, as (label, details) tuples
+
+        Yields:
+            tuple: the gusto and an array of the indices of its matching restos
+        """
+        if not gustos:
+            return
+
+        # Turn the gustos into columns as well
+        # A None requirement becomes a value that every resto fulfills
+        details = [gusto[1] for gusto in gustos]
+        group_size = np.array([gusto.group_size for gusto in details], dtype=np.float64)
+        meal_mask = np.array(
+            [1 << ui.meal_types_sorter[gusto.meal_type[0]] for gusto in details],
+            dtype=np.uint8,
+        )
+        budget = np.array(
+            [np.inf if gusto.budget is None else gusto.budget for gusto in details],
+            dtype=np.float64,
+        )
+        max_distance = np.array(
+            [np.inf if gusto.max_distance is None else gusto.max_distance for gusto in details],
+            dtype=np.float64,
+        )
+        cuisine_mask = np.array(
+            [
+                0 if gusto.cuisine_type is None else ui.cuisine_bits[gusto.cuisine_type]
+                for gusto in details
+            ],
+            dtype=np.uint32,
+        )
+        min_rating = np.array(
+            [-np.inf if gusto.min_rating is None else gusto.min_rating for gusto in details],
+            dtype=np.float64,
+        )
+        # A gusto without an origin measures the max distance from UPLB gate
+        # An origin without a max distance does not filter the restos
+        has_origin = np.array(
+            [gusto.origin is not None and gusto.max_distance is not None for gusto in details],
+            dtype=bool,
+        )
+        origin_lat = np.array(
+            [np.nan if gusto.origin is None else gusto.origin[0] for gusto in details],
+            dtype=np.float64,
+        )
+        origin_lon = np.array(
+            [np.nan if gusto.origin is None else gusto.origin[1] for gusto in details],
+            dtype=np.float64,
+        )
+
+        # Check the gustos in chunks, each one a (chunk, N) boolean mask
+        chunk = max(1, CHUNK_CELLS // max(1, len(self)))
+        for start in range(0, len(gustos), chunk):
+            rows = slice(start, start + chunk)
+            mask = (self.meal_mask[None, :] & meal_mask[rows, None]) != 0
+            # The same check as the linear scan: budget < cost * group_size fails
+            mask &= self.cost[None, :] * group_size[rows, None] <= budget[rows, None]
+            if has_origin[rows].any():
+                # A resto without coordinates has a NaN distance from the origin, so it never matches
+                distance = np.where(
+                    has_origin[rows, None],
+                    self.origin_distance(origin_lat[rows], origin_lon[rows]),
+                    self.distance[None, :],
+                )
+                mask &= distance <= max_distance[rows, None]
+            else:
+                mask &= self.distance[None, :] <= max_distance[rows, None]
+            mask &= (cuisine_mask[rows, None] == 0) | (
+                (self.cuisine_mask[None, :] & cuisine_mask[rows, None]) != 0
+            )
+            mask &= self.rating[None, :] >= min_rating[rows, None]
+            for offset, row in enumerate(mask):
+                yield gustos[start + offset], np.flatnonzero(row)
@@ -0,0 +1,415 @@
+"""
+This module contains the bulk importer of restos from CSV or JSONL files.
+
+Examples:
+    python resto_import.py catalog.csv
+    python resto_import.py catalog.jsonl --rejects bad.jsonl --batch-size 5000
+    python resto_import.py catalog.csv --replace
+
+Each row has the keys name, distance, cuisines, meal_types, cost, and rating,
+the same as the recos written by cli.py. In CSV, cuisines and meal types are
+separated by "," or ";". In JSONL, they can also be lists. The keys lat and lon
+are optional, and a row with them can leave out the distance, since the distance
+from UPLB gate is derived from them.
+
+Each row is checked with the same rules as the prompts of Add Resto, so invalid
+cuisines and meal types are discarded as long as one is valid. The rows are read
+one at a time, and the rows that fail are written to a rejects file as they are
+found, in the same format with an extra "error" key. A fixed rejects file can be
+imported as it is.
+
+With SQLite, each row is written straight to the database and looked up there by
+name, so memory does not grow with the input. With the journal or the text files,
+resto.dat is loaded lazily (unless RESTO_RECO_LAZY is set), and every FLUSH_SIZE
+rows the imported restos are written into it and it is mapped again. Only the
+name and offset of each resto then stay in memory. A binary resto.dat cannot be
+mapped, so the importer warns that the imported restos stay in memory.
+"""
+
+# Standard Library Imports
+import argparse
+import csv
+import json
+import os
+import sys
+
+# Local Module Imports
+import save_load as sl
+import user_inputs as ui
+from lazy_restos import LazyRestos
+from records import Gusto, Resto
+from resto_store import RestoStore
+from sqlite_store import SqliteRestos
+
+# The number of rows saved to the disk together
+BATCH_SIZE = 1000
+# The number of imported restos kept in memory before they are written into resto.dat
+# Each flush rewrites resto.dat, so this trades memory for the number of rewrites
+FLUSH_SIZE = 50_000
+# The columns of a CSV file, in order
+FIELDS = ["name", "distance", "cuisines", "meal_types", "cost", "rating", "lat", "lon"]
+
+
+def detect_format(path: str) -> str:
+    """Guesses the format of a file from its extension.
+
+    Args:
+        path (str): the path of the file
+
+    Returns:
+        str: "jsonl" for .jsonl and .ndjson files, otherwise "csv"
+    """
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson") else "csv"
+
+
+def read_csv_rows(fh):
+    """Yields the rows of a CSV file with a header row, one at a time.
+
+    Args:
+        fh (TextIO): the file
+
+    Yields:
+        tuple[int, dict | None]: the line number and the row
+    """
+    reader = csv.DictReader(fh)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl_rows(fh):
+    """Yields the rows of a JSONL file, one at a time. Blank lines are skipped.
+
+    Args:
+        fh (TextIO): the file
+
+    Yields:
+        tuple[int, dict | str]: the line number and the row, or the line if it is not a JSON object
+    """
+    for line_num, line in enumerate(fh, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_num, row if isinstance(row, dict) else line.rstrip("\n")
+
+
+def field(row: dict, key: str) -> str:
+    """Gets a field of a row as the text a user would type.
+
+    Args:
+        row (dict): the row
+        key (str): the key of the field
+
+    Raises:
+        ValueError: if the field is missing
+
+    Returns:
+        str: the stripped field, with lists joined by ","
+    """
+    value = row.get(key)
+    if value is None:
+        raise ValueError("Input cannot be blank.")
+    if isinstance(value, list):
+        value = ",".join(map(str, value))
+    return str(value).replace(";", ",").strip()
+
+
+def validate_row(row: dict) -> tuple[str, Resto, list]:
+    """Checks a row with the same rules as the prompts of Add Resto.
+
+    Args:
+        row (dict): the row
+
+    Raises:
+        ValueError: if a field is invalid, with the field and the message the prompt would show
+
+    Returns:
+        tuple[str, Resto, list]: the name, the details, and the discarded cuisines and meal types
+    """
+    discarded = []
+    # The coordinates are optional, and the distance is derived from them when they are given
+    coordinates = None
+    if row.get("lat") not in (None, "") or row.get("lon") not in (None, ""):
+        try:
+            coordinates = ui.validate_coordinates(f"{field(row, 'lat')},{field(row, 'lon')}")
+        except ValueError as err:
+            raise ValueError(f"lat, lon: {err}")
+    checks = [
+        ("name", ui.validate_name),
+        ("distance", ui.validate_float),
+        ("cuisines", lambda value: ui.validate_list_of_cuisine_types(value, discarded.append)),
+        ("meal_types", lambda value: ui.validate_list_of_meal_types(value, discarded.append)),
+        ("cost", ui.validate_float),
+        ("rating", ui.validate_rating),
+    ]
+    details = []
+    for key, check in checks:
+        if key == "distance" and coordinates is not None:
+            details.append(None)
+            continue
+        try:
+            details.append(check(field(row, key)))
+        except ValueError as err:
+            raise ValueError(f"{key}: {err}")
+    name, distance, cuisine_type, meal_type, cost, rating = details
+    lat, lon = coordinates if coordinates is not None else (None, None)
+    return (
+        name,
+        Resto(distance, cuisine_type, meal_type, cost, rating, lat=lat, lon=lon),
+        discarded,
+    )
+
+
+class RejectsWriter:
+    """Writes the rejected rows to a side file, opening it only when the first row is rejected."""
+
+    def __init__(self, path: str, file_format: str) -> None:
+        """Prepares the rejects file.
+
+        Args:
+            path (str): the path of the rejects file
+            file_format (str): "csv" or "jsonl"
+        """
+        self.path = path
+        self.format = file_format
+        self.fh = None
+        self.writer = None
+        self.count = 0
+
+    def write(self, line_num: int, row: dict | str | None, error: str) -> None:
+        """Writes a rejected row with the reason it was rejected.
+
+        Args:
+            line_num (int): the line number of the row in the input
+            row (dict | str | None): the row, or the line if it could not be parsed
+            error (str): the reason
+        """
+        if self.fh is None:
+            self.fh = open(self.path, "w", encoding="utf-8", newline="")
+            if self.format == "csv":
+                self.writer = csv.DictWriter(
+                    self.fh,
+                    fieldnames=FIELDS + ["line", "error"],
+                    extrasaction="ignore",
+                    lineterminator="\n",
+                )
+                self.writer.writeheader()
+        if not isinstance(row, dict):
+            row = {"raw": row}
+        if self.format == "csv":
+            self.writer.writerow({**row, "line": line_num, "error": error})
+        else:
+            self.fh.write(
+                json.dumps({**row, "line": line_num, "error": error}, ensure_ascii=False) + "\n"
+            )
+        self.count += 1
+
+    def close(self) -> None:
+        """Closes the rejects file if it was opened."""
+        if self.fh is not None:
+            self.fh.close()
+            self.fh = None
+
+
+def can_flush(restos_dict: RestoStore | SqliteRestos) -> bool:
+    """Checks if the imported restos can be written into resto.dat and dropped from memory.
+
+    Args:
+        restos_dict (RestoStore | SqliteRestos): the restos being imported into
+
+    Returns:
+        bool: whether the store wraps a LazyRestos that a text resto.dat can replace
+    """
+    return (
+        isinstance(restos_dict, RestoStore)
+        and isinstance(restos_dict.data, LazyRestos)
+        and sl.SNAPSHOT_FORMAT == "text"
+    )
+
+
+def flush_restos(restos_dict: RestoStore, gustos_dict: dict[str, Gusto]) -> None:
+    """Writes the imported restos into resto.dat, then maps it again so they leave memory.
+
+    With the journal, this compacts the journal into resto.dat. With the text backend,
+    the restos are streamed into a temporary file that replaces resto.dat. Either way,
+    the restos that were not changed are copied as they are, without being parsed.
+
+    Args:
+        restos_dict (RestoStore): the store of restos, wrapping a LazyRestos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+    """
+    sl.save(restos_dict, gustos_dict)
+    # The old restos are dropped first, so they are never in memory alongside the new ones
+    restos_dict.data = {}
+    restos_dict.data = LazyRestos(sl.RESTO_PATH, sl.parse_resto)
+
+
+def import_restos(
+    rows,
+    restos_dict: RestoStore | SqliteRestos,
+    gustos_dict: dict[str, Gusto],
+    rejects: RejectsWriter,
+    batch_size: int = BATCH_SIZE,
+    replace: bool = False,
+    flush_size: int = FLUSH_SIZE,
+) -> dict[str, int]:
+    """Adds the valid rows to the restos, saving them to the disk in batches.
+
+    Each batch is one transaction with SQLite and one sync with the journal. The rows
+    are read and dropped one at a time. Given the restos of the database, each row is
+    written to it right away, and the duplicates are found by looking up the name.
+    Otherwise, the imported restos are flushed into resto.dat every flush_size rows
+    when the store wraps a LazyRestos (see can_flush).
+
+    Args:
+        rows (Iterable[tuple[int, dict | str | None]]): the line numbers and rows
+        restos_dict (RestoStore | SqliteRestos): the store of restos, which saves each change,
+            or the restos of the database
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos, for compacting the journal
+        rejects (RejectsWriter): the writer of the rejected rows
+        batch_size (int, optional): the number of rows per batch. Defaults to BATCH_SIZE.
+        replace (bool, optional): whether to replace restos that already exist instead of rejecting them. Defaults to False.
+        flush_size (int, optional): the number of imported restos kept in memory before a flush. Defaults to FLUSH_SIZE.
+
+    Returns:
+        dict[str, int]: the number of rows added, replaced, rejected, and with discarded values
+    """
+    counts = {"added": 0, "replaced": 0, "rejected": 0, "discarded": 0}
+    flush = can_flush(restos_dict)
+    # The number of restos imported since the last flush
+    pending = 0
+    rows = iter(rows)
+    while True:
+        size = 0
+        with sl.batch():
+            for line_num, row in rows:
+                size += 1
+                if not isinstance(row, dict):
+                    rejects.write(line_num, row, "Row is not a JSON object.")
+                    counts["rejected"] += 1
+                else:
+                    try:
+                        name, details, discarded = validate_row(row)
+                        exists = name in restos_dict
+                        if exists and not replace:
+                            raise ValueError(f"Resto {name} already exists.")
+                    except ValueError as err:
+                        rejects.write(line_num, row, str(err))
+                        counts["rejected"] += 1
+                    else:
+                        counts["replaced" if exists else "added"] += 1
+                        counts["discarded"] += bool(discarded)
+                        restos_dict[name] = details
+                        pending += 1
+                if size == batch_size:
+                    break
+        # The imported restos leave memory once enough of them are kept
+        # Otherwise, the journal is compacted between batches once it is large enough
+        if flush and pending >= flush_size:
+            flush_restos(restos_dict, gustos_dict)
+            pending = 0
+        elif sl.STORAGE_BACKEND == "journal":
+            sl.checkpoint(restos_dict, gustos_dict)
+        if size < batch_size:
+            return counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    """The main function of the bulk importer.
+
+    Args:
+        argv (list[str] | None, optional): the arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: the exit code, 1 if any row was rejected
+    """
+    parser = argparse.ArgumentParser(description="Import restos from a CSV or JSONL file.")
+    parser.add_argument("path", help='the file to import, or "-" for stdin')
+    parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        help="the format of the file (default: guessed from the extension, csv for stdin)",
+    )
+    parser.add_argument(
+        "--rejects",
+        metavar="PATH",
+        help="where to write the rejected rows (default: <path>.rejects.<format>)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"the number of rows saved together (default: {BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="replace restos that already exist instead of rejecting them",
+    )
+    args = parser.parse_args(argv)
+    if args.batch_size <= 0:
+        parser.error("--batch-size must be greater than 0")
+
+    file_format = args.format or ("csv" if args.path == "-" else detect_format(args.path))
+    if args.rejects is None:
+        base = "import" if args.path == "-" else os.path.splitext(args.path)[0]
+        args.rejects = f"{base}.rejects.{file_format}"
+
+    try:
+        fh = (
+            sys.stdin
+            if args.path == "-"
+            else open(args.path, "r", encoding="utf-8", newline="")
+        )
+    except OSError as err:
+        parser.error(f"cannot read {args.path}: {err.strerror}")
+
+    # Only the names of the existing restos are needed, so they are not parsed
+    if "RESTO_RECO_LAZY" not in os.environ:
+        sl.LAZY_LOADING = True
+    data, gustos = sl.load({}, {})
+    # The restos of the database save each row themselves in the open batch
+    if sl.STORAGE_BACKEND == "sqlite":
+        restos = data
+    else:
+        restos = RestoStore(data)
+        restos.subscribe(sl.on_resto_change)
+        if not can_flush(restos):
+            print(
+                "Warning: resto.dat is not loaded lazily, so every imported resto stays in memory.",
+                file=sys.stderr,
+            )
+    rejects = RejectsWriter(args.rejects, file_format)
+    rows = read_csv_rows(fh) if file_format == "csv" else read_jsonl_rows(fh)
+    try:
+        counts = import_restos(rows, restos, gustos, rejects, args.batch_size, args.replace)
+    finally:
+        rejects.close()
+        if fh is not sys.stdin:
+            fh.close()
+
+    # The text backend saves everything at once
+    if sl.STORAGE_BACKEND == "text":
+        sl.save(restos, gustos)
+    sl.wait_for_compaction()
+    sl.close_journal()
+
+    print(
+        f"Added {counts['added']}, replaced {counts['replaced']}, "
+        f"rejected {counts['rejected']} restos.",
+        file=sys.stderr,
+    )
+    if counts["discarded"]:
+        print(
+            f"{counts['discarded']} restos had invalid cuisines or meal types discarded.",
+            file=sys.stderr,
+        )
+    if rejects.count:
+        print(f"Rejected rows were written to {args.rejects}", file=sys.stderr)
+    return 1 if counts["rejected"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
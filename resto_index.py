@@ -0,0 +1,289 @@
+"""
+This module contains the index used for answering gusto queries without scanning every resto.
+"""
+
+# Standard Library Imports
+import bisect
+import itertools
+
+# Local Module Imports
+import geo
+from records import Resto
+
+# A sentinel that compares greater than any slot number.
+# This is used with bisect so that (value, slot) tuples with an equal value are included.
+_INF = float("inf")
+
+
+class Bitset:
+    """A growable bitset backed by a bytearray, with one bit per resto slot."""
+
+    __slots__ = ("data",)
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def add(self, slot: int) -> None:
+        """Sets the bit of a slot.
+
+        Args:
+            slot (int): the slot to set
+        """
+        # Grow the bytearray if the slot does not fit yet
+        byte_idx = slot >> 3
+        if byte_idx >= len(self.data):
+            self.data.extend(bytes(byte_idx + 1 - len(self.data)))
+        self.data[byte_idx] |= 1 << (slot & 7)
+
+    def discard(self, slot: int) -> None:
+        """Clears the bit of a slot.
+
+        Args:
+            slot (int): the slot to clear
+        """
+        byte_idx = slot >> 3
+        if byte_idx < len(self.data):
+            self.data[byte_idx] &= ~(1 << (slot & 7)) & 0xFF
+
+    def __contains__(self, slot: int) -> bool:
+        byte_idx = slot >> 3
+        return byte_idx < len(self.data) and bool(self.data[byte_idx] >> (slot & 7) & 1)
+
+    def to_int(self) -> int:
+        """Converts the bitset into an int so that it can be intersected with other bitsets.
+
+        Returns:
+            int: the bitset as an int, where bit i is slot i
+        """
+        return int.from_bytes(self.data, "little")
+
+
+def iter_bits(bits: int):
+    """Yields the positions of the set bits of an int, from lowest to highest.
+
+    Args:
+        bits (int): the bitset as an int
+
+    Yields:
+        int: the position of a set bit
+    """
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    # itertools.compress skips the zero bytes at C speed, so only non-empty bytes are unpacked
+    for byte_idx in itertools.compress(range(len(data)), data):
+        byte = data[byte_idx]
+        for bit in range(8):
+            if byte >> bit & 1:
+                yield (byte_idx << 3) | bit
+
+
+class RestoIndex:
+    """An index over the restos dictionary.
+
+    Each resto is given a slot number. The index keeps:
+    - a bitset of slots for each meal type ("B", "L", "D")
+    - an inverted index from cuisine to a bitset of slots
+    - sorted (value, slot) arrays on distance, cost, and rating
+    - a spatial grid of the slots of the restos with coordinates (see geo.GridIndex)
+
+    A query intersects the bitsets, and uses the sorted arrays to find the
+    smallest range of candidates, instead of testing every resto. A gusto with
+    an origin only checks the restos the grid finds within its max distance.
+    """
+
+    def __init__(self, restos_dict: dict[str, Resto]) -> None:
+        """Builds the index from the restos dictionary.
+
+        Args:
+            restos_dict (dict[str, Resto]): the dictionary of restos
+        """
+        self.slots: dict[str, int] = {}
+        self.names: list[str | None] = []
+        self.records: list[Resto | None] = []
+        self.free_slots: list[int] = []
+        self.meal_bits: dict[str, Bitset] = {"B": Bitset(), "L": Bitset(), "D": Bitset()}
+        self.cuisine_bits: dict[str, Bitset] = {}
+        self.by_distance: list[tuple[float, int]] = []
+        self.by_cost: list[tuple[float, int]] = []
+        self.by_rating: list[tuple[float, int]] = []
+        self.grid = geo.GridIndex()
+
+        # Fill the bitsets first and sort the arrays once at the end
+        # Inserting into the sorted arrays one by one would be O(N²)
+        for name, value in restos_dict.items():
+            slot = self._claim_slot(name, value)
+            self.by_distance.append((value.distance, slot))
+            self.by_cost.append((value.cost, slot))
+            self.by_rating.append((value.rating, slot))
+        self.by_distance.sort()
+        self.by_cost.sort()
+        self.by_rating.sort()
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def _claim_slot(self, name: str, value: Resto) -> int:
+        """Gives a resto a slot and sets its bits. The sorted arrays are left to the caller.
+
+        Args:
+            name (str): the name of the resto
+            value (Resto): the details of the resto
+
+        Returns:
+            int: the slot of the resto
+        """
+        # Reuse a slot freed by a deleted resto to keep the bitsets small
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.names[slot] = name
+            self.records[slot] = value
+        else:
+            slot = len(self.names)
+            self.names.append(name)
+            self.records.append(value)
+        self.slots[name] = slot
+
+        for char in value.meal_type:
+            self.meal_bits[char].add(slot)
+        for cuisine in value.cuisine_type:
+            self.cuisine_bits.setdefault(cuisine, Bitset()).add(slot)
+        if value.lat is not None:
+            self.grid.add(slot, value.lat, value.lon)
+        return slot
+
+    def add(self, name: str, value: Resto) -> None:
+        """Adds a resto to the index.
+
+        Args:
+            name (str): the name of the resto
+            value (Resto): the details of the resto
+        """
+        slot = self._claim_slot(name, value)
+        bisect.insort(self.by_distance, (value.distance, slot))
+        bisect.insort(self.by_cost, (value.cost, slot))
+        bisect.insort(self.by_rating, (value.rating, slot))
+
+    def remove(self, name: str) -> None:
+        """Removes a resto from the index.
+
+        Args:
+            name (str): the name of the resto
+        """
+        slot = self.slots.pop(name)
+        value = self.records[slot]
+        for char in value.meal_type:
+            self.meal_bits[char].discard(slot)
+        for cuisine in value.cuisine_type:
+            self.cuisine_bits[cuisine].discard(slot)
+        self.grid.remove(slot)
+        for array, entry in (
+            (self.by_distance, (value.distance, slot)),
+            (self.by_cost, (value.cost, slot)),
+            (self.by_rating, (value.rating, slot)),
+        ):
+            del array[bisect.bisect_left(array, entry)]
+        self.names[slot] = None
+        self.records[slot] = None
+        self.free_slots.append(slot)
+
+    def update(self, old_name: str, name: str, value: Resto) -> None:
+        """Updates a resto in the index, which may also rename it.
+
+        Args:
+            old_name (str): the name of the resto before the edit
+            name (str): the name of the resto after the edit
+            value (Resto): the new details of the resto
+        """
+        self.remove(old_name)
+        self.add(name, value)
+
+    def query(
+        self,
+        group_size: int,
+        meal_type: str,
+        budget: float | None,
+        max_distance: float | None,
+        cuisine_type: str | None,
+        min_rating: float | None,
+        origin: list | None = None,
+    ):
+        """Yields the names of the restos that fulfill the requirements of a gusto.
+
+        Args:
+            group_size (int): the number of people
+            meal_type (str): the meal type ("Breakfast", "Lunch", or "Dinner")
+            budget (float | None): the budget of the group, or None for any
+            max_distance (float | None): the maximum distance, or None for any
+            cuisine_type (str | None): the cuisine, or None for any
+            min_rating (float | None): the minimum rating, or None for any
+            origin (list | None, optional): the latitude and longitude the max distance is from,
+                or None for UPLB gate. Defaults to None.
+
+        Yields:
+            str: the name of a matching resto
+        """
+        # Intersect the meal type bitset with the cuisine bitset
+        meal_bitset = self.meal_bits.get(meal_type[0])
+        if meal_bitset is None:
+            return
+        cuisine_bitset = None
+        bits = meal_bitset.to_int()
+        if cuisine_type is not None:
+            cuisine_bitset = self.cuisine_bits.get(cuisine_type)
+            if cuisine_bitset is None:
+                return
+            bits &= cuisine_bitset.to_int()
+        if not bits:
+            return
+
+        def matches(value: Resto) -> bool:
+            # The exact checks, in the same form as the linear scan in recommend_restos
+            if budget is not None and budget < value.cost * group_size:
+                return False
+            if max_distance is not None and origin is None and max_distance < value.distance:
+                return False
+            if min_rating is not None and value.rating < min_rating:
+                return False
+            return True
+
+        # The grid only gives the restos within the max distance of the origin,
+        # which are checked against the other requirements
+        if max_distance is not None and origin is not None:
+            for slot in self.grid.query(origin[0], origin[1], max_distance):
+                if slot not in meal_bitset:
+                    continue
+                if cuisine_bitset is not None and slot not in cuisine_bitset:
+                    continue
+                if matches(self.records[slot]):
+                    yield self.names[slot]
+            return
+
+        # Find the range of candidates in each sorted array
+        # The cost limit gets a small slack since the exact check below is cost * group_size > budget
+        ranges = []
+        if max_distance is not None:
+            hi = bisect.bisect_right(self.by_distance, (max_distance, _INF))
+            ranges.append((self.by_distance, 0, hi))
+        if budget is not None:
+            limit = budget / group_size * (1 + 1e-9)
+            hi = bisect.bisect_right(self.by_cost, (limit, _INF))
+            ranges.append((self.by_cost, 0, hi))
+        if min_rating is not None:
+            lo = bisect.bisect_left(self.by_rating, (min_rating, -1))
+            ranges.append((self.by_rating, lo, len(self.by_rating)))
+
+        # Walk the smallest candidate set
+        smallest = min(ranges, key=lambda r: r[2] - r[1], default=None)
+        if smallest is not None and smallest[2] - smallest[1] < bits.bit_count():
+            array, lo, hi = smallest
+            for idx in range(lo, hi):
+                slot = array[idx][1]
+                if slot not in meal_bitset:
+                    continue
+                if cuisine_bitset is not None and slot not in cuisine_bitset:
+                    continue
+                if matches(self.records[slot]):
+                    yield self.names[slot]
+        else:
+            for slot in iter_bits(bits):
+                if matches(self.records[slot]):
+                    yield self.names[slot]
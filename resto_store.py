@@ -0,0 +1,110 @@
+"""
+This module contains the store of the restos, which tells its subscribers about every change.
+"""
+
+# Standard Library Imports
+from collections.abc import MutableMapping
+
+# Local Module Imports
+from records import Resto
+
+# The kinds of changes sent to the subscribers
+INSERTED = "inserted"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+class RestoStore(MutableMapping):
+    """A dictionary of restos that sends each change to its subscribers.
+
+    A subscriber is a function called as listener(event, name, old, new), where
+    event is INSERTED, UPDATED, or DELETED, old is the details before the change
+    (None when inserted), and new is the details after it (None when deleted).
+    Subscribers are called in the order they subscribed, after the change is made.
+
+    Renaming a resto is inserting it under the new name and deleting the old name,
+    so subscribers only ever see a resto under one name at a time.
+
+    The details of a resto are never changed in place, only replaced,
+    so every change goes through the store.
+    """
+
+    def __init__(self, data: MutableMapping | None = None) -> None:
+        """Wraps a dictionary of restos.
+
+        Args:
+            data (MutableMapping | None, optional): the restos, such as a dict, LazyRestos, or SqliteRestos. Defaults to an empty dict.
+        """
+        self.data = data if data is not None else {}
+        self.listeners: list = []
+
+    def subscribe(self, listener) -> None:
+        """Adds a subscriber that is called on every change.
+
+        Args:
+            listener (Callable[[str, str, Resto | None, Resto | None], None]): the subscriber
+        """
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener) -> None:
+        """Removes a subscriber.
+
+        Args:
+            listener (Callable[[str, str, Resto | None, Resto | None], None]): the subscriber
+        """
+        self.listeners.remove(listener)
+
+    def _emit(self, event: str, name: str, old: Resto | None, new: Resto | None) -> None:
+        for listener in self.listeners:
+            listener(event, name, old, new)
+
+    def __getitem__(self, name: str) -> Resto:
+        return self.data[name]
+
+    def __setitem__(self, name: str, value: Resto) -> None:
+        old = self.data.get(name)
+        self.data[name] = value
+        self._emit(INSERTED if old is None else UPDATED, name, old, value)
+
+    def __delitem__(self, name: str) -> None:
+        old = self.data[name]
+        del self.data[name]
+        self._emit(DELETED, name, old, None)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def copy(self):
+        """Copies the restos without the subscribers, for writing snapshots.
+
+        Returns:
+            dict | LazyRestos: the copy
+        """
+        return self.data.copy()
+
+
+def index_listener(index):
+    """Makes a subscriber that keeps an index up to date with the store.
+
+    Args:
+        index (RestoIndex | SqliteIndex | CachedIndex): the index to keep up to date
+
+    Returns:
+        Callable[[str, str, Resto | None, Resto | None], None]: the subscriber
+    """
+
+    def listener(event: str, name: str, old: Resto | None, new: Resto | None) -> None:
+        if event == INSERTED:
+            index.add(name, new)
+        elif event == UPDATED:
+            index.update(name, name, new)
+        else:
+            index.remove(name)
+
+    return listener
@@ -0,0 +1,73 @@
+"""
+This module contains the functions for picking the top k restos out of the matches of a gusto.
+"""
+
+# Standard Library Imports
+import itertools
+import math
+import random
+import sys
+
+# The number of restos recommended for a gusto
+RECO_COUNT = 3
+
+# A sentinel for the end of the items, since None could be an item
+_END = object()
+
+
+def make_rng(seed: int | None = None) -> random.Random:
+    """Makes a random number generator.
+
+    Args:
+        seed (int | None, optional): the seed, so that the recos can be reproduced. Defaults to None.
+
+    Returns:
+        random.Random: the random number generator
+    """
+    return random.Random(seed)
+
+
+def _uniform(rng: random.Random) -> float:
+    """Returns a random float in the open interval (0, 1), which is safe to pass to math.log."""
+    return rng.random() or sys.float_info.min
+
+
+def reservoir_sample(items, k: int = RECO_COUNT, rng: random.Random | None = None) -> list:
+    """Picks k items uniformly at random from an iterable in one pass.
+
+    This uses Algorithm L, which skips over items between picks, so the full list of
+    items is never built and only O(k log(N/k)) random numbers are drawn.
+    Wikipedia: https://en.wikipedia.org/wiki/Reservoir_sampling#Optimal:_Algorithm_L
+
+    Args:
+        items (Iterable): the items to pick from
+        k (int, optional): the number of items to pick. Defaults to RECO_COUNT.
+        rng (random.Random | None, optional): the random number generator. Defaults to None.
+
+    Returns:
+        list: at most k items, all of them if there are k or fewer
+    """
+    if rng is None:
+        rng = random
+
+    # Items that are already in a list or tuple, like cached matches, can be picked by position
+    if isinstance(items, (list, tuple)):
+        if len(items) <= k or k <= 0:
+            return list(items[: max(k, 0)])
+        return rng.sample(items, k)
+    items = iter(items)
+
+    # Fill the reservoir with the first k items
+    reservoir = list(itertools.islice(items, k))
+    if len(reservoir) < k or k <= 0:
+        return reservoir
+
+    # Replace a random item of the reservoir after skipping a random number of items
+    weight = math.exp(math.log(_uniform(rng)) / k)
+    while True:
+        skip = math.floor(math.log(_uniform(rng)) / math.log(1 - weight))
+        item = next(itertools.islice(items, skip, skip + 1), _END)
+        if item is _END:
+            return reservoir
+        reservoir[rng.randrange(k)] = item
+        weight *= math.exp(math.log(_uniform(rng)) / k)
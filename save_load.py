@@ -3,138 +3,648 @@ This file contains the functions for saving and loading the restos and gustos.
 """
 
 # Standard Library Import
+import contextlib
 import os
+import threading
+
+# Local Module Imports
+import sqlite_store as sqls
+from lazy_restos import LazyRestos
+from records import Gusto, Resto
+from resto_store import DELETED, RestoStore
+import snapshot as snap
+import stats as st
 
 # Data Paths
 file_dir = os.path.dirname(__file__)
 DATA_PATH = os.path.join(file_dir, "data")
 RESTO_PATH = os.path.join(DATA_PATH, "resto.dat")
 GUSTO_PATH = os.path.join(DATA_PATH, "gusto.dat")
+JOURNAL_PATH = os.path.join(DATA_PATH, "journal.dat")
+# The journal is moved here while it is being compacted into resto.dat and gusto.dat
+OLD_JOURNAL_PATH = os.path.join(DATA_PATH, "journal.old.dat")
+DB_PATH = os.path.join(DATA_PATH, "resto_reco.db")
+# The stats of each run are added here when the program exits, if they are on (see stats.py)
+STATS_PATH = os.path.join(DATA_PATH, "stats.jsonl")
+
+# Storage Settings
+# "journal" appends each change to journal.dat and compacts it into the .dat files
+# "text" rewrites resto.dat and gusto.dat on every save
+# "sqlite" keeps the restos and gustos in resto_reco.db, migrating the .dat files on first use
+STORAGE_BACKEND = os.environ.get("RESTO_RECO_STORAGE", "journal")
+# The size of journal.dat (in bytes) before it is compacted in the background
+COMPACT_THRESHOLD = 1024 * 1024
+# Whether resto.dat is memory-mapped and each resto is parsed only when it is used
+LAZY_LOADING = os.environ.get("RESTO_RECO_LAZY", "0") == "1"
+# The format resto.dat and gusto.dat are saved in, "text" or "binary" (see snapshot.py)
+# Either format is detected when loading, so existing files keep working
+SNAPSHOT_FORMAT = os.environ.get("RESTO_RECO_FORMAT", "text")
 
 # Creates a directory for data if it doesn't exist
 if not os.path.exists(DATA_PATH):
     os.mkdir(DATA_PATH)
 
+# The open journal file and the thread compacting the journal, if any
+_journal_fh = None
+_compact_thread: threading.Thread | None = None
+# The connection to the database, if the SQLite backend is used
+_db = None
+# Whether changes are being grouped into a batch (see batch)
+_batching = False
+# Whether a resto or gusto was changed since the text backend last saved
+_dirty = False
+
+
+def format_resto(name: str, value: Resto) -> str:
+    """Formats a resto as a line of resto.dat.
+
+    The coordinates are only added to the line of a resto that has them.
+
+    Args:
+        name (str): the name of the resto
+        value (Resto): the details of the resto
+
+    Returns:
+        str: the line, including the newline
+    """
+    coordinates = f"~{value.lat}~{value.lon}" if value.lat is not None else ""
+    return (
+        f"{name}~{value.distance}~{','.join(value.cuisine_type)}~{value.meal_type}"
+        f"~{value.cost}~{value.rating}{coordinates}\n"
+    )
+
+
+def parse_resto(line: str) -> tuple[str, Resto]:
+    """Parses a line of resto.dat.
+
+    Args:
+        line (str): the line
+
+    Returns:
+        tuple[str, Resto]: the name and details of the resto
+    """
+    name, distance, cuisine_type, meal_type, cost, rating, *coordinates = line.split("~")
+    # Only the restos with coordinates have the latitude and longitude fields
+    lat = lon = None
+    if coordinates:
+        lat, lon = float(coordinates[0]), float(coordinates[1])
+    return name, Resto(
+        float(distance),
+        cuisine_type.split(","),
+        meal_type,
+        float(cost),
+        float(rating),
+        lat=lat,
+        lon=lon,
+    )
+
+
+def format_gusto(label: str, value: Gusto) -> str:
+    """Formats a gusto as a line of gusto.dat.
+
+    Args:
+        label (str): the label of the gusto
+        value (Gusto): the details of the gusto
+
+    Returns:
+        str: the line, including the newline
+    """
+    weights = ",".join(map(str, value.weights)) if value.weights is not None else None
+    origin = ",".join(map(str, value.origin)) if value.origin is not None else None
+    return (
+        f"{label}~{value.description}~{value.group_size}~{value.meal_type}~{value.budget}"
+        f"~{value.max_distance}~{value.cuisine_type}~{value.min_rating}~{weights}~{origin}\n"
+    )
+
+
+def parse_gusto(line: str) -> tuple[str, Gusto]:
+    """Parses a line of gusto.dat.
 
-def load_restos(restos_dict: dict[str, list]) -> dict[str, list]:
+    Args:
+        line (str): the line
+
+    Returns:
+        tuple[str, Gusto]: the label and details of the gusto
+    """
+    fields = line.rstrip("\n").split("~")
+    # Older gusto.dat files do not have the ranking weights and origin fields
+    if len(fields) < 10:
+        fields += ["None"] * (10 - len(fields))
+    (
+        label,
+        description,
+        group_size,
+        meal_type,
+        budget,
+        max_distance,
+        cuisine_type,
+        min_rating,
+        weights,
+        origin,
+    ) = fields
+
+    return label, Gusto(
+        description,
+        int(group_size),
+        meal_type,
+        float(budget) if budget != "None" else None,
+        float(max_distance) if max_distance != "None" else None,
+        cuisine_type if cuisine_type != "None" else None,
+        float(min_rating) if min_rating != "None" else None,
+        [float(weight) for weight in weights.split(",")] if weights != "None" else None,
+        [float(coordinate) for coordinate in origin.split(",")] if origin != "None" else None,
+    )
+
+
+@st.timed("io.load_restos")
+def load_restos(restos_dict: dict[str, Resto]) -> dict[str, Resto]:
     """Loads the restos from resto.dat.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos
+        restos_dict (dict[str, Resto]): the dictionary of restos
 
     Returns:
-        dict[str, list]: the dictionary of restos
+        dict[str, Resto]: the dictionary of restos
     """
     # Create resto.dat if it doesn't exist
     open(RESTO_PATH, "a", encoding="utf-8").close()
 
+    # Read a binary snapshot in one bulk read
+    if snap.is_snapshot(RESTO_PATH):
+        fh = open(RESTO_PATH, "rb")
+        snap.load_restos(fh.read(), restos_dict)
+        fh.close()
+        return restos_dict
+
     # Read resto.dat
     fh = open(RESTO_PATH, "r", encoding="utf-8")
     for line in fh:
-        name, distance, cuisine_type, meal_type, cost, rating = line.split("~")
-        restos_dict[name] = [
-            float(distance),
-            cuisine_type.split(","),
-            meal_type,
-            float(cost),
-            float(rating),
-        ]
+        name, value = parse_resto(line)
+        restos_dict[name] = value
     fh.close()
     return restos_dict
 
 
-def load_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
+@st.timed("io.load_gustos")
+def load_gustos(gustos_dict: dict[str, Gusto]) -> dict[str, Gusto]:
     """Loads the gustos from gusto.dat.
 
     Args:
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
 
     Returns:
-        dict[str, list]: the dictionary of gustos
+        dict[str, Gusto]: the dictionary of gustos
     """
     # Create gusto.dat if it doesn't exist
     open(GUSTO_PATH, "a", encoding="utf-8").close()
 
+    # Read a binary snapshot in one bulk read
+    if snap.is_snapshot(GUSTO_PATH):
+        fh = open(GUSTO_PATH, "rb")
+        snap.load_gustos(fh.read(), gustos_dict)
+        fh.close()
+        return gustos_dict
+
     # Read gusto.dat
     fh = open(GUSTO_PATH, "r", encoding="utf-8")
     for line in fh:
-        (
-            label,
-            description,
-            group_size,
-            meal_type,
-            budget,
-            max_distance,
-            cuisine_type,
-            min_rating,
-        ) = line.split("~")
-
-        gustos_dict[label] = [
-            description,
-            int(group_size),
-            meal_type,
-            float(budget) if budget != "None" else None,
-            float(max_distance) if max_distance != "None" else None,
-            cuisine_type if cuisine_type != "None" else None,
-            float(min_rating) if min_rating != "None\n" else None,
-        ]
+        label, value = parse_gusto(line)
+        gustos_dict[label] = value
     fh.close()
     return gustos_dict
 
 
-def load(restos_dict: dict[str, list], gustos_dict: dict[str, list]) -> tuple:
+@st.timed("io.load")
+def load(restos_dict: dict[str, Resto], gustos_dict: dict[str, Gusto]) -> tuple:
     """Loads the restos and gustos from their respective files.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
 
     Returns:
         tuple: the dictionary of restos and gustos
     """
 
-    # This function simply calls load_restos and load_gustos
-    restos_dict = load_restos(restos_dict)
+    # With SQLite, the database has every change
+    # The restos are read from the database as they are used, so the given dictionary of restos is replaced
+    if STORAGE_BACKEND == "sqlite":
+        conn = get_db()
+        restos_dict = sqls.SqliteRestos(conn)
+        sqls.load_gustos(conn, gustos_dict)
+        return (restos_dict, gustos_dict)
+
+    # Load the snapshots, then replay the changes made after them
+    # With lazy loading, an empty dictionary of restos is replaced by a memory-mapped one
+    # Only a text resto.dat can be loaded lazily
+    open(RESTO_PATH, "a", encoding="utf-8").close()
+    if LAZY_LOADING and not restos_dict and not snap.is_snapshot(RESTO_PATH):
+        restos_dict = LazyRestos(RESTO_PATH, parse_resto)
+    else:
+        restos_dict = load_restos(restos_dict)
     gustos_dict = load_gustos(gustos_dict)
+    replay_journal(restos_dict, gustos_dict)
     return (restos_dict, gustos_dict)
 
 
-def save_restos(restos_dict: dict[str, list]) -> None:
+@st.timed("io.save_restos")
+def save_restos(restos_dict: dict[str, Resto], path: str | None = None) -> None:
     """Saves the restos to resto.dat.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        path (str | None, optional): the file to save to. Defaults to resto.dat.
     """
-    fh = open(RESTO_PATH, "w", encoding="utf-8")
-    for name, value in restos_dict.items():
-        fh.write(
-            f"{name}~{value[0]}~{','.join(value[1])}~{value[2]}~{value[3]}~{value[4]}\n"
-        )
+    # Write to a temporary file first and then replace resto.dat
+    # resto.dat may be memory-mapped by LazyRestos, so it must not be truncated in place
+    path = path if path is not None else RESTO_PATH
+    # Save what the store wraps, so a LazyRestos can copy its unparsed lines
+    if isinstance(restos_dict, RestoStore):
+        restos_dict = restos_dict.data
+    if SNAPSHOT_FORMAT == "binary":
+        fh = open(path + ".tmp", "wb")
+        snap.write_restos(iter_restos(restos_dict), len(restos_dict), fh)
+    elif isinstance(restos_dict, LazyRestos):
+        fh = open(path + ".tmp", "w", encoding="utf-8")
+        fh.writelines(restos_dict.iter_lines(format_resto))
+    else:
+        fh = open(path + ".tmp", "w", encoding="utf-8")
+        for name, value in iter_restos(restos_dict):
+            fh.write(format_resto(name, value))
     fh.close()
+    os.replace(path + ".tmp", path)
+
+
+def iter_restos(restos_dict: dict[str, Resto]):
+    """Yields the names and details of the restos, for reading every resto once.
 
+    The restos of a LazyRestos or SqliteRestos are read one at a time and not kept,
+    so memory does not grow as they are read.
 
-def save_gustos(gustos_dict: dict[str, list]) -> None:
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary or store of restos
+
+    Returns:
+        Iterator[tuple[str, Resto]]: the names and details of the restos
+    """
+    if isinstance(restos_dict, RestoStore):
+        restos_dict = restos_dict.data
+    if isinstance(restos_dict, (LazyRestos, sqls.SqliteRestos)):
+        return restos_dict.iter_items()
+    return iter(restos_dict.items())
+
+
+@st.timed("io.save_gustos")
+def save_gustos(gustos_dict: dict[str, Gusto], path: str | None = None) -> None:
     """Saves the gustos to gusto.dat.
 
     Args:
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+        path (str | None, optional): the file to save to. Defaults to gusto.dat.
     """
-    fh = open(GUSTO_PATH, "w", encoding="utf-8")
-    for label, value in gustos_dict.items():
-        fh.write(
-            f"{label}~{value[0]}~{value[1]}~{value[2]}~{value[3]}~{value[4]}~{value[5]}~{value[6]}\n"
-        )
+    path = path if path is not None else GUSTO_PATH
+    if SNAPSHOT_FORMAT == "binary":
+        fh = open(path + ".tmp", "wb")
+        fh.write(snap.dump_gustos(gustos_dict))
+    else:
+        fh = open(path + ".tmp", "w", encoding="utf-8")
+        for label, value in gustos_dict.items():
+            fh.write(format_gusto(label, value))
     fh.close()
+    os.replace(path + ".tmp", path)
 
 
-def save(restos_dict: dict[str, list], gustos_dict: dict[str, list]) -> None:
+@st.timed("io.save")
+def save(restos_dict: dict[str, Resto], gustos_dict: dict[str, Gusto]) -> None:
     """Saves the restos and gustos to their respective files.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos
-        gustos_dict (dict[str, list]): the dictionary of gustos
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+    """
+
+    # With SQLite, every change is already saved when it is made
+    if STORAGE_BACKEND == "sqlite":
+        get_db().commit()
+        return
+
+    # With the journal, saving is compacting the journal into resto.dat and gusto.dat
+    if STORAGE_BACKEND == "journal":
+        compact(restos_dict, gustos_dict)
+        return
+
+    # Otherwise, rewrite resto.dat and gusto.dat
+    # The journal is no longer needed since the files have every change
+    global _dirty
+    wait_for_compaction()
+    save_restos(restos_dict)
+    save_gustos(gustos_dict)
+    _dirty = False
+    close_journal()
+    for path in (OLD_JOURNAL_PATH, JOURNAL_PATH):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def convert(snapshot_format: str) -> None:
+    """Converts resto.dat and gusto.dat to a snapshot format, keeping the journal as it is.
+
+    Args:
+        snapshot_format (str): "text" or "binary"
+    """
+    global SNAPSHOT_FORMAT
+    restos_dict: dict[str, Resto] = {}
+    gustos_dict: dict[str, Gusto] = {}
+    load_restos(restos_dict)
+    load_gustos(gustos_dict)
+    SNAPSHOT_FORMAT = snapshot_format
+    save_restos(restos_dict)
+    save_gustos(gustos_dict)
+
+
+def checkpoint(restos_dict: dict[str, Resto], gustos_dict: dict[str, Gusto]) -> None:
+    """Saves the restos and gustos after a menu action.
+
+    With the journal, the changes are already saved, so this only starts a
+    compaction in the background once the journal is large enough. With the text
+    backend, the files are only rewritten if something changed since the last save,
+    so menu actions that only view or recommend do not rewrite the whole catalog.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+    """
+    if STORAGE_BACKEND == "text":
+        if _dirty:
+            save(restos_dict, gustos_dict)
+        return
+    if STORAGE_BACKEND == "journal" and os.path.exists(JOURNAL_PATH) and os.path.getsize(JOURNAL_PATH) >= COMPACT_THRESHOLD:
+        compact(restos_dict, gustos_dict, background=True)
+
+
+def put(kind: str, key: str, value: Resto | Gusto) -> None:
+    """Saves an added or edited resto or gusto, depending on the storage backend.
+
+    With the text backend, this only marks the files to be rewritten on the next checkpoint.
+
+    Args:
+        kind (str): "resto" or "gusto"
+        key (str): the name of the resto or the label of the gusto
+        value (Resto | Gusto): the details of the resto or gusto
+    """
+    global _dirty
+    if STORAGE_BACKEND == "text":
+        _dirty = True
+    elif STORAGE_BACKEND == "journal":
+        journal_put(kind, key, value)
+    elif STORAGE_BACKEND == "sqlite":
+        sqls.put(get_db(), kind, key, value, commit=not _batching)
+
+
+def delete(kind: str, key: str) -> None:
+    """Saves a deleted resto or gusto, depending on the storage backend.
+
+    With the text backend, this only marks the files to be rewritten on the next checkpoint.
+
+    Args:
+        kind (str): "resto" or "gusto"
+        key (str): the name of the resto or the label of the gusto
+    """
+    global _dirty
+    if STORAGE_BACKEND == "text":
+        _dirty = True
+    elif STORAGE_BACKEND == "journal":
+        journal_delete(kind, key)
+    elif STORAGE_BACKEND == "sqlite":
+        sqls.delete(get_db(), kind, key, commit=not _batching)
+
+
+@contextlib.contextmanager
+def batch():
+    """Groups the changes saved inside it into one write to the disk.
+
+    With the journal, the records are appended as usual but only synced to the disk
+    at the end. With SQLite, the changes are committed in one transaction at the end,
+    or rolled back if an error is raised. With the text backend, this does nothing.
+    Batches are not nested.
+    """
+    global _batching
+    _batching = True
+    try:
+        yield
+    except BaseException:
+        if STORAGE_BACKEND == "sqlite":
+            get_db().rollback()
+        raise
+    finally:
+        _batching = False
+        if STORAGE_BACKEND == "journal" and _journal_fh is not None:
+            _journal_fh.flush()
+            os.fsync(_journal_fh.fileno())
+    if STORAGE_BACKEND == "sqlite":
+        get_db().commit()
+
+
+def on_resto_change(event: str, name: str, old: Resto | None, new: Resto | None) -> None:
+    """Saves a change to the restos. This is subscribed to the RestoStore.
+
+    Args:
+        event (str): INSERTED, UPDATED, or DELETED (see resto_store)
+        name (str): the name of the resto
+        old (Resto | None): the details before the change
+        new (Resto | None): the details after the change
     """
+    # With SQLite, the restos from load already wrote the change, so it is only committed
+    if STORAGE_BACKEND == "sqlite":
+        if not _batching:
+            get_db().commit()
+        return
+    if event == DELETED:
+        delete("resto", name)
+    else:
+        put("resto", name, new)
+
+
+def get_db():
+    """Opens the database on first use, migrating the .dat files into it once when it is made.
+
+    A database that existed before it was marked as migrated is only marked, so its
+    restos and gustos are kept as they are.
+
+    Returns:
+        sqlite3.Connection: the connection to the database
+    """
+    global _db
+    if _db is None:
+        existed = os.path.exists(DB_PATH)
+        _db = sqls.connect(DB_PATH)
+        if not sqls.is_migrated(_db):
+            if existed:
+                sqls.mark_migrated(_db)
+            else:
+                # A database left by a failed migration would only be marked next time, so it is removed
+                try:
+                    migrate_to_sqlite(_db)
+                except BaseException:
+                    _db.close()
+                    _db = None
+                    os.remove(DB_PATH)
+                    raise
+    return _db
+
+
+def migrate_to_sqlite(conn) -> None:
+    """Copies the restos and gustos from the .dat files (and the journal) into the database.
+
+    Args:
+        conn (sqlite3.Connection): the connection to the database
+    """
+    restos_dict: dict[str, Resto] = {}
+    gustos_dict: dict[str, Gusto] = {}
+    load_restos(restos_dict)
+    load_gustos(gustos_dict)
+    replay_journal(restos_dict, gustos_dict)
+    sqls.save_all(conn, restos_dict, gustos_dict, migrated=True)
+
+
+def journal_put(kind: str, key: str, value: Resto | Gusto) -> None:
+    """Appends an added or edited resto or gusto to the journal.
+
+    Args:
+        kind (str): "resto" or "gusto"
+        key (str): the name of the resto or the label of the gusto
+        value (Resto | Gusto): the details of the resto or gusto
+    """
+    line = format_resto(key, value) if kind == "resto" else format_gusto(key, value)
+    _append_journal(f"PUT~{kind}~{line}")
+
 
-    # This function simply calls save_restos and save_gustos
+def journal_delete(kind: str, key: str) -> None:
+    """Appends a deleted resto or gusto to the journal.
+
+    Args:
+        kind (str): "resto" or "gusto"
+        key (str): the name of the resto or the label of the gusto
+    """
+    _append_journal(f"DEL~{kind}~{key}\n")
+
+
+def _append_journal(record: str) -> None:
+    """Appends a record to the journal and makes sure it reaches the disk.
+
+    In a batch, the record is synced to the disk at the end of the batch instead.
+
+    Args:
+        record (str): the record, including the newline
+    """
+    global _journal_fh
+    if _journal_fh is None:
+        _journal_fh = open(JOURNAL_PATH, "a", encoding="utf-8")
+    _journal_fh.write(record)
+    if not _batching:
+        _journal_fh.flush()
+        os.fsync(_journal_fh.fileno())
+
+
+def close_journal() -> None:
+    """Closes the journal file if it is open."""
+    global _journal_fh
+    if _journal_fh is not None:
+        _journal_fh.close()
+        _journal_fh = None
+
+
+def replay_journal(restos_dict: dict[str, Resto], gustos_dict: dict[str, Gusto]) -> None:
+    """Applies the changes in the journal to the restos and gustos.
+
+    The journal from an unfinished compaction is replayed first.
+    Replaying a change twice gives the same result, so it is safe to replay
+    a journal that was already compacted.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+    """
+    for path in (OLD_JOURNAL_PATH, JOURNAL_PATH):
+        if not os.path.exists(path):
+            continue
+        fh = open(path, "r", encoding="utf-8")
+        for record in fh:
+            # A record cut off by a crash has no newline, so it is skipped
+            if not record.endswith("\n"):
+                break
+            op, kind, payload = record.split("~", 2)
+            target = restos_dict if kind == "resto" else gustos_dict
+            if op == "PUT":
+                key, value = (
+                    parse_resto(payload) if kind == "resto" else parse_gusto(payload)
+                )
+                target[key] = value
+            elif op == "DEL":
+                target.pop(payload.rstrip("\n"), None)
+        fh.close()
+
+
+def compact(
+    restos_dict: dict[str, Resto], gustos_dict: dict[str, Gusto], background: bool = False
+) -> None:
+    """Compacts the journal into resto.dat and gusto.dat.
+
+    The journal is moved aside and a new one is started, so that changes can
+    still be appended while the snapshots are written.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+        background (bool, optional): whether to write the snapshots in a thread. Defaults to False.
+    """
+    global _compact_thread
+
+    # Only one compaction runs at a time
+    if _compact_thread is not None and _compact_thread.is_alive():
+        if background:
+            return
+        _compact_thread.join()
+
+    # Move the journal aside
+    # If an earlier compaction did not finish, its journal is kept and this one is added to it
+    close_journal()
+    if os.path.exists(JOURNAL_PATH):
+        if os.path.exists(OLD_JOURNAL_PATH):
+            with open(OLD_JOURNAL_PATH, "a", encoding="utf-8") as old_fh, open(
+                JOURNAL_PATH, "r", encoding="utf-8"
+            ) as fh:
+                old_fh.write(fh.read())
+            os.remove(JOURNAL_PATH)
+        else:
+            os.replace(JOURNAL_PATH, OLD_JOURNAL_PATH)
+
+    # Copy the dictionaries so that later changes do not leak into the snapshots
+    # The details are never changed in place, only replaced, so a shallow copy is enough
+    # Nothing can change while the snapshots are written in this thread, so then they are not copied
+    if background:
+        snapshot = (restos_dict.copy(), gustos_dict.copy())
+        _compact_thread = threading.Thread(target=_write_snapshot, args=snapshot)
+        _compact_thread.start()
+    else:
+        _write_snapshot(restos_dict, gustos_dict)
+
+
+def _write_snapshot(restos_dict: dict[str, Resto], gustos_dict: dict[str, Gusto]) -> None:
+    """Writes resto.dat and gusto.dat, then removes the compacted journal.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+    """
+    # Both are written to a temporary file first, so a crash never leaves a half-written snapshot
     save_restos(restos_dict)
     save_gustos(gustos_dict)
+    if os.path.exists(OLD_JOURNAL_PATH):
+        os.remove(OLD_JOURNAL_PATH)
+
+
+def wait_for_compaction() -> None:
+    """Waits for a compaction running in the background to finish."""
+    if _compact_thread is not None:
+        _compact_thread.join()
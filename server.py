@@ -0,0 +1,363 @@
+"""
+This module contains a local HTTP service for getting recos, built on asyncio.
+
+The restos and gustos are loaded once and the index is built once, so every request
+is answered from memory. Each connection is a coroutine, so thousands of idle or
+slow clients cost no threads. A query is short and CPU-bound, and threads would not
+run it faster, so queries run on the event loop itself.
+
+Endpoints (all GET, all JSON):
+    /recos?group_size=2&meal_type=Lunch&budget=500&max_distance=800&cuisine=Filipino
+           &min_rating=4&weights=1,1,1,1&k=3&seed=7&origin=14.1650,121.2400
+    /recos?gusto=Date Night          recos for a saved gusto (weights, k, and seed still apply)
+    /restos?offset=0&limit=100       the restos, in the order they were added
+    /restos/<name>                   one resto
+    /gustos                          the saved gustos
+    /gustos/<label>                  one gusto
+
+Run it with: python server.py [--host 127.0.0.1] [--port 8080]
+The service is read-only. Restos and gustos are still managed in tabamo_project.py,
+and the service has to be restarted to see the changes.
+"""
+
+# Standard Library Imports
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Local Module Imports
+import save_load as sl
+import sampling as sp
+import misc as m
+import cli
+from records import Gusto, Resto
+from resto_index import RestoIndex
+from sqlite_store import SqliteIndex
+from reco_cache import CachedIndex
+
+# How long an idle keep-alive connection is kept open (in seconds)
+KEEP_ALIVE_TIMEOUT = 15
+# The largest request line or header line that is read (in bytes)
+MAX_LINE = 8192
+# The most header lines that are read from a request
+MAX_HEADERS = 100
+# The most restos returned by /restos at once
+MAX_LIMIT = 1000
+
+
+class HTTPError(Exception):
+    """An error that is sent to the client as a JSON response."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class RecoService:
+    """Answers the requests of the HTTP service from the restos and gustos in memory."""
+
+    def __init__(
+        self,
+        restos_dict: dict[str, Resto],
+        gustos_dict: dict[str, Gusto],
+        index: RestoIndex | SqliteIndex | CachedIndex,
+    ) -> None:
+        """Keeps the restos, gustos, and index for answering requests.
+
+        Args:
+            restos_dict (dict[str, Resto]): the dictionary of restos
+            gustos_dict (dict[str, Gusto]): the dictionary of gustos
+            index (RestoIndex | SqliteIndex | CachedIndex): the index of the restos
+        """
+        self.restos = restos_dict
+        self.gustos = gustos_dict
+        self.index = index
+        # The names of the restos in order, so /restos can slice them
+        self.names = list(restos_dict)
+
+    def route(self, method: str, target: str) -> object:
+        """Answers a request.
+
+        Args:
+            method (str): the HTTP method
+            target (str): the path and query string of the request
+
+        Raises:
+            HTTPError: if the request cannot be answered
+
+        Returns:
+            object: the body of the response, before it is converted into JSON
+        """
+        if method not in ("GET", "HEAD"):
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Only GET is supported.")
+        url = urlsplit(target)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+
+        match parts:
+            case ["recos"]:
+                return self.recos(params)
+            case ["restos"]:
+                return self.list_restos(params)
+            case ["restos", name]:
+                if name not in self.restos:
+                    raise HTTPError(HTTPStatus.NOT_FOUND, f'Resto "{name}" does not exist!')
+                return cli.resto_row(name, self.restos[name])
+            case ["gustos"]:
+                return [cli.gusto_to_dict(label, gusto) for label, gusto in self.gustos.items()]
+            case ["gustos", label]:
+                label = m.capitalize_words(label)
+                if label not in self.gustos:
+                    raise HTTPError(HTTPStatus.NOT_FOUND, f'Gusto "{label}" does not exist!')
+                return cli.gusto_to_dict(label, self.gustos[label])
+            case _:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No endpoint at {url.path}")
+
+    def recos(self, params: dict[str, str]) -> list[dict]:
+        """Gets the recos of a saved or ad hoc gusto.
+
+        Args:
+            params (dict[str, str]): the query parameters
+
+        Returns:
+            list[dict]: the recos, in the same format as cli.py
+        """
+        # The same checks as the command-line interface
+        def parse(key: str, parser):
+            if key not in params or params[key] == "":
+                return None
+            try:
+                return parser(params[key])
+            except argparse.ArgumentTypeError as err:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"{key} {err}")
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"{key} must be an integer")
+
+        if "gusto" in params:
+            label = m.capitalize_words(params["gusto"])
+            if label not in self.gustos:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f'Gusto "{label}" does not exist!')
+            gusto = (label, self.gustos[label])
+        else:
+            group_size = parse("group_size", cli.positive_int)
+            meal_type = parse("meal_type", cli.meal_type)
+            if group_size is None or meal_type is None:
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST,
+                    "Give a gusto, or both group_size and meal_type.",
+                )
+            gusto = (
+                None,
+                Gusto(
+                    None,
+                    group_size,
+                    meal_type,
+                    parse("budget", cli.positive_float),
+                    parse("max_distance", cli.positive_float),
+                    parse("cuisine", cli.cuisine_type),
+                    parse("min_rating", cli.rating),
+                    origin=parse("origin", cli.coordinates),
+                ),
+            )
+
+        k = parse("k", cli.positive_int) or sp.RECO_COUNT
+        seed = parse("seed", int)
+        return list(
+            cli.get_rows(
+                self.restos,
+                [gusto],
+                self.index,
+                k,
+                parse("weights", cli.weights),
+                sp.make_rng(seed),
+            )
+        )
+
+    def list_restos(self, params: dict[str, str]) -> list[dict]:
+        """Gets a page of the restos.
+
+        Args:
+            params (dict[str, str]): the query parameters, with the offset and limit
+
+        Returns:
+            list[dict]: the restos on the page
+        """
+        try:
+            offset = max(0, int(params.get("offset", 0)))
+            limit = min(MAX_LIMIT, max(0, int(params.get("limit", MAX_LIMIT))))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "offset and limit must be integers")
+        return [
+            cli.resto_row(name, self.restos[name])
+            for name in self.names[offset : offset + limit]
+        ]
+
+
+async def read_line(reader: asyncio.StreamReader) -> bytes:
+    """Reads a line of a request, waiting at most KEEP_ALIVE_TIMEOUT for it.
+
+    Args:
+        reader (asyncio.StreamReader): the stream of the connection
+
+    Raises:
+        HTTPError: if the line is longer than MAX_LINE
+
+    Returns:
+        bytes: the line, including the newline, or b"" if the connection was closed
+    """
+    try:
+        return await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+    except (ValueError, asyncio.LimitOverrunError):
+        # readline raises ValueError when the line does not fit in the limit of the stream
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Line too long.")
+
+
+async def read_request(reader: asyncio.StreamReader) -> tuple[str, str, str, dict] | None:
+    """Reads the request line and headers of a request.
+
+    Args:
+        reader (asyncio.StreamReader): the stream of the connection
+
+    Raises:
+        HTTPError: if the request is malformed
+
+    Returns:
+        tuple[str, str, str, dict] | None: the method, target, version, and headers,
+        or None if the connection was closed
+    """
+    line = await read_line(reader)
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+
+    headers = {}
+    # The lines are counted rather than the headers, since a header can be repeated
+    for count in itertools.count():
+        line = await read_line(reader)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        # Without a limit, a client could keep sending headers for as long as it likes
+        if count >= MAX_HEADERS:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers.")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    # Request bodies are not used, but they are read so the next request starts cleanly
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed Content-Length.")
+    if length < 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed Content-Length.")
+    if length:
+        await asyncio.wait_for(reader.readexactly(length), KEEP_ALIVE_TIMEOUT)
+    return method, target, version, headers
+
+
+async def handle_connection(
+    service: RecoService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Answers the requests of one connection, keeping it open between requests.
+
+    Args:
+        service (RecoService): the service that answers the requests
+        reader (asyncio.StreamReader): the stream to read requests from
+        writer (asyncio.StreamWriter): the stream to write responses to
+    """
+    try:
+        while True:
+            keep_alive = False
+            method = "GET"
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, version, headers = request
+                connection = headers.get("connection", "").lower()
+                keep_alive = (
+                    connection != "close"
+                    if version == "HTTP/1.1"
+                    else connection == "keep-alive"
+                )
+                status, body = HTTPStatus.OK, service.route(method, target)
+            except HTTPError as err:
+                status, body = err.status, {"error": err.message}
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                # A client that is too slow or gone is dropped without a response
+                raise
+            except Exception as err:
+                status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(err)}
+
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            head = (
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                "\r\n"
+            ).encode("latin-1")
+            writer.write(head if method == "HEAD" else head + payload)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int, service: RecoService) -> None:
+    """Serves the requests until the program is stopped.
+
+    Args:
+        host (str): the host to listen on
+        port (int): the port to listen on
+        service (RecoService): the service that answers the requests
+    """
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer),
+        host,
+        port,
+        limit=MAX_LINE,
+        backlog=1024,
+    )
+    print(f"Serving recos on http://{host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Loads the restos and gustos once, then serves them.
+
+    Args:
+        argv (list[str] | None, optional): the arguments. Defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Serve resto recos over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="default: 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="default: 8080")
+    args = parser.parse_args(argv)
+
+    restos, gustos = sl.load({}, {})
+    # Requests for the same gustos come in often, so their matches are cached
+    if sl.STORAGE_BACKEND == "sqlite":
+        index = CachedIndex(SqliteIndex(sl.get_db()))
+    else:
+        index = CachedIndex(RestoIndex(restos))
+    try:
+        asyncio.run(serve(args.host, args.port, RecoService(restos, gustos, index)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sl.close_journal()
+
+
+if __name__ == "__main__":
+    main()
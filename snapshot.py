@@ -0,0 +1,325 @@
+"""
+This module contains the compact binary snapshot format for the restos and gustos.
+
+A snapshot is a header followed by columns, where item i of every column belongs to record i:
+    header: magic (4 bytes), version (uint16), count (uint32)
+    restos: distance, cost, rating, latitude, longitude (float64, NaN for None),
+            meal type mask (uint8), cuisine mask (uint32), names
+    gustos: budget, max distance, min rating (float64, NaN for None), group size (uint32),
+            meal type mask (uint8), cuisine mask (uint32, 0 for None),
+            weights (4 x float64, NaN for None), origin (2 x float64, NaN for None),
+            labels, descriptions
+Strings are stored as count + 1 uint32 offsets followed by one UTF-8 blob.
+Everything is little-endian.
+
+Version 1 snapshots, which have no coordinates or origins, are still loaded.
+
+Cuisines are stored as a bitmask over user_inputs.cuisines_list, so they load in that order.
+"""
+
+# Standard Library Imports
+import array
+import io
+import itertools
+import math
+import struct
+import sys
+
+# Local Module Imports
+import user_inputs as ui
+from records import Gusto, Resto
+
+RESTO_MAGIC = b"RRSR"
+GUSTO_MAGIC = b"RRSG"
+VERSION = 2
+# The versions that can be loaded
+READABLE_VERSIONS = (1, 2)
+HEADER = struct.Struct("<4sHI")
+
+# The array typecode of a 4-byte unsigned int, which is "I" on most platforms
+UINT32 = "I" if array.array("I").itemsize == 4 else "L"
+# The number of restos packed at a time when a snapshot is streamed
+CHUNK_SIZE = 4096
+
+
+def is_snapshot(path: str) -> bool:
+    """Checks if a file is a binary snapshot, by reading its magic bytes.
+
+    Args:
+        path (str): the path of the file
+
+    Returns:
+        bool: whether the file is a binary snapshot
+    """
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return False
+    magic = fh.read(4)
+    fh.close()
+    return magic in (RESTO_MAGIC, GUSTO_MAGIC)
+
+
+def _column(typecode: str, values) -> bytes:
+    """Packs values into a little-endian column."""
+    column = array.array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _strings(values: list[str]) -> bytes:
+    """Packs strings into offsets and a UTF-8 blob."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    return _column(UINT32, offsets) + b"".join(encoded)
+
+
+class _Reader:
+    """Reads the columns of a snapshot from one buffer."""
+
+    def __init__(self, data: bytes, magic: bytes) -> None:
+        found, version, self.count = HEADER.unpack_from(data)
+        if found != magic:
+            raise ValueError("Not a binary snapshot.")
+        if version not in READABLE_VERSIONS:
+            raise ValueError(f"Unsupported snapshot version: {version}")
+        self.version = version
+        self.data = memoryview(data)
+        self.pos = HEADER.size
+
+    def column(self, typecode: str, count: int | None = None) -> array.array:
+        """Reads the next column of numbers."""
+        column = array.array(typecode)
+        size = column.itemsize * (self.count if count is None else count)
+        column.frombytes(self.data[self.pos : self.pos + size])
+        if sys.byteorder == "big":
+            column.byteswap()
+        self.pos += size
+        return column
+
+    def strings(self) -> list[str]:
+        """Reads the next column of strings."""
+        offsets = self.column(UINT32, self.count + 1)
+        blob = bytes(self.data[self.pos : self.pos + offsets[-1]])
+        self.pos += offsets[-1]
+        return [
+            blob[offsets[idx] : offsets[idx + 1]].decode("utf-8")
+            for idx in range(self.count)
+        ]
+
+
+def _none_to_nan(value: float | None) -> float:
+    return math.nan if value is None else value
+
+
+def _nan_to_none(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+def write_restos(items, count: int, fh) -> None:
+    """Streams the restos into a binary snapshot, CHUNK_SIZE restos at a time.
+
+    Every column but the blob of names has a fixed size, so the start of each column
+    is known from the count. Each chunk is written to the end of each column by seeking,
+    so the restos are read only once and never all held in memory.
+
+    Args:
+        items (Iterable[tuple[str, Resto]]): the names and details of the restos
+        count (int): the number of restos
+        fh (BinaryIO): a seekable file, at the position the snapshot starts
+    """
+    start = fh.tell()
+    fh.write(HEADER.pack(RESTO_MAGIC, VERSION, count))
+    # The item size of each column, in the order they are stored
+    sizes = [8, 8, 8, 8, 8, 1, 4, 4]
+    positions = []
+    position = start + HEADER.size
+    for size in sizes:
+        positions.append(position)
+        position += size * count
+    # The names have one more offset than there are restos, and the first is 0
+    blob_position = position + 4
+    fh.seek(positions[-1])
+    fh.write(_column(UINT32, [0]))
+    positions[-1] += 4
+    offset = 0
+
+    items = iter(items)
+    while chunk := list(itertools.islice(items, CHUNK_SIZE)):
+        names = [name.encode("utf-8") for name, _ in chunk]
+        offsets = []
+        for name in names:
+            offset += len(name)
+            offsets.append(offset)
+        columns = [
+            _column("d", (value.distance for _, value in chunk)),
+            _column("d", (value.cost for _, value in chunk)),
+            _column("d", (value.rating for _, value in chunk)),
+            _column("d", (_none_to_nan(value.lat) for _, value in chunk)),
+            _column("d", (_none_to_nan(value.lon) for _, value in chunk)),
+            _column("B", (value.meal_mask for _, value in chunk)),
+            _column(UINT32, (value.cuisine_mask for _, value in chunk)),
+            _column(UINT32, offsets),
+        ]
+        for idx, column in enumerate(columns):
+            fh.seek(positions[idx])
+            fh.write(column)
+            positions[idx] += len(column)
+        fh.seek(blob_position)
+        fh.write(b"".join(names))
+        blob_position = fh.tell()
+    fh.seek(blob_position)
+
+
+def dump_restos(restos_dict: dict[str, Resto]) -> bytes:
+    """Packs the restos into a binary snapshot.
+
+    Args:
+        restos_dict (dict[str, Resto]): the dictionary of restos
+
+    Returns:
+        bytes: the snapshot
+    """
+    buffer = io.BytesIO()
+    write_restos(restos_dict.items(), len(restos_dict), buffer)
+    return buffer.getvalue()
+
+
+def load_restos(data: bytes, restos_dict: dict[str, Resto]) -> dict[str, Resto]:
+    """Unpacks the restos from a binary snapshot.
+
+    Args:
+        data (bytes): the snapshot
+        restos_dict (dict[str, Resto]): the dictionary of restos
+
+    Returns:
+        dict[str, Resto]: the dictionary of restos
+    """
+    reader = _Reader(data, RESTO_MAGIC)
+    distance = reader.column("d")
+    cost = reader.column("d")
+    rating = reader.column("d")
+    # Version 1 has no coordinates, so every resto is without them
+    if reader.version >= 2:
+        lat = reader.column("d")
+        lon = reader.column("d")
+    else:
+        lat = lon = array.array("d", [math.nan]) * reader.count
+    meal_mask = reader.column("B")
+    cuisine_mask = reader.column(UINT32)
+    names = reader.strings()
+
+    # Convert each distinct mask only once
+    meal_types = {mask: ui.mask_to_meal_type(mask) for mask in set(meal_mask)}
+    cuisines = {mask: ui.mask_to_cuisines(mask) for mask in set(cuisine_mask)}
+    for idx, name in enumerate(names):
+        restos_dict[name] = Resto(
+            distance[idx],
+            cuisines[cuisine_mask[idx]].copy(),
+            meal_types[meal_mask[idx]],
+            cost[idx],
+            rating[idx],
+            meal_mask[idx],
+            cuisine_mask[idx],
+            _nan_to_none(lat[idx]),
+            _nan_to_none(lon[idx]),
+        )
+    return restos_dict
+
+
+def dump_gustos(gustos_dict: dict[str, Gusto]) -> bytes:
+    """Packs the gustos into a binary snapshot.
+
+    Args:
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+
+    Returns:
+        bytes: the snapshot
+    """
+    values = list(gustos_dict.values())
+    weights = []
+    origins = []
+    for value in values:
+        weights += value.weights if value.weights is not None else [math.nan] * 4
+        origins += value.origin if value.origin is not None else [math.nan] * 2
+    return b"".join(
+        [
+            HEADER.pack(GUSTO_MAGIC, VERSION, len(values)),
+            _column("d", (_none_to_nan(value.budget) for value in values)),
+            _column("d", (_none_to_nan(value.max_distance) for value in values)),
+            _column("d", (_none_to_nan(value.min_rating) for value in values)),
+            _column(UINT32, (value.group_size for value in values)),
+            _column("B", (ui.meal_type_to_mask(value.meal_type[0]) for value in values)),
+            _column(
+                UINT32,
+                (
+                    ui.cuisines_to_mask([value.cuisine_type])
+                    if value.cuisine_type is not None
+                    else 0
+                    for value in values
+                ),
+            ),
+            _column("d", weights),
+            _column("d", origins),
+            _strings(list(gustos_dict)),
+            _strings([value.description for value in values]),
+        ]
+    )
+
+
+def load_gustos(data: bytes, gustos_dict: dict[str, Gusto]) -> dict[str, Gusto]:
+    """Unpacks the gustos from a binary snapshot.
+
+    Args:
+        data (bytes): the snapshot
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+
+    Returns:
+        dict[str, Gusto]: the dictionary of gustos
+    """
+    reader = _Reader(data, GUSTO_MAGIC)
+    budget = reader.column("d")
+    max_distance = reader.column("d")
+    min_rating = reader.column("d")
+    group_size = reader.column(UINT32)
+    meal_mask = reader.column("B")
+    cuisine_mask = reader.column(UINT32)
+    weights = reader.column("d", reader.count * 4)
+    # Version 1 has no origins, so every gusto measures from UPLB gate
+    if reader.version >= 2:
+        origins = reader.column("d", reader.count * 2)
+    else:
+        origins = array.array("d", [math.nan]) * (reader.count * 2)
+    labels = reader.strings()
+    descriptions = reader.strings()
+
+    # A gusto's meal type is one of "Breakfast", "Lunch", or "Dinner"
+    for idx, label in enumerate(labels):
+        gusto_weights = list(weights[idx * 4 : idx * 4 + 4])
+        origin = list(origins[idx * 2 : idx * 2 + 2])
+        gustos_dict[label] = Gusto(
+            descriptions[idx],
+            group_size[idx],
+            ui.meal_mask_to_names(meal_mask[idx]),
+            _nan_to_none(budget[idx]),
+            _nan_to_none(max_distance[idx]),
+            ui.mask_to_cuisines(cuisine_mask[idx])[0] if cuisine_mask[idx] else None,
+            _nan_to_none(min_rating[idx]),
+            None if math.isnan(gusto_weights[0]) else gusto_weights,
+            None if math.isnan(origin[0]) else origin,
+        )
+    return gustos_dict
+
+
+if __name__ == "__main__":
+    # Converts resto.dat and gusto.dat to the given format: python snapshot.py [text|binary]
+    import save_load as sl
+
+    if len(sys.argv) != 2 or sys.argv[1] not in ("text", "binary"):
+        print("Usage: python snapshot.py [text|binary]")
+        sys.exit(1)
+    sl.convert(sys.argv[1])
+    print(f"Converted resto.dat and gusto.dat to {sys.argv[1]}.")
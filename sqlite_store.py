@@ -0,0 +1,426 @@
+"""
+This module contains the SQLite storage backend for the restos and gustos.
+"""
+
+# Standard Library Imports
+import contextlib
+import itertools
+import sqlite3
+from collections.abc import MutableMapping
+
+# Local Module Imports
+import geo
+from records import Gusto, Resto
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS restos (
+    name TEXT PRIMARY KEY,
+    distance REAL NOT NULL,
+    meal_type TEXT NOT NULL,
+    cost REAL NOT NULL,
+    rating REAL NOT NULL,
+    lat REAL,
+    lon REAL
+);
+CREATE TABLE IF NOT EXISTS resto_cuisines (
+    name TEXT NOT NULL REFERENCES restos (name) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    cuisine TEXT NOT NULL,
+    PRIMARY KEY (name, position)
+);
+CREATE TABLE IF NOT EXISTS gustos (
+    label TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    group_size INTEGER NOT NULL,
+    meal_type TEXT NOT NULL,
+    budget REAL,
+    max_distance REAL,
+    cuisine_type TEXT,
+    min_rating REAL,
+    weights TEXT,
+    origin TEXT
+);
+CREATE INDEX IF NOT EXISTS restos_distance ON restos (distance);
+CREATE INDEX IF NOT EXISTS restos_cost ON restos (cost);
+CREATE INDEX IF NOT EXISTS restos_rating ON restos (rating);
+CREATE INDEX IF NOT EXISTS resto_cuisines_cuisine ON resto_cuisines (cuisine, name);
+"""
+
+# The columns added after the tables were first made, which databases made before them lack
+ADDED_COLUMNS = [
+    ("restos", "lat", "REAL"),
+    ("restos", "lon", "REAL"),
+    ("gustos", "origin", "TEXT"),
+]
+# The user_version of a database that the .dat files were migrated into
+# The migration is recorded rather than guessed from empty tables, since deleting
+# every resto and gusto must not bring back the old .dat files
+MIGRATED_VERSION = 1
+# The indexes on the added columns, which are made after the columns are added
+ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS restos_lat ON restos (lat);
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Opens the database and creates the tables and indexes if they don't exist.
+
+    The columns added since a database was made are added to it, and the distance
+    between coordinates is registered as the SQL function geo_distance.
+
+    Args:
+        path (str): the path of the database file
+
+    Returns:
+        sqlite3.Connection: the connection to the database
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    for table, column, column_type in ADDED_COLUMNS:
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    conn.executescript(ADDED_INDEXES)
+    conn.create_function("geo_distance", 4, geo.distance, deterministic=True)
+    return conn
+
+
+def is_migrated(conn: sqlite3.Connection) -> bool:
+    """Checks if the .dat files were already migrated into the database.
+
+    Args:
+        conn (sqlite3.Connection): the connection to the database
+
+    Returns:
+        bool: whether the database is marked as migrated
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0] >= MIGRATED_VERSION
+
+
+def mark_migrated(conn: sqlite3.Connection) -> None:
+    """Marks the database as migrated, so the .dat files are never migrated into it again.
+
+    Args:
+        conn (sqlite3.Connection): the connection to the database
+    """
+    with conn:
+        conn.execute(f"PRAGMA user_version = {MIGRATED_VERSION}")
+
+
+def load_restos(conn: sqlite3.Connection, restos_dict: dict[str, Resto]) -> dict[str, Resto]:
+    """Loads the restos from the database.
+
+    Args:
+        conn (sqlite3.Connection): the connection to the database
+        restos_dict (dict[str, Resto]): the dictionary of restos
+
+    Returns:
+        dict[str, Resto]: the dictionary of restos
+    """
+    cuisines: dict[str, list] = {}
+    for name, cuisine in conn.execute(
+        "SELECT name, cuisine FROM resto_cuisines ORDER BY name, position"
+    ):
+        cuisines.setdefault(name, []).append(cuisine)
+    for name, distance, meal_type, cost, rating, lat, lon in conn.execute(
+        "SELECT name, distance, meal_type, cost, rating, lat, lon FROM restos ORDER BY rowid"
+    ):
+        restos_dict[name] = Resto(
+            distance, cuisines.get(name, []), meal_type, cost, rating, lat=lat, lon=lon
+        )
+    return restos_dict
+
+
+def load_gustos(conn: sqlite3.Connection, gustos_dict: dict[str, Gusto]) -> dict[str, Gusto]:
+    """Loads the gustos from the database.
+
+    Args:
+        conn (sqlite3.Connection): the connection to the database
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+
+    Returns:
+        dict[str, Gusto]: the dictionary of gustos
+    """
+    for label, *details, weights, origin in conn.execute(
+        "SELECT label, description, group_size, meal_type, budget, max_distance,"
+        " cuisine_type, min_rating, weights, origin FROM gustos ORDER BY rowid"
+    ):
+        weights = (
+            [float(weight) for weight in weights.split(",")] if weights is not None else None
+        )
+        origin = (
+            [float(coordinate) for coordinate in origin.split(",")] if origin is not None else None
+        )
+        gustos_dict[label] = Gusto(*details, weights, origin)
+    return gustos_dict
+
+
+def _put_resto(conn: sqlite3.Connection, name: str, value: Resto) -> None:
+    """Inserts or replaces a resto without committing."""
+    # An upsert keeps the rowid, so an edited resto keeps its place in the order
+    conn.execute(
+        "INSERT INTO restos (name, distance, meal_type, cost, rating, lat, lon)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (name) DO UPDATE SET distance = excluded.distance,"
+        " meal_type = excluded.meal_type, cost = excluded.cost, rating = excluded.rating,"
+        " lat = excluded.lat, lon = excluded.lon",
+        (name, value.distance, value.meal_type, value.cost, value.rating, value.lat, value.lon),
+    )
+    conn.execute("DELETE FROM resto_cuisines WHERE name = ?", (name,))
+    conn.executemany(
+        "INSERT INTO resto_cuisines (name, position, cuisine) VALUES (?, ?, ?)",
+        [(name, position, cuisine) for position, cuisine in enumerate(value.cuisine_type)],
+    )
+
+
+def _put_gusto(conn: sqlite3.Connection, label: str, value: Gusto) -> None:
+    """Inserts or replaces a gusto without committing."""
+    weights = ",".join(map(str, value.weights)) if value.weights is not None else None
+    origin = ",".join(map(str, value.origin)) if value.origin is not None else None
+    conn.execute(
+        "INSERT INTO gustos (label, description, group_size, meal_type, budget, max_distance,"
+        " cuisine_type, min_rating, weights, origin) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (label) DO UPDATE SET description = excluded.description,"
+        " group_size = excluded.group_size, meal_type = excluded.meal_type,"
+        " budget = excluded.budget, max_distance = excluded.max_distance,"
+        " cuisine_type = excluded.cuisine_type, min_rating = excluded.min_rating,"
+        " weights = excluded.weights, origin = excluded.origin",
+        (
+            label,
+            value.description,
+            value.group_size,
+            value.meal_type,
+            value.budget,
+            value.max_distance,
+            value.cuisine_type,
+            value.min_rating,
+            weights,
+            origin,
+        ),
+    )
+
+
+def put(
+    conn: sqlite3.Connection, kind: str, key: str, value: Resto | Gusto, commit: bool = True
+) -> None:
+    """Saves an added or edited resto or gusto.
+
+    Args:
+        conn (sqlite3.Connection): the connection to the database
+        kind (str): "resto" or "gusto"
+        key (str): the name of the resto or the label of the gusto
+        value (Resto | Gusto): the details of the resto or gusto
+        commit (bool, optional): whether to commit right away, or leave it to a batch. Defaults to True.
+    """
+    # In a batch, the change joins the open transaction instead of committing
+    with conn if commit else contextlib.nullcontext():
+        if kind == "resto":
+            _put_resto(conn, key, value)
+        else:
+            _put_gusto(conn, key, value)
+
+
+def delete(conn: sqlite3.Connection, kind: str, key: str, commit: bool = True) -> None:
+    """Deletes a resto or gusto.
+
+    Args:
+        conn (sqlite3.Connection): the connection to the database
+        kind (str): "resto" or "gusto"
+        key (str): the name of the resto or the label of the gusto
+        commit (bool, optional): whether to commit right away, or leave it to a batch. Defaults to True.
+    """
+    with conn if commit else contextlib.nullcontext():
+        if kind == "resto":
+            conn.execute("DELETE FROM restos WHERE name = ?", (key,))
+        else:
+            conn.execute("DELETE FROM gustos WHERE label = ?", (key,))
+
+
+def save_all(
+    conn: sqlite3.Connection,
+    restos_dict: dict[str, Resto],
+    gustos_dict: dict[str, Gusto],
+    migrated: bool = False,
+) -> None:
+    """Replaces every resto and gusto in the database in one transaction.
+
+    Args:
+        conn (sqlite3.Connection): the connection to the database
+        restos_dict (dict[str, Resto]): the dictionary of restos
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos
+        migrated (bool, optional): whether to also mark the database as migrated in the same transaction. Defaults to False.
+    """
+    with conn:
+        conn.execute("DELETE FROM resto_cuisines")
+        conn.execute("DELETE FROM restos")
+        conn.execute("DELETE FROM gustos")
+        # The mark is set after the first change opens the transaction, so it is committed with the restos
+        if migrated:
+            conn.execute(f"PRAGMA user_version = {MIGRATED_VERSION}")
+        for name, value in restos_dict.items():
+            _put_resto(conn, name, value)
+        for label, value in gustos_dict.items():
+            _put_gusto(conn, label, value)
+
+
+class SqliteRestos(MutableMapping):
+    """A dictionary of restos backed by the database.
+
+    Nothing is read at startup. A resto is read from the restos and resto_cuisines
+    tables each time it is used, so only the restos that are shown or ranked are
+    ever in memory, and the matches of a gusto come from SqliteIndex.
+
+    Added, edited, and deleted restos are written to the database right away
+    without committing, so they join the open transaction, which save_load commits.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __getitem__(self, name: str) -> Resto:
+        row = self.conn.execute(
+            "SELECT distance, meal_type, cost, rating, lat, lon FROM restos WHERE name = ?",
+            (name,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        distance, meal_type, cost, rating, lat, lon = row
+        cuisines = [
+            cuisine
+            for (cuisine,) in self.conn.execute(
+                "SELECT cuisine FROM resto_cuisines WHERE name = ? ORDER BY position", (name,)
+            )
+        ]
+        return Resto(distance, cuisines, meal_type, cost, rating, lat=lat, lon=lon)
+
+    def __setitem__(self, name: str, value: Resto) -> None:
+        _put_resto(self.conn, name, value)
+
+    def __delitem__(self, name: str) -> None:
+        if self.conn.execute("DELETE FROM restos WHERE name = ?", (name,)).rowcount == 0:
+            raise KeyError(name)
+
+    def __contains__(self, name: object) -> bool:
+        return (
+            self.conn.execute("SELECT 1 FROM restos WHERE name = ?", (name,)).fetchone()
+            is not None
+        )
+
+    def __iter__(self):
+        # The names are fetched first, so the restos can be changed while they are iterated
+        names = self.conn.execute("SELECT name FROM restos ORDER BY rowid").fetchall()
+        return (name for (name,) in names)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM restos").fetchone()[0]
+
+    def copy(self) -> dict[str, Resto]:
+        """Reads every resto into a dictionary, for writing snapshots.
+
+        Returns:
+            dict[str, Resto]: the dictionary of restos
+        """
+        return dict(self.iter_items())
+
+    def iter_items(self):
+        """Yields the names and details of the restos in one query, without keeping them.
+
+        This is for reading every resto once, like exporting them, so the restos are
+        read one at a time and memory does not grow as they are read.
+
+        Yields:
+            tuple[str, Resto]: the name and details of a resto
+        """
+        rows = self.conn.execute(
+            "SELECT r.name, r.distance, r.meal_type, r.cost, r.rating, r.lat, r.lon, c.cuisine"
+            " FROM restos r LEFT JOIN resto_cuisines c ON c.name = r.name"
+            " ORDER BY r.rowid, c.position"
+        )
+        # The cuisines of a resto are on consecutive rows
+        for (name, distance, meal_type, cost, rating, lat, lon), group in itertools.groupby(
+            rows, key=lambda row: row[:7]
+        ):
+            cuisines = [row[7] for row in group if row[7] is not None]
+            yield name, Resto(distance, cuisines, meal_type, cost, rating, lat=lat, lon=lon)
+
+
+class SqliteIndex:
+    """Answers gusto queries with SQL, so the restos don't need an in-memory index.
+
+    This has the same methods as RestoIndex. Adding, editing, and deleting restos
+    does nothing here, since the database is already updated by save_load.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def add(self, name: str, value: Resto) -> None:
+        pass
+
+    def remove(self, name: str) -> None:
+        pass
+
+    def update(self, old_name: str, name: str, value: Resto) -> None:
+        pass
+
+    def query(
+        self,
+        group_size: int,
+        meal_type: str,
+        budget: float | None,
+        max_distance: float | None,
+        cuisine_type: str | None,
+        min_rating: float | None,
+        origin: list | None = None,
+    ):
+        """Yields the names of the restos that fulfill the requirements of a gusto.
+
+        Only the given requirements are added to the WHERE clause, so SQLite can
+        pick the index on distance, cost, or rating that narrows the restos the most.
+        A max distance from an origin is a box around the circle, which can use the
+        index on latitude, and the exact distance of the restos in the box.
+
+        Args:
+            group_size (int): the number of people
+            meal_type (str): the meal type ("Breakfast", "Lunch", or "Dinner")
+            budget (float | None): the budget of the group, or None for any
+            max_distance (float | None): the maximum distance, or None for any
+            cuisine_type (str | None): the cuisine, or None for any
+            min_rating (float | None): the minimum rating, or None for any
+            origin (list | None, optional): the latitude and longitude the max distance is from,
+                or None for UPLB gate. Defaults to None.
+
+        Yields:
+            str: the name of a matching resto
+        """
+        conditions = ["instr(r.meal_type, ?) > 0"]
+        params: list = [meal_type[0]]
+        if budget is not None:
+            # The range on cost can use the index, while the exact check matches recommend_restos
+            conditions.append("r.cost <= ? AND r.cost * ? <= ?")
+            params += [budget / group_size * (1 + 1e-9), group_size, budget]
+        if max_distance is not None and origin is None:
+            conditions.append("r.distance <= ?")
+            params.append(max_distance)
+        elif max_distance is not None:
+            # A resto without coordinates has a NULL latitude, so it is never in the box
+            min_lat, max_lat, min_lon, max_lon = geo.bounding_box(
+                origin[0], origin[1], max_distance
+            )
+            conditions.append(
+                "r.lat BETWEEN ? AND ? AND r.lon BETWEEN ? AND ?"
+                " AND geo_distance(?, ?, r.lat, r.lon) <= ?"
+            )
+            params += [min_lat, max_lat, min_lon, max_lon, origin[0], origin[1], max_distance]
+        if min_rating is not None:
+            conditions.append("r.rating >= ?")
+            params.append(min_rating)
+        if cuisine_type is not None:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM resto_cuisines c WHERE c.cuisine = ? AND c.name = r.name)"
+            )
+            params.append(cuisine_type)
+        sql = f"SELECT r.name FROM restos r WHERE {' AND '.join(conditions)}"
+        for (name,) in self.conn.execute(sql, params):
+            yield name
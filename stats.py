@@ -0,0 +1,291 @@
+"""
+This module contains the opt-in counters and latency histograms of the hot paths.
+
+Set RESTO_RECO_STATS=1 to turn them on. Loading and saving, recos, rendering, and
+every menu action are timed under a name like "io.load_restos", "reco.recommend_restos",
+"render.flush", or "menu.add_resto", so it shows where the time goes. The stats are
+shown from the main menu, and added to stats.jsonl when the program exits.
+
+When they are off, a timed function only checks ENABLED before it is called.
+
+In the profiling mode (see profiling.py), every timed call also measures the memory
+it allocated with tracemalloc, even if the stats are off.
+"""
+
+# Standard Library Imports
+import bisect
+import contextlib
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Whether the counters and histograms are kept
+ENABLED = os.environ.get("RESTO_RECO_STATS", "0") == "1"
+# The upper bounds of the buckets of a histogram (in seconds), from 0.1ms doubling to about 52s
+# A last bucket counts everything slower
+BUCKETS = [0.0001 * 2**power for power in range(20)]
+
+# Whether the memory allocated by each timed call is measured (see profiling.py)
+# tracemalloc must be tracing
+TRACE_ALLOCATIONS = False
+
+# The counters, histograms, and allocations of the timed calls, by name
+counters: dict[str, int] = {}
+histograms: dict[str, "Histogram"] = {}
+allocations: dict[str, "Allocations"] = {}
+# The highest traced memory seen by each timed call that is running, innermost last, per thread
+_peaks = threading.local()
+# Compaction saves the restos in a thread, so the stats are changed under a lock
+_lock = threading.Lock()
+
+
+class Histogram:
+    """The number of times something took each range of time, with its total, minimum, and maximum."""
+
+    def __init__(self) -> None:
+        """Starts with no latencies."""
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Adds a latency.
+
+        Args:
+            seconds (float): the latency
+        """
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Estimates a percentile from the buckets.
+
+        Args:
+            fraction (float): the percentile as a fraction, like 0.95
+
+        Returns:
+            float: the upper bound of the bucket the percentile falls in, at most the maximum
+        """
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Summarizes the histogram.
+
+        Returns:
+            dict: the count, total, mean, min, p50, p95, and max (in seconds), and the buckets
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": self.max,
+            # Each bucket is keyed by its upper bound, with "inf" for the last one
+            "buckets": {
+                f"{bound:g}": count
+                for bound, count in zip([*BUCKETS, float("inf")], self.buckets)
+                if count
+            },
+        }
+
+
+class Allocations:
+    """The memory allocated by the calls of a function, as measured by tracemalloc."""
+
+    def __init__(self) -> None:
+        """Starts with no calls."""
+        self.calls = 0
+        self.net = 0
+        self.peak_total = 0
+        self.peak_max = 0
+
+    def add(self, net: int, peak: int) -> None:
+        """Adds a call.
+
+        Args:
+            net (int): the bytes still allocated when the call returned, which can be negative
+            peak (int): the most bytes allocated at once during the call
+        """
+        self.calls += 1
+        self.net += net
+        self.peak_total += peak
+        self.peak_max = max(self.peak_max, peak)
+
+    def to_dict(self) -> dict:
+        """Summarizes the allocations.
+
+        Returns:
+            dict: the calls, and the net and peak bytes in total and per call
+        """
+        return {
+            "calls": self.calls,
+            "net": self.net,
+            "net_per_call": self.net / self.calls if self.calls else 0.0,
+            "peak_mean": self.peak_total / self.calls if self.calls else 0.0,
+            "peak_max": self.peak_max,
+        }
+
+
+def enable(enabled: bool = True) -> None:
+    """Turns the counters and histograms on or off.
+
+    Args:
+        enabled (bool, optional): whether they are kept. Defaults to True.
+    """
+    global ENABLED
+    ENABLED = enabled
+
+
+def reset() -> None:
+    """Drops every counter and histogram."""
+    with _lock:
+        counters.clear()
+        histograms.clear()
+        allocations.clear()
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Adds to a counter, if the stats are on.
+
+    Args:
+        name (str): the name of the counter
+        amount (int, optional): the amount to add. Defaults to 1.
+    """
+    if not ENABLED:
+        return
+    with _lock:
+        counters[name] = counters.get(name, 0) + amount
+
+
+def record(name: str, seconds: float) -> None:
+    """Adds a latency to a histogram, if the stats are on.
+
+    Args:
+        name (str): the name of the histogram
+        seconds (float): the latency
+    """
+    if not ENABLED:
+        return
+    with _lock:
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+@contextlib.contextmanager
+def _measure(name: str):
+    """Times a block of code, and measures what it allocates in the profiling mode.
+
+    tracemalloc only keeps one peak, so each call resets it and passes the highest
+    peak it saw on to the call around it.
+
+    Args:
+        name (str): the name of the histogram and allocations
+    """
+    tracing = TRACE_ALLOCATIONS and tracemalloc.is_tracing()
+    if tracing:
+        stack = _peaks.__dict__.setdefault("stack", [])
+        before, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1] = max(stack[-1], peak)
+        stack.append(0)
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if tracing:
+            after, peak = tracemalloc.get_traced_memory()
+            peak = max(stack.pop(), peak)
+            if stack:
+                stack[-1] = max(stack[-1], peak)
+            with _lock:
+                allocation = allocations.get(name)
+                if allocation is None:
+                    allocation = allocations[name] = Allocations()
+                allocation.add(after - before, peak - before)
+        record(name, elapsed)
+
+
+@contextlib.contextmanager
+def timer(name: str):
+    """Times a block of code into a histogram, if the stats are on.
+
+    Args:
+        name (str): the name of the histogram
+    """
+    if not ENABLED and not TRACE_ALLOCATIONS:
+        yield
+        return
+    with _measure(name):
+        yield
+
+
+def timed(name: str):
+    """Makes a decorator that times every call of a function into a histogram, if the stats are on.
+
+    Args:
+        name (str): the name of the histogram
+
+    Returns:
+        Callable: the decorator
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED and not TRACE_ALLOCATIONS:
+                return func(*args, **kwargs)
+            with _measure(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def snapshot() -> dict:
+    """Summarizes the counters and histograms.
+
+    Returns:
+        dict: the counters, and the summary of each histogram and allocations, sorted by name
+    """
+    with _lock:
+        return {
+            "counters": dict(sorted(counters.items())),
+            "histograms": {name: histograms[name].to_dict() for name in sorted(histograms)},
+            "allocations": {name: allocations[name].to_dict() for name in sorted(allocations)},
+        }
+
+
+def dump(path: str) -> None:
+    """Adds the stats of this run to a file, as one line of JSON.
+
+    Args:
+        path (str): the file
+    """
+    entry = {
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        **snapshot(),
+    }
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(entry) + "\n")
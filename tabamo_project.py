@@ -4,12 +4,29 @@ This program recommends dining place/s based on the preferences of the user.
 # Tabamo, Euan Jed S.   B-1L
 # Project
 
+# Standard Library Imports
+import argparse
+import os
+import sys
+import time
+
 # Local Module Imports
 import save_load as sl
 import gusto as g
 import resto as r
 import reco as rc
 import help as h
+from resto_index import RestoIndex
+from sqlite_store import SqliteIndex
+from reco_cache import CachedIndex
+from resto_store import RestoStore, index_listener
+import terminal as t
+import input_source as ins
+from input_source import read_line
+import stats as st
+import profiling as prof
+from render import Pager, Renderer, table_header, table_row
+from records import Gusto
 from colors import C1, C2, CE, CD
 from misc import (
     clear_screen,
@@ -20,8 +37,9 @@ from misc import (
 )
 
 # Global Variables
-restos: dict[str, list] = {}
-gustos: dict[str, list] = {}
+restos: RestoStore = RestoStore()
+gustos: dict[str, Gusto] = {}
+resto_index: CachedIndex | None = None
 
 
 def exit_program() -> None:
@@ -35,6 +53,9 @@ def exit_program() -> None:
     )
     print("".join(message), end="")
     sl.save(restos, gustos)
+    # The stats of this run are kept, so runs can be compared
+    if st.ENABLED:
+        st.dump(sl.STATS_PATH)
     exit()
 
 
@@ -53,13 +74,14 @@ def print_main_menu() -> str:
         f"  {C2}3{CE}   Get Recos                                    \n",
         f"  {C2}A{CE}   About                                        \n",
         f"  {C2}H{CE}   Help                                         \n",
+        f"  {C2}S{CE}   Stats                                        \n",
         f"  {C2}X{CE}   Exit                                         \n",
         "═══════════════════════════════════════════════════\n",
         f"{CE}",
         sep="",
         end="",
     )
-    return input("  Enter choice: ")
+    return read_line("  Enter choice: ")
 
 
 def print_gusto_menu() -> str:
@@ -79,6 +101,7 @@ def print_gusto_menu() -> str:
         "  3   Get Recos                                    \n",
         "  A   About                                        \n",
         "  H   Help                                         \n",
+        "  S   Stats                                        \n",
         "  X   Exit                                         \n",
         "═══════════════════════════════════════════════════\n",
         f"{CE}",
@@ -99,7 +122,7 @@ def print_gusto_menu() -> str:
         sep="",
         end="",
     )
-    return input("  Enter choice: ")
+    return read_line("  Enter choice: ")
 
 
 def print_resto_menu() -> str:
@@ -119,6 +142,7 @@ def print_resto_menu() -> str:
         "  3   Get Recos                                    \n",
         "  A   About                                        \n",
         "  H   Help                                         \n",
+        "  S   Stats                                        \n",
         "  X   Exit                                         \n",
         "═══════════════════════════════════════════════════\n",
         f"{CE}",
@@ -139,7 +163,7 @@ def print_resto_menu() -> str:
         sep="",
         end="",
     )
-    return input("  Enter choice: ")
+    return read_line("  Enter choice: ")
 
 
 def print_about_screen() -> None:
@@ -159,30 +183,95 @@ def print_about_screen() -> None:
     continue_prompt()
 
 
-def manage_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
+def print_stats_screen() -> None:
+    """Prints the counters and latencies of this run, if the stats are on (see stats.py)."""
+    clear_screen()
+    if not st.ENABLED:
+        print(
+            "═══════════════════════════════════════════════════\n",
+            f"                       {C1}Stats{CE}                       \n",
+            "═══════════════════════════════════════════════════\n",
+            "  The stats are off. To turn them on, start the    \n",
+            f"  program with {C2}RESTO_RECO_STATS=1{CE}.                 \n",
+            "═══════════════════════════════════════════════════\n",
+            sep="",
+            end="",
+        )
+        continue_prompt()
+        return
+
+    # Each latency is a row with its count and times, then each counter is a row with its count
+    summary = st.snapshot()
+    rows = [
+        table_row(
+            [
+                (name[:30], 30, "<"),
+                (histogram["count"], 7, ">"),
+                (f"{histogram['total']:.3f}", 9, ">"),
+                (f"{histogram['mean'] * 1000:.2f}", 9, ">"),
+                (f"{histogram['p50'] * 1000:.2f}", 9, ">"),
+                (f"{histogram['p95'] * 1000:.2f}", 9, ">"),
+                (f"{histogram['max'] * 1000:.2f}", 9, ">"),
+            ]
+        )
+        for name, histogram in summary["histograms"].items()
+    ]
+    rows += [
+        table_row([(name[:30], 30, "<"), (value, 7, ">")] + [("", 9, ">")] * 5)
+        for name, value in summary["counters"].items()
+    ]
+    if not rows:
+        rows.append("  Nothing has been timed yet.")
+    header, footer = table_header(
+        "Stats",
+        [
+            ("Name", 30),
+            ("Count", 7),
+            ("Total s", 9),
+            ("Mean ms", 9),
+            ("p50 ms", 9),
+            ("p95 ms", 9),
+            ("Max ms", 9),
+        ],
+    )
+    pager = Pager(list(range(len(rows))), lambda row: 1, lambda row: [rows[row]], header, footer)
+    if pager.is_single_page():
+        with Renderer() as out:
+            pager.render(0, out)
+        continue_prompt()
+    else:
+        pager.show()
+
+
+def manage_gustos(gustos_dict: dict[str, Gusto]) -> dict[str, Gusto]:
     """Manages the gustos dictionary.
 
     Args:
-        gustos_dict (dict[str, list]): the dictionary of gustos to be managed
+        gustos_dict (dict[str, Gusto]): the dictionary of gustos to be managed
 
     Returns:
-        dict[str, list]: the dictionary of gustos after possible changes
+        dict[str, Gusto]: the dictionary of gustos after possible changes
     """
     while True:
         choice = print_gusto_menu()
         match choice:
             case "1":
-                g.add_gustos(gustos_dict)
+                with st.timer("menu.add_gusto"):
+                    g.add_gustos(gustos_dict)
             case "2":
-                g.edit_gustos(gustos_dict)
+                with st.timer("menu.edit_gusto"):
+                    g.edit_gustos(gustos_dict)
             case "3":
-                g.delete_gustos(gustos_dict)
+                with st.timer("menu.delete_gusto"):
+                    g.delete_gustos(gustos_dict)
             case "4":
-                g.display_gustos(gustos_dict)
-                if gustos_dict:
-                    continue_prompt()
+                with st.timer("menu.display_gustos"):
+                    g.display_gustos(gustos_dict)
+                    if gustos_dict:
+                        continue_prompt()
             case "5":
-                g.view_gusto(gustos_dict)
+                with st.timer("menu.view_gusto"):
+                    g.view_gusto(gustos_dict)
             case "B" | "b":
                 break
             case _:
@@ -191,30 +280,33 @@ def manage_gustos(gustos_dict: dict[str, list]) -> dict[str, list]:
     return gustos_dict
 
 
-def manage_restos(restos_dict: dict[str, list]) -> dict[str, list]:
+def manage_restos(restos_dict: RestoStore) -> RestoStore:
     """Manages the restos dictionary.
 
     Args:
-        restos_dict (dict[str, list]): the dictionary of restos to be managed
+        restos_dict (RestoStore): the store of restos to be managed
 
     Returns:
-        dict[str, list]: the dictionary of restos after possible changes
+        RestoStore: the store of restos after possible changes
     """
     while True:
         choice = print_resto_menu()
         match choice:
             case "1":
-                r.add_restos(restos_dict)
+                with st.timer("menu.add_resto"):
+                    r.add_restos(restos_dict)
             case "2":
-                r.edit_restos(restos_dict)
+                with st.timer("menu.edit_resto"):
+                    r.edit_restos(restos_dict)
             case "3":
-                r.delete_restos(restos_dict)
+                with st.timer("menu.delete_resto"):
+                    r.delete_restos(restos_dict)
             case "4":
-                r.display_restos(restos_dict)
-                if restos_dict:
-                    continue_prompt()
+                with st.timer("menu.display_restos"):
+                    r.display_restos(restos_dict)
             case "5":
-                r.view_resto(restos_dict)
+                with st.timer("menu.view_resto"):
+                    r.view_resto(restos_dict)
             case "B" | "b":
                 break
             case _:
@@ -223,11 +315,118 @@ def manage_restos(restos_dict: dict[str, list]) -> dict[str, list]:
     return restos_dict
 
 
-def main() -> None:
-    """The main function."""
+def get_resto_index() -> CachedIndex:
+    """Gets the index of the restos, building it the first time recos are asked for.
+
+    The index is not built at startup, since building it parses every resto,
+    which would undo lazy loading. Once built, it subscribes to the store of restos,
+    so it is kept up to date as restos are added, edited, and deleted.
+    The matches of recently asked gustos are cached.
+
+    Returns:
+        CachedIndex: the index of the restos
+    """
+    global resto_index
+    if resto_index is None:
+        # With SQLite, the database answers the queries instead
+        if sl.STORAGE_BACKEND == "sqlite":
+            resto_index = CachedIndex(SqliteIndex(sl.get_db()))
+        else:
+            resto_index = CachedIndex(RestoIndex(restos))
+        restos.subscribe(index_listener(resto_index))
+    return resto_index
+
+
+def main(argv: list[str] | None = None) -> None:
+    """The main function.
+
+    Args:
+        argv (list[str] | None, optional): the arguments. Defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Euan's UPLB Resto Reco")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="run under cProfile and tracemalloc, and write the reports to the data directory on exit",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="answer the prompts from a script, one answer per line, instead of the keyboard",
+    )
+    parser.add_argument(
+        "--record", metavar="PATH", help="write every answer to a script that --replay can replay"
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="with --replay, throw the output away"
+    )
+    args = parser.parse_args(argv)
+    if args.quiet and args.replay is None:
+        parser.error("--quiet only works with --replay")
+
+    # The files are opened before anything runs, so a wrong path fails right away
+    try:
+        script = open(args.replay, "r", encoding="utf-8") if args.replay is not None else None
+        record = open(args.record, "w", encoding="utf-8") if args.record is not None else None
+    except OSError as err:
+        parser.error(f"cannot open {err.filename}: {err.strerror}")
+    replay = ins.ScriptedInput(script) if script is not None else None
+    if replay is not None:
+        ins.use(replay)
+    if record is not None:
+        ins.use(ins.RecordingInput(ins.source, record))
+    stdout = sys.stdout
+    if args.quiet:
+        sys.stdout = open(os.devnull, "w", encoding="utf-8")
+        # The tables are still formatted, for the size of terminal given by COLUMNS and LINES
+        os.environ.setdefault("COLUMNS", "128")
+        os.environ.setdefault("LINES", "40")
+
+    if args.profile:
+        prof.start()
+    start = time.perf_counter()
+    try:
+        run(check_window=replay is None)
+    except EOFError:
+        if replay is None:
+            raise
+        # A script that ends without exiting exits, so everything is saved
+        print("The script ended before exiting the program.", file=sys.stderr)
+        exit_program()
+    finally:
+        elapsed = time.perf_counter() - start
+        if args.quiet:
+            sys.stdout.close()
+            sys.stdout = stdout
+        if replay is not None:
+            script.close()
+            print(f"Replayed {replay.count} answers in {elapsed:.3f}s", file=sys.stderr)
+        if record is not None:
+            record.close()
+        if args.profile:
+            for path in prof.stop(sl.DATA_PATH):
+                print(f"  {C2}Profile written to{CE} {path}")
+
+
+def run(check_window: bool = True) -> None:
+    """Runs the program until the user exits.
+
+    Args:
+        check_window (bool, optional): whether to ask for a larger window if it is too small. Defaults to True.
+    """
+    global restos, gustos
     load_colors()
-    sl.load(restos, gustos)
-    check_window_size()
+    # With lazy loading, the restos are a memory-mapped dictionary, and with SQLite they are read from the database
+    # The store saves every change to the restos as it is made
+    data, gustos = sl.load({}, gustos)
+    restos = RestoStore(data)
+    restos.subscribe(sl.on_resto_change)
+    # In the profiling mode, the memory allocated by loading is kept for comparing with the exit
+    prof.take_snapshot(sl.DATA_PATH, "load")
+    # The tables follow the size of the terminal when it is resized
+    t.install()
+    if check_window:
+        check_window_size()
     while True:
         clear_screen()
         choice = print_main_menu()
@@ -240,17 +439,22 @@ def main() -> None:
             case "2":
                 manage_restos(restos)
             case "3":
-                rc.get_recos(restos, gustos)
+                with st.timer("menu.get_recos"):
+                    rc.get_recos(restos, gustos, get_resto_index())
             case "A" | "a":
-                print_about_screen()
+                with st.timer("menu.about"):
+                    print_about_screen()
             case "H" | "h":
-                h.help_screen()
+                with st.timer("menu.help"):
+                    h.help_screen()
+            case "S" | "s":
+                print_stats_screen()
             case "C" | "c":
                 clear_screen()
             case _:
                 raise_err("Invalid choice!")
                 clear_screen()
-        sl.save(restos, gustos)
+        sl.checkpoint(restos, gustos)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+"""
+This module keeps track of the size of the terminal, for the tables and menus.
+
+The size is queried once and cached. Where the terminal sends SIGWINCH when it is
+resized (Linux and macOS), the cache is dropped by the signal, so the size is only
+queried again after a resize. Elsewhere (Windows), the cached size is queried again
+at most every POLL_INTERVAL seconds.
+
+Every change of the size bumps generation, so a Screen knows to redraw everything
+and a Pager knows to measure its pages again.
+"""
+
+# Standard Library Imports
+import os
+import shutil
+import signal
+import time
+
+# How long the size is cached where there is no resize signal (in seconds)
+POLL_INTERVAL = 0.5
+# The columns left empty at the right of a table, so a full-width line does not wrap
+MARGIN = 1
+
+# The cached size and when it was queried
+_size: os.terminal_size | None = None
+_queried_at = 0.0
+# Whether a resize signal is installed, so the cache is dropped only on a resize
+_has_signal = False
+# Bumped every time the size changes
+generation = 0
+
+
+def _on_resize(signum, frame) -> None:
+    """Drops the cached size when the terminal is resized. This is the SIGWINCH handler."""
+    global _size
+    _size = None
+
+
+def install() -> None:
+    """Installs the resize signal handler, if the platform has one."""
+    global _has_signal
+    if hasattr(signal, "SIGWINCH"):
+        try:
+            signal.signal(signal.SIGWINCH, _on_resize)
+            _has_signal = True
+        except ValueError:
+            # Signal handlers can only be installed from the main thread
+            pass
+
+
+def refresh() -> os.terminal_size:
+    """Queries the size of the terminal again.
+
+    Returns:
+        os.terminal_size: the columns and lines of the terminal
+    """
+    global _size, _queried_at, generation
+    # shutil falls back to 80x24 if the output is not a terminal
+    size = shutil.get_terminal_size()
+    if size != _size:
+        generation += 1
+    _size = size
+    _queried_at = time.monotonic()
+    return size
+
+
+def get_size() -> os.terminal_size:
+    """Gets the size of the terminal, querying it only if it may have changed.
+
+    Returns:
+        os.terminal_size: the columns and lines of the terminal
+    """
+    if _size is None or (
+        not _has_signal and time.monotonic() - _queried_at >= POLL_INTERVAL
+    ):
+        return refresh()
+    return _size
+
+
+def flex_width(table_width: int, width: int, minimum: int, maximum: int) -> int:
+    """Gets the width of the flexible column of a table, so the table fits the terminal.
+
+    The column grows or shrinks by the difference between the terminal and the table.
+
+    Args:
+        table_width (int): the width of the table with the column at its default width
+        width (int): the default width of the column
+        minimum (int): the narrowest the column can be
+        maximum (int): the widest the column can be
+
+    Returns:
+        int: the width of the column
+    """
+    spare = get_size().columns - MARGIN - table_width
+    return max(minimum, min(maximum, width + spare))
@@ -2,10 +2,15 @@
 This module contains functions for getting user inputs and validating them.
 """
 
+# Standard Library Imports
+import functools
+import math
+
 # Local Module Imports
 from misc import print_err
 import colors as c
 import misc as m
+from input_source import read_line
 
 # Global Variable
 cuisines_list = [
@@ -37,6 +42,280 @@ meal_types_sorter = {
     "D": 2,
 }
 
+# Used for displaying meal types
+meal_type_names = {
+    "B": "Breakfast",
+    "L": "Lunch",
+    "D": "Dinner",
+}
+
+# The bit of each cuisine in a cuisine bitmask, in the order of cuisines_list
+cuisine_bits = {cuisine: 1 << idx for idx, cuisine in enumerate(cuisines_list)}
+
+
+def meal_type_to_mask(meal_type: str) -> int:
+    """Converts a meal type Literal into a bitmask.
+
+    Args:
+        meal_type (str): The Literal of "B", "L", and/or "D".
+
+    Returns:
+        int: The bitmask, where bit i is set for the meal type with order i in meal_types_sorter.
+    """
+    mask = 0
+    for char in meal_type:
+        mask |= 1 << meal_types_sorter[char]
+    return mask
+
+
+def cuisines_to_mask(cuisines: list) -> int:
+    """Converts a list of cuisines into a bitmask.
+
+    Args:
+        cuisines (list): The list of cuisines.
+
+    Returns:
+        int: The bitmask, where bit i is set for the cuisine at index i of cuisines_list.
+    """
+    mask = 0
+    for cuisine in cuisines:
+        mask |= cuisine_bits[cuisine]
+    return mask
+
+
+def mask_to_meal_type(mask: int) -> str:
+    """Converts a meal type bitmask back into a meal type Literal.
+
+    Args:
+        mask (int): The bitmask from meal_type_to_mask.
+
+    Returns:
+        str: The Literal of "B", "L", and/or "D", in the order of meal_types_sorter.
+    """
+    return "".join(char for char, order in meal_types_sorter.items() if mask >> order & 1)
+
+
+def mask_to_cuisines(mask: int) -> list:
+    """Converts a cuisine bitmask back into a list of cuisines.
+
+    Args:
+        mask (int): The bitmask from cuisines_to_mask.
+
+    Returns:
+        list: The cuisines, in the order of cuisines_list.
+    """
+    return [cuisine for idx, cuisine in enumerate(cuisines_list) if mask >> idx & 1]
+
+
+@functools.lru_cache(maxsize=None)
+def meal_mask_to_names(mask: int) -> str:
+    """Converts a meal type bitmask into the names of its meal types, for displaying.
+
+    There are only 8 meal type bitmasks, so each string is built once and cached.
+
+    Args:
+        mask (int): The bitmask from meal_type_to_mask.
+
+    Returns:
+        str: The meal types separated by commas, e.g. "Breakfast, Lunch".
+    """
+    return ", ".join(meal_type_names[char] for char in mask_to_meal_type(mask))
+
+
+def validate_float(float_num: str) -> float:
+    """Validates a positive float, with the same rules as get_float.
+
+    Args:
+        float_num (str): The stripped input.
+
+    Raises:
+        ValueError: If the input is invalid, with the message shown to the user.
+
+    Returns:
+        float: The float.
+    """
+    if float_num == "":
+        raise ValueError("Input cannot be blank.")
+    try:
+        number = float(float_num)
+    except ValueError:
+        raise ValueError("Input must be a decimal number.")
+    if number <= 0:
+        raise ValueError("Input must be greater than 0.")
+    return number
+
+
+def validate_list_of_meal_types(meal_types: str, on_discard=None) -> str:
+    """Validates multiple comma-separated meal types, with the same rules as get_list_of_meal_types.
+
+    Invalid meal types are discarded, as long as at least one is valid.
+
+    Args:
+        meal_types (str): The stripped input.
+        on_discard (Callable[[str], None], optional): Called with each discarded meal type. Defaults to None.
+
+    Raises:
+        ValueError: If the input is invalid, with the message shown to the user.
+
+    Returns:
+        str: The Literal str representing the meal types, in the order of meal_types_sorter.
+    """
+    if meal_types == "":
+        raise ValueError("Input cannot be blank.")
+    meal_type_lst = []
+    for meal_type in meal_types.split(","):
+        meal_type = meal_type.strip().capitalize()
+        if meal_type in ["Breakfast", "Lunch", "Dinner"]:
+            meal_type_lst.append(meal_type[0])
+        elif on_discard is not None:
+            on_discard(meal_type)
+    if len(meal_type_lst) == 0:
+        raise ValueError("Input must have at least one valid meal type.")
+    # Sorts the meal types in the order of Breakfast, Lunch, Dinner
+    # This uses the dictionary meal_types_sorter to sort the meal types
+    # https://learnpython.com/blog/python-custom-sort-function/
+    meal_type_lst.sort(key=lambda x: meal_types_sorter[x])
+    return "".join(meal_type_lst)
+
+
+def validate_list_of_cuisine_types(cuisine_types: str, on_discard=None) -> list:
+    """Validates multiple comma-separated cuisines, with the same rules as get_list_of_cuisine_types.
+
+    Invalid cuisines are discarded, as long as at least one is valid.
+
+    Args:
+        cuisine_types (str): The stripped input.
+        on_discard (Callable[[str], None], optional): Called with each discarded cuisine. Defaults to None.
+
+    Raises:
+        ValueError: If the input is invalid, with the message shown to the user.
+
+    Returns:
+        list: The list containing the cuisines.
+    """
+    if cuisine_types == "":
+        raise ValueError("Input cannot be blank.")
+    cuisine_type_list = []
+    for cuisine_type in cuisine_types.split(","):
+        cuisine_type = m.capitalize_words(cuisine_type.strip())
+        if cuisine_type in cuisines_list:
+            cuisine_type_list.append(cuisine_type)
+        elif on_discard is not None:
+            on_discard(cuisine_type)
+    if len(cuisine_type_list) == 0:
+        raise ValueError("Input must have at least one valid cuisine type.")
+    return cuisine_type_list
+
+
+def validate_rating(rating: str) -> float:
+    """Validates a rating, with the same rules as get_rating.
+
+    Args:
+        rating (str): The stripped input.
+
+    Raises:
+        ValueError: If the input is invalid, with the message shown to the user.
+
+    Returns:
+        float: The rating.
+    """
+    if rating == "":
+        raise ValueError("Input cannot be blank.")
+    try:
+        number = float(rating)
+    except ValueError:
+        raise ValueError("Input must be a float.")
+    if number < 1 or number > 5:
+        raise ValueError("Input must be between 1 and 5.")
+    return number
+
+
+def validate_coordinates(coordinates: str) -> list:
+    """Validates a latitude and longitude, with the same rules as get_coordinates.
+
+    Args:
+        coordinates (str): The stripped input, like "14.1675, 121.2433".
+
+    Raises:
+        ValueError: If the input is invalid, with the message shown to the user.
+
+    Returns:
+        list: The latitude and longitude.
+    """
+    if coordinates == "":
+        raise ValueError("Input cannot be blank.")
+    try:
+        lat, lon = [float(number) for number in coordinates.split(",")]
+    except ValueError:
+        raise ValueError("Input must be a latitude and longitude separated by a comma.")
+    if not -90 <= lat <= 90:
+        raise ValueError("Latitude must be between -90 and 90.")
+    if not -180 <= lon <= 180:
+        raise ValueError("Longitude must be between -180 and 180.")
+    return [lat, lon]
+
+
+def validate_weights(weights: str) -> list:
+    """Validates the ranking weights, with the same rules as get_weights.
+
+    The weights are multiplied into the scores of the restos, so NaN and infinite
+    weights are rejected, since they would make the scores impossible to compare.
+
+    Args:
+        weights (str): The stripped input, like "1, 1, 1, 1".
+
+    Raises:
+        ValueError: If the input is invalid, with the message shown to the user.
+
+    Returns:
+        list: The 4 weights (rating, distance, cost, cuisine).
+    """
+    if weights == "":
+        raise ValueError("Input cannot be blank.")
+    try:
+        weight_list = [float(weight) for weight in weights.split(",")]
+    except ValueError:
+        raise ValueError("Weights must be decimal numbers.")
+    if len(weight_list) != 4:
+        raise ValueError("Input must have exactly 4 weights.")
+    if not all(math.isfinite(weight) for weight in weight_list):
+        raise ValueError("Weights must be finite numbers.")
+    if any(weight < 0 for weight in weight_list):
+        raise ValueError("Weights cannot be negative.")
+    return weight_list
+
+
+def validate_name(name: str) -> str:
+    """Validates the name of a resto, with the same rules as get_name.
+
+    The name is the first field of its line in resto.dat and the journal,
+    so it cannot have the "~" separator or a line break.
+
+    Args:
+        name (str): The stripped input.
+
+    Raises:
+        ValueError: If the input is invalid, with the message shown to the user.
+
+    Returns:
+        str: The name with each word capitalized.
+    """
+    if name == "":
+        raise ValueError("Input cannot be blank.")
+    if any(char in name for char in "~\n\r"):
+        raise ValueError("Input cannot have a ~ or a line break.")
+    return m.capitalize_words(name)
+
+
+def discard_meal_type(meal_type: str) -> None:
+    """Tells the user that an invalid meal type was discarded."""
+    m.print_err(f"Discarding invalid meal type: {meal_type}")
+
+
+def discard_cuisine_type(cuisine_type: str) -> None:
+    """Tells the user that an invalid cuisine was discarded."""
+    m.print_err(f"Discarding invalid cuisine type: {cuisine_type}")
+
 
 def print_valid_cuisines() -> None:
     """Prints the valid cuisines from the list of valid cuisines."""
@@ -82,7 +361,7 @@ def get_string(prompt: str, required: bool = True) -> str:
         str: The string from the user
     """
     while True:
-        string = input(prompt).strip()
+        string = read_line(prompt).strip()
         if required and string == "":
             print_err("Input cannot be blank.")
             continue
@@ -90,6 +369,23 @@ def get_string(prompt: str, required: bool = True) -> str:
             return string
 
 
+def get_name(prompt: str) -> str:
+    """Gets the name of a resto from the user.
+
+    Args:
+        prompt (str): The prompt the user is asked.
+
+    Returns:
+        str: The name with each word capitalized.
+    """
+    while True:
+        try:
+            return validate_name(read_line(prompt).strip())
+        except ValueError as err:
+            print_err(str(err))
+            continue
+
+
 def get_integer(prompt: str, required: bool = True) -> int:
     """Gets a positive integer from a user.
 
@@ -101,7 +397,7 @@ def get_integer(prompt: str, required: bool = True) -> int:
         int: The integer from the user.
     """
     while True:
-        integer = input(prompt).strip()
+        integer = read_line(prompt).strip()
         if required and integer == "":
             print_err("Input cannot be blank.")
             continue
@@ -130,21 +426,13 @@ def get_float(prompt: str, required: bool = True) -> float:
         float: The float from the user.
     """
     while True:
-        float_num = input(prompt).strip()
-        if required and float_num == "":
-            print_err("Input cannot be blank.")
-            continue
-        elif not required and float_num == "":
+        float_num = read_line(prompt).strip()
+        if not required and float_num == "":
             return None
         try:
-            float_num = float(float_num)
-            if float_num <= 0:
-                print_err("Input must be greater than 0.")
-                continue
-            else:
-                return float_num
-        except ValueError:
-            print_err("Input must be a decimal number.")
+            return validate_float(float_num)
+        except ValueError as err:
+            print_err(str(err))
             continue
 
 
@@ -159,7 +447,7 @@ def get_meal_type(prompt: str, required: bool = True) -> str:
         str: The meal type string from the user.
     """
     while True:
-        meal_type = input(prompt).strip().capitalize()
+        meal_type = read_line(prompt).strip().capitalize()
         if required and meal_type == "":
             print_err("Input cannot be blank.")
             continue
@@ -183,29 +471,14 @@ def get_list_of_meal_types(prompt: str, required: bool = True) -> str:
         str: The Literal str representing the multiple meal types from the user.
     """
     while True:
-        meal_types = input(prompt).strip()
-        if required and meal_types == "":
-            print_err("Input cannot be blank.")
-            continue
-        elif not required and meal_types == "":
+        meal_types = read_line(prompt).strip()
+        if not required and meal_types == "":
             return None
-        meal_type_lst = []
-        for meal_type in meal_types.split(","):
-            meal_type = meal_type.strip().capitalize()
-            if meal_type in ["Breakfast", "Lunch", "Dinner"]:
-                meal_type_lst.append(meal_type[0])
-            else:
-                m.print_err(f"Discarding invalid meal type: {meal_type}")
-        if len(meal_type_lst) == 0:
-            print_err("Input must have at least one valid meal type.")
+        try:
+            return validate_list_of_meal_types(meal_types, discard_meal_type)
+        except ValueError as err:
+            print_err(str(err))
             continue
-        else:
-            break
-    # Sorts the meal types in the order of Breakfast, Lunch, Dinner
-    # This uses the dictionary meal_types_sorter to sort the meal types
-    # https://learnpython.com/blog/python-custom-sort-function/
-    meal_type_lst.sort(key=lambda x: meal_types_sorter[x])
-    return "".join(meal_type_lst)
 
 
 def get_cuisine_type(prompt: str, required: bool = True) -> str:
@@ -219,7 +492,7 @@ def get_cuisine_type(prompt: str, required: bool = True) -> str:
         str: The cuisine from the user.
     """
     while True:
-        cuisine_type = m.capitalize_words(input(prompt).strip())
+        cuisine_type = m.capitalize_words(read_line(prompt).strip())
         if required and cuisine_type == "":
             print_err("Input cannot be blank.")
             continue
@@ -243,25 +516,14 @@ def get_list_of_cuisine_types(prompt: str, required: bool = True) -> list:
         list: The list containing the cuisines from the user.
     """
     while True:
-        cuisine_types = input(prompt).strip()
-        if required and cuisine_types == "":
-            print_err("Input cannot be blank.")
-            continue
-        elif not required and cuisine_types == "":
+        cuisine_types = read_line(prompt).strip()
+        if not required and cuisine_types == "":
             return None
-        cuisine_type_list = []
-        for cuisine_type in cuisine_types.split(","):
-            cuisine_type = m.capitalize_words(cuisine_type.strip())
-            if cuisine_type in cuisines_list:
-                cuisine_type_list.append(cuisine_type)
-            else:
-                m.print_err(f"Discarding invalid cuisine type: {cuisine_type}")
-        if len(cuisine_type_list) == 0:
-            print_err("Input must have at least one valid cuisine type.")
+        try:
+            return validate_list_of_cuisine_types(cuisine_types, discard_cuisine_type)
+        except ValueError as err:
+            print_err(str(err))
             continue
-        else:
-            break
-    return cuisine_type_list
 
 
 def get_rating(prompt: str, required: bool = True) -> float:
@@ -275,21 +537,58 @@ def get_rating(prompt: str, required: bool = True) -> float:
         float: The rating from the user.
     """
     while True:
-        rating = input(prompt).strip()
-        if required and rating == "":
+        rating = read_line(prompt).strip()
+        if not required and rating == "":
+            return None
+        try:
+            return validate_rating(rating)
+        except ValueError as err:
+            print_err(str(err))
+            continue
+
+
+def get_weights(prompt: str, required: bool = True) -> list | None:
+    """Gets the ranking weights from the user.
+
+    Args:
+        prompt (str): The prompt the user is asked.
+        required (bool, optional): Whether the input is required or not. Defaults to True.
+
+    Returns:
+        list | None: The list of 4 weights (rating, distance, cost, cuisine) or None.
+    """
+    while True:
+        weights = read_line(prompt).strip()
+        if required and weights == "":
             print_err("Input cannot be blank.")
             continue
-        elif not required and rating == "":
+        elif not required and weights == "":
             return None
         try:
-            rating = float(rating)
-            if rating < 1 or rating > 5:
-                print_err("Input must be between 1 and 5.")
-                continue
-            else:
-                return rating
-        except ValueError:
-            print_err("Input must be a float.")
+            return validate_weights(weights)
+        except ValueError as err:
+            print_err(str(err))
+            continue
+
+
+def get_coordinates(prompt: str, required: bool = True) -> list | None:
+    """Gets a latitude and longitude from the user.
+
+    Args:
+        prompt (str): The prompt the user is asked.
+        required (bool, optional): Whether the input is required or not. Defaults to True.
+
+    Returns:
+        list | None: The latitude and longitude, or None.
+    """
+    while True:
+        coordinates = read_line(prompt).strip()
+        if not required and coordinates == "":
+            return None
+        try:
+            return validate_coordinates(coordinates)
+        except ValueError as err:
+            print_err(str(err))
             continue
 
 
@@ -305,7 +604,7 @@ def edit_string(prompt: str, old_value: str, required: bool = True) -> str | Non
         str | None: The edited string or None.
     """
     while True:
-        string = input(prompt).strip()
+        string = read_line(prompt).strip()
         if string == "":
             return old_value
         elif string.capitalize() == "Any" and not required:
@@ -317,6 +616,27 @@ def edit_string(prompt: str, old_value: str, required: bool = True) -> str | Non
             return string
 
 
+def edit_name(prompt: str, old_value: str) -> str:
+    """Edits the name of a resto.
+
+    Args:
+        prompt (str): The prompt the user is asked.
+        old_value (str): The old name.
+
+    Returns:
+        str: The edited name with each word capitalized, or the old name.
+    """
+    while True:
+        name = read_line(prompt).strip()
+        if name == "":
+            return old_value
+        try:
+            return validate_name(name)
+        except ValueError as err:
+            print_err(str(err))
+            continue
+
+
 def edit_integer(prompt: str, old_value: int, required: bool = True) -> int | None:
     """Edits an integer.
 
@@ -329,7 +649,7 @@ def edit_integer(prompt: str, old_value: int, required: bool = True) -> int | No
         int | None: The edited integer or None.
     """
     while True:
-        integer = input(prompt).strip()
+        integer = read_line(prompt).strip()
         if integer == "":
             return old_value
         elif integer.capitalize() == "Any" and not required:
@@ -361,7 +681,7 @@ def edit_float(prompt: str, old_value: float, required: bool = True) -> float |
         float | None: The edited float or None.
     """
     while True:
-        float_num = input(prompt).strip()
+        float_num = read_line(prompt).strip()
         if float_num == "":
             return old_value
         elif float_num.capitalize() == "Any" and not required:
@@ -393,7 +713,7 @@ def edit_meal_type(prompt: str, old_value: str, required: bool = True) -> str |
         str | None: The edited meal type or None.
     """
     while True:
-        meal_type = input(prompt).strip().capitalize()
+        meal_type = read_line(prompt).strip().capitalize()
         if meal_type == "":
             return old_value
         elif meal_type.capitalize() == "Any" and not required:
@@ -419,23 +739,14 @@ def edit_list_of_meal_types(prompt: str, old_value: str) -> str:
         str: The edited Literal.
     """
     while True:
-        meal_types = input(prompt).strip()
+        meal_types = read_line(prompt).strip()
         if meal_types == "":
             return old_value
-        meal_type_lst = []
-        for meal_type in meal_types.split(","):
-            meal_type = meal_type.strip().capitalize()
-            if meal_type in ["Breakfast", "Lunch", "Dinner"]:
-                meal_type_lst.append(meal_type[0])
-            else:
-                m.print_err(f"Discarding invalid meal type: {meal_type}")
-        if len(meal_type_lst) == 0:
-            print_err("Input must have at least one valid meal type.")
+        try:
+            return validate_list_of_meal_types(meal_types, discard_meal_type)
+        except ValueError as err:
+            print_err(str(err))
             continue
-        else:
-            break
-    meal_type_lst.sort(key=lambda x: meal_types_sorter[x])
-    return "".join(meal_type_lst)
 
 
 def edit_cuisine_type(prompt: str, old_value: str, required: bool = True) -> str | None:
@@ -450,7 +761,7 @@ def edit_cuisine_type(prompt: str, old_value: str, required: bool = True) -> str
         str | None: The edited cuisine or None.
     """
     while True:
-        cuisine_type = m.capitalize_words(input(prompt).strip())
+        cuisine_type = m.capitalize_words(read_line(prompt).strip())
         if cuisine_type == "":
             return old_value
         elif cuisine_type.capitalize() == "Any" and not required:
@@ -476,22 +787,14 @@ def edit_list_of_cuisine_types(prompt: str, old_value: list) -> list:
         list: The edited list of cuisines.
     """
     while True:
-        cuisine_types = input(prompt).strip()
+        cuisine_types = read_line(prompt).strip()
         if cuisine_types == "":
             return old_value
-        cuisine_type_list = []
-        for cuisine_type in cuisine_types.split(","):
-            cuisine_type = m.capitalize_words(cuisine_type.strip())
-            if cuisine_type in cuisines_list:
-                cuisine_type_list.append(cuisine_type)
-            else:
-                m.print_err(f"Discarding invalid cuisine type: {cuisine_type}")
-        if len(cuisine_type_list) == 0:
-            print_err("Input must have at least one valid cuisine type.")
+        try:
+            return validate_list_of_cuisine_types(cuisine_types, discard_cuisine_type)
+        except ValueError as err:
+            print_err(str(err))
             continue
-        else:
-            break
-    return cuisine_type_list
 
 
 def edit_rating(prompt: str, old_value: float, required: bool = True) -> float | None:
@@ -506,7 +809,7 @@ def edit_rating(prompt: str, old_value: float, required: bool = True) -> float |
         float | None: The edited float or None.
     """
     while True:
-        rating = input(prompt).strip()
+        rating = read_line(prompt).strip()
         if rating == "":
             return old_value
         elif rating.capitalize() == "Any" and not required:
@@ -524,3 +827,57 @@ def edit_rating(prompt: str, old_value: float, required: bool = True) -> float |
         except ValueError:
             print_err("Input must be a float.")
             continue
+
+
+def edit_weights(prompt: str, old_value: list | None, required: bool = True) -> list | None:
+    """Edits the ranking weights.
+
+    Args:
+        prompt (str): The prompt the user is asked.
+        old_value (list | None): The old list of weights.
+        required (bool, optional): Whether the input is required or not. Defaults to True.
+
+    Returns:
+        list | None: The edited list of weights or None.
+    """
+    while True:
+        weights = read_line(prompt).strip()
+        if weights == "":
+            return old_value
+        elif weights.capitalize() == "Any" and not required:
+            return None
+        elif weights.capitalize() == "Any" and required:
+            print_err("Input is required.")
+            continue
+        try:
+            return validate_weights(weights)
+        except ValueError as err:
+            print_err(str(err))
+            continue
+
+
+def edit_coordinates(prompt: str, old_value: list | None, required: bool = True) -> list | None:
+    """Edits a latitude and longitude.
+
+    Args:
+        prompt (str): The prompt the user is asked.
+        old_value (list | None): The old latitude and longitude.
+        required (bool, optional): Whether the input is required or not. Defaults to True.
+
+    Returns:
+        list | None: The edited latitude and longitude or None.
+    """
+    while True:
+        coordinates = read_line(prompt).strip()
+        if coordinates == "":
+            return old_value
+        elif coordinates.capitalize() == "Any" and not required:
+            return None
+        elif coordinates.capitalize() == "Any" and required:
+            print_err("Input is required.")
+            continue
+        try:
+            return validate_coordinates(coordinates)
+        except ValueError as err:
+            print_err(str(err))
+            continue